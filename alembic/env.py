@@ -20,9 +20,14 @@ if config.config_file_name is not None:
 
 sys.path.insert(0, dirname(dirname(abspath(__file__))))
 
+from src.core.config import settings
 from src.domain.models import Base
 target_metadata = Base.metadata
 
+# URL берется из настроек приложения (POSTGRES_*), если его не задали явно (тесты, -x)
+if not config.get_main_option("sqlalchemy.url"):
+    config.set_main_option("sqlalchemy.url", settings.database_url.replace("%", "%%"))
+
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
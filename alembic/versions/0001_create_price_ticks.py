@@ -0,0 +1,43 @@
+"""create price_ticks
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # До перехода на миграции таблицу создавал init_db (create_all): такую БД не трогаем
+    if sa.inspect(op.get_bind()).has_table('price_ticks'):
+        return
+    op.create_table(
+        'price_ticks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('ticker', sa.String(length=10), nullable=False),
+        sa.Column('price', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('timestamp', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_price_ticks_id'), 'price_ticks', ['id'], unique=False)
+    op.create_index(op.f('ix_price_ticks_ticker'), 'price_ticks', ['ticker'], unique=False)
+    op.create_index(op.f('ix_price_ticks_timestamp'), 'price_ticks', ['timestamp'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_price_ticks_timestamp'), table_name='price_ticks')
+    op.drop_index(op.f('ix_price_ticks_ticker'), table_name='price_ticks')
+    op.drop_index(op.f('ix_price_ticks_id'), table_name='price_ticks')
+    op.drop_table('price_ticks')
@@ -0,0 +1,55 @@
+"""unique (ticker, timestamp) on price_ticks
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 10:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def has_unique_ticker_timestamp(bind) -> bool:
+    """Уникальность (ticker, timestamp) уже есть: ее создал init_db по текущей модели"""
+    inspector = sa.inspect(bind)
+    unique_columns = [constraint['column_names'] for constraint in inspector.get_unique_constraints('price_ticks')]
+    unique_columns += [index['column_names'] for index in inspector.get_indexes('price_ticks') if index['unique']]
+    return ['ticker', 'timestamp'] in unique_columns
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if has_unique_ticker_timestamp(bind):
+        return
+
+    # Удаляем накопившиеся дубликаты, оставляя самую раннюю запись
+    if bind.dialect.name == 'postgresql':
+        op.execute(
+            """
+            DELETE FROM price_ticks a
+            USING price_ticks b
+            WHERE a.ticker = b.ticker
+              AND a.timestamp = b.timestamp
+              AND a.id > b.id
+            """
+        )
+    else:
+        op.execute(
+            'DELETE FROM price_ticks WHERE id NOT IN '
+            '(SELECT min(id) FROM price_ticks GROUP BY ticker, timestamp)'
+        )
+    with op.batch_alter_table('price_ticks') as batch_op:
+        batch_op.create_unique_constraint('uq_price_ticks_ticker_timestamp', ['ticker', 'timestamp'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_price_ticks_ticker_timestamp', 'price_ticks', type_='unique')
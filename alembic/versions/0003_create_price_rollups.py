@@ -0,0 +1,45 @@
+"""create price_rollups
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table('price_rollups'):
+        return
+    op.create_table(
+        'price_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('ticker', sa.String(length=10), nullable=False),
+        sa.Column('interval', sa.Integer(), nullable=False),
+        sa.Column('bucket', sa.Integer(), nullable=False),
+        sa.Column('open', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('high', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('low', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('close', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('open_time', sa.Integer(), nullable=False),
+        sa.Column('close_time', sa.Integer(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        # Уникальный индекс (ticker, interval, bucket) обслуживает и upsert, и выборки по диапазону
+        sa.UniqueConstraint('ticker', 'interval', 'bucket', name='uq_price_rollups_ticker_interval_bucket'),
+    )
+    # Существующая история заполняется командой: python -m src.application.rollups
+
+
+def downgrade() -> None:
+    op.drop_table('price_rollups')
@@ -0,0 +1,128 @@
+"""partition price_ticks by month
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.core.config import settings
+from src.infrastructure.partitions import add_months, month_start, partition_name
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    # Таблица, созданная init_db по текущей модели, уже может иметь нужные индексы
+    indexes = {index['name'] for index in inspector.get_indexes('price_ticks')}
+    constraints = {constraint['name'] for constraint in inspector.get_unique_constraints('price_ticks')}
+    if bind.dialect.name != 'postgresql':
+        # На других СУБД секционирования нет: заменяем уникальное ограничение
+        # и одиночные индексы составным индексом (ticker, timestamp DESC)
+        with op.batch_alter_table('price_ticks') as batch_op:
+            if 'uq_price_ticks_ticker_timestamp' in constraints:
+                batch_op.drop_constraint('uq_price_ticks_ticker_timestamp', type_='unique')
+            for name in ('ix_price_ticks_ticker', 'ix_price_ticks_timestamp'):
+                if name in indexes:
+                    batch_op.drop_index(name)
+        if 'ix_price_ticks_ticker_timestamp' not in indexes:
+            op.create_index(
+                'ix_price_ticks_ticker_timestamp', 'price_ticks',
+                ['ticker', sa.text('timestamp DESC')], unique=True
+            )
+        return
+
+    partitioned = bind.execute(sa.text(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'price_ticks'::regclass"
+    )).scalar()
+    if partitioned:
+        return
+
+    op.execute('ALTER TABLE price_ticks RENAME TO price_ticks_legacy')
+    op.execute('ALTER TABLE price_ticks_legacy RENAME CONSTRAINT price_ticks_pkey TO price_ticks_legacy_pkey')
+    op.execute('ALTER INDEX IF EXISTS ix_price_ticks_id RENAME TO ix_price_ticks_legacy_id')
+    op.execute('ALTER INDEX IF EXISTS ix_price_ticks_ticker_timestamp RENAME TO ix_price_ticks_legacy_ticker_timestamp')
+
+    # Ключ секционирования обязан входить в первичный ключ и уникальные индексы
+    op.execute("""
+        CREATE TABLE price_ticks (
+            id INTEGER NOT NULL DEFAULT nextval('price_ticks_id_seq'),
+            ticker VARCHAR(10) NOT NULL,
+            price NUMERIC(12, 2) NOT NULL,
+            timestamp INTEGER NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp)
+    """)
+    op.execute('CREATE INDEX ix_price_ticks_id ON price_ticks (id)')
+    op.execute('CREATE UNIQUE INDEX ix_price_ticks_ticker_timestamp ON price_ticks (ticker, timestamp DESC)')
+
+    # Секции от месяца самого старого тика до текущего месяца плюс запас вперед
+    now = datetime.now(timezone.utc)
+    oldest = bind.execute(sa.text('SELECT min(timestamp) FROM price_ticks_legacy')).scalar()
+    first = datetime.fromtimestamp(oldest, timezone.utc) if oldest is not None else now
+    year, month = first.year, first.month
+    last = add_months(now.year, now.month, settings.partition_months_ahead)
+    while (year, month) <= last:
+        next_year, next_month = add_months(year, month, 1)
+        op.execute(
+            f'CREATE TABLE {partition_name(year, month)} PARTITION OF price_ticks '
+            f'FOR VALUES FROM ({month_start(year, month)}) TO ({month_start(next_year, next_month)})'
+        )
+        year, month = next_year, next_month
+    # Страховка для тиков вне созданных диапазонов (например, если обслуживание не запускалось)
+    op.execute('CREATE TABLE price_ticks_default PARTITION OF price_ticks DEFAULT')
+
+    op.execute(
+        'INSERT INTO price_ticks (id, ticker, price, timestamp, created_at) '
+        'SELECT id, ticker, price, timestamp, created_at FROM price_ticks_legacy'
+    )
+    op.execute('ALTER SEQUENCE price_ticks_id_seq OWNED BY price_ticks.id')
+    op.execute('DROP TABLE price_ticks_legacy')
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        op.drop_index('ix_price_ticks_ticker_timestamp', table_name='price_ticks')
+        op.create_index('ix_price_ticks_ticker', 'price_ticks', ['ticker'])
+        op.create_index('ix_price_ticks_timestamp', 'price_ticks', ['timestamp'])
+        with op.batch_alter_table('price_ticks') as batch_op:
+            batch_op.create_unique_constraint('uq_price_ticks_ticker_timestamp', ['ticker', 'timestamp'])
+        return
+
+    op.execute('ALTER TABLE price_ticks RENAME TO price_ticks_partitioned')
+    op.execute("""
+        CREATE TABLE price_ticks (
+            id INTEGER NOT NULL DEFAULT nextval('price_ticks_id_seq'),
+            ticker VARCHAR(10) NOT NULL,
+            price NUMERIC(12, 2) NOT NULL,
+            timestamp INTEGER NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            CONSTRAINT price_ticks_legacy_pkey PRIMARY KEY (id),
+            CONSTRAINT uq_price_ticks_ticker_timestamp UNIQUE (ticker, timestamp)
+        )
+    """)
+    op.execute(
+        'INSERT INTO price_ticks (id, ticker, price, timestamp, created_at) '
+        'SELECT id, ticker, price, timestamp, created_at FROM price_ticks_partitioned'
+    )
+    op.execute('ALTER SEQUENCE price_ticks_id_seq OWNED BY price_ticks.id')
+    # Вместе с родительской таблицей удаляются все присоединенные секции
+    op.execute('DROP TABLE price_ticks_partitioned')
+    op.execute('ALTER TABLE price_ticks RENAME CONSTRAINT price_ticks_legacy_pkey TO price_ticks_pkey')
+    op.execute('CREATE INDEX ix_price_ticks_id ON price_ticks (id)')
+    op.execute('CREATE INDEX ix_price_ticks_ticker ON price_ticks (ticker)')
+    op.execute('CREATE INDEX ix_price_ticks_timestamp ON price_ticks (timestamp)')
@@ -0,0 +1,38 @@
+"""create backfill_checkpoints
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table('backfill_checkpoints'):
+        return
+    op.create_table(
+        'backfill_checkpoints',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('ticker', sa.String(length=10), nullable=False),
+        sa.Column('gap_from', sa.Integer(), nullable=False),
+        sa.Column('gap_to', sa.Integer(), nullable=False),
+        sa.Column('rows', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('ticker', 'gap_from', 'gap_to', name='uq_backfill_checkpoints_ticker_gap'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('backfill_checkpoints')
@@ -0,0 +1,61 @@
+"""
+Время векторных вычислений /analytics на синтетическом ряду.
+
+Ряд генерируется в памяти (геометрическое броуновское движение, тик в секунду),
+так что замеряется только арифметика, без загрузки из БД.
+
+Запуск:
+    python -m benchmarks.bench_analytics --ticks 10000000 --window 60
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.domain import analytics
+
+
+def synthetic_series(ticks: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    timestamps = 1_700_000_000 + np.arange(ticks, dtype=np.int64)
+    prices = 40_000.0 * np.exp(np.cumsum(rng.normal(0.0, 2e-4, ticks)))
+    return timestamps, prices
+
+
+def measure(func, repeat: int) -> float:
+    """Лучшее время из repeat запусков, секунды"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ticks", type=int, default=10_000_000)
+    parser.add_argument("--window", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    timestamps, prices = synthetic_series(args.ticks)
+    returns = analytics.log_returns(prices)
+
+    cases = {
+        "log_returns": lambda: analytics.log_returns(prices),
+        "realized_volatility": lambda: analytics.realized_volatility(returns, args.window),
+        "sma": lambda: analytics.sma(prices, args.window),
+        "ema": lambda: analytics.ema(prices, args.window),
+        "twap": lambda: analytics.twap(timestamps, prices),
+        "max_drawdown": lambda: analytics.max_drawdown(prices),
+    }
+
+    print(f"{args.ticks:,} ticks, window={args.window}")
+    for name, func in cases.items():
+        elapsed = measure(func, args.repeat)
+        print(f"{name:<20} {elapsed * 1000:9.1f} ms  {args.ticks / elapsed / 1e6:8.1f} M ticks/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Сравнение задержки одного опроса Deribit: новый loop и сессия на каждый запуск
+против долгоживущего WorkerRuntime.
+
+Запуск:
+    python -m benchmarks.bench_deribit_session --runs 200
+"""
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+
+from aiohttp import web
+
+from src.infrastructure.deribit_client import DeribitClient
+from src.infrastructure.worker_runtime import WorkerRuntime
+
+
+async def _index_price(request: web.Request) -> web.Response:
+    return web.json_response({"result": {"index_price": 50000.0}})
+
+
+class StubDeribitServer:
+    """Локальная заглушка public/get_index_price в отдельном потоке"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.port = None
+        self._runner = None
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/api/v2"
+
+    def start(self) -> None:
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self.loop).result()
+
+    async def _start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/api/v2/public/get_index_price", _index_price)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    def stop(self) -> None:
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+
+
+def bench_per_run(base_url: str, runs: int) -> list:
+    """Прежнее поведение: новый event loop и новая ClientSession на каждый запуск"""
+    timings = []
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        loop = asyncio.new_event_loop()
+        client = DeribitClient(base_url)
+        try:
+            loop.run_until_complete(client.get_index_price("BTC"))
+            loop.run_until_complete(client.close())
+        finally:
+            loop.close()
+        timings.append(time.perf_counter() - start_time)
+    return timings
+
+
+def bench_worker_runtime(base_url: str, runs: int) -> list:
+    """Новое поведение: один loop и keep-alive сессия на весь процесс"""
+    runtime = WorkerRuntime(base_url)
+    runtime.start()
+    timings = []
+    try:
+        for _ in range(runs):
+            start_time = time.perf_counter()
+            runtime.run(runtime.client.get_index_price("BTC"))
+            timings.append(time.perf_counter() - start_time)
+    finally:
+        runtime.stop()
+    return timings
+
+
+def _summary(name: str, timings: list) -> str:
+    timings_ms = sorted(t * 1000 for t in timings)
+    p95 = timings_ms[int(len(timings_ms) * 0.95) - 1]
+    return (
+        f"{name:<16} mean={statistics.mean(timings_ms):7.3f}ms "
+        f"median={statistics.median(timings_ms):7.3f}ms p95={p95:7.3f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    server = StubDeribitServer()
+    server.start()
+    try:
+        per_run = bench_per_run(server.base_url, args.runs)
+        persistent = bench_worker_runtime(server.base_url, args.runs)
+    finally:
+        server.stop()
+
+    print(_summary("per-run session", per_run))
+    print(_summary("worker runtime", persistent))
+    print(f"speedup (median): {statistics.median(per_run) / statistics.median(persistent):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,5 @@
 from fastapi import FastAPI
 from src.core.config import settings
-from src.infrastructure.database import init_db
 import logging
 
 # Настройка логирования
@@ -25,13 +24,8 @@ async def startup_event():
     """
     Действия при запуске приложения.
     """
+    # Схему БД поднимает alembic upgrade head до запуска приложения
     logger.info("Starting up...")
-    # Инициализация базы данных
-    try:
-        init_db()
-        logger.info("Database initialized successfully")
-    except Exception as e:
-        logger.error(f"Database initialization failed: {e}")
 
 
 @app.on_event("shutdown")
@@ -1,8 +1,13 @@
+from typing import Optional
 from fastapi import Depends
 from sqlalchemy.orm import Session
-from src.infrastructure.database import get_db
-from src.infrastructure.repositories import PriceRepository
-from src.application.services import PriceService
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.infrastructure.database import get_db, get_async_db
+from src.infrastructure.repositories import PriceRepository, AsyncPriceRepository
+from src.infrastructure.cache import LatestPriceCache, TTLCache, get_price_cache, get_analytics_cache
+from src.infrastructure.archive import PriceArchive, get_price_archive
+from src.application.services import PriceService, AsyncPriceService
+from src.application.analytics import AnalyticsService
 
 
 def get_price_repository(db: Session = Depends(get_db)) -> PriceRepository:
@@ -11,7 +16,31 @@ def get_price_repository(db: Session = Depends(get_db)) -> PriceRepository:
 
 
 def get_price_service(
-    repository: PriceRepository = Depends(get_price_repository)
+    repository: PriceRepository = Depends(get_price_repository),
+    archive: Optional[PriceArchive] = Depends(get_price_archive)
 ) -> PriceService:
     """Возвращает сервис цен"""
-    return PriceService(repository)
+    return PriceService(repository, archive=archive)
+
+
+def get_async_price_repository(db: AsyncSession = Depends(get_async_db)) -> AsyncPriceRepository:
+    """Возвращает асинхронный репозиторий цен"""
+    return AsyncPriceRepository(db)
+
+
+def get_async_price_service(
+    repository: AsyncPriceRepository = Depends(get_async_price_repository),
+    cache: LatestPriceCache = Depends(get_price_cache),
+    archive: Optional[PriceArchive] = Depends(get_price_archive)
+) -> AsyncPriceService:
+    """Возвращает асинхронный сервис цен"""
+    return AsyncPriceService(repository, cache, archive)
+
+
+def get_analytics_service(
+    repository: AsyncPriceRepository = Depends(get_async_price_repository),
+    cache: TTLCache = Depends(get_analytics_cache),
+    archive: Optional[PriceArchive] = Depends(get_price_archive)
+) -> AnalyticsService:
+    """Возвращает сервис аналитики"""
+    return AnalyticsService(repository, cache=cache, archive=archive)
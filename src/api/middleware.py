@@ -0,0 +1,106 @@
+import hmac
+import random
+import time
+from starlette.types import ASGIApp, Receive, Scope, Send, Message
+from src.infrastructure.metrics import REQUEST_LATENCY
+from src.infrastructure.profiling import RequestProfiler, profile_name
+
+
+class MetricsMiddleware:
+    """
+    ASGI-middleware: гистограмма времени запроса по шаблону маршрута.
+
+    Метка route — шаблон пути (/analytics/{ticker}/sma), а не фактический URL,
+    чтобы число временных рядов не росло с числом тикеров.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Маршрут записывается в scope роутером FastAPI при сопоставлении
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status),
+            ).observe(time.perf_counter() - started)
+
+
+class ProfilingMiddleware:
+    """
+    ASGI-middleware выборочного профилирования запросов.
+
+    Профилируется доля sample_rate запросов, а также любой запрос с заголовком
+    X-Profile, значение которого совпадает с token. Путь к профилю возвращается
+    в заголовке X-Profile-File. Подключается только при включенной настройке.
+    """
+
+    header = b"x-profile"
+    file_header = b"x-profile-file"
+
+    def __init__(self, app: ASGIApp, profiler: RequestProfiler, sample_rate: float = 0.0, token: str = ""):
+        self.app = app
+        self.profiler = profiler
+        self.sample_rate = sample_rate
+        self.token = token.encode()
+
+    def _requested(self, scope: Scope) -> bool:
+        if not self.token:
+            return False
+        return any(
+            name == self.header and hmac.compare_digest(value, self.token)
+            for name, value in scope["headers"]
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requested = self._requested(scope)
+        if not requested and random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        profile = self.profiler.start()
+        if profile is None:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        path = None
+
+        def finish():
+            name = profile_name(scope["method"], scope["path"], time.perf_counter() - started)
+            return self.profiler.stop(profile, name)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal path
+            if message["type"] == "http.response.start" and requested:
+                # Заголовки уходят до конца тела: профиль фиксируем на старте ответа
+                path = finish()
+                message["headers"] = list(message.get("headers", [])) + [(self.file_header, path.name.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if path is None:
+                finish()
@@ -0,0 +1,38 @@
+"""
+Быстрая сериализация страниц цен: строки Core сразу в JSON-байты через orjson.
+
+Формат совпадает с тем, что FastAPI отдает через response_model=List[PriceTickResponse]:
+тот же порядок ключей, float-цена, datetime в ISO 8601 (UTC как "Z").
+"""
+from typing import Any, Iterable, List, Dict
+import orjson
+from fastapi.responses import Response
+
+TICK_FIELDS = ("ticker", "price", "timestamp", "id", "created_at")
+
+
+def encode_ticks(rows: Iterable[Any]) -> bytes:
+    """Сериализует строки с полями PriceTickResponse (Row или dict архива) в JSON-массив"""
+    items: List[Dict[str, Any]] = []
+    for row in rows:
+        if isinstance(row, dict):
+            ticker, price, timestamp, row_id, created_at = (row[field] for field in TICK_FIELDS)
+        else:
+            ticker, price, timestamp, row_id, created_at = row
+        items.append({
+            "ticker": ticker,
+            "price": float(price),
+            "timestamp": timestamp,
+            "id": row_id,
+            "created_at": created_at,
+        })
+    return orjson.dumps(items, option=orjson.OPT_UTC_Z)
+
+
+class TicksResponse(Response):
+    """JSON-ответ со страницей тиков, минуя валидацию response_model"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return content if isinstance(content, bytes) else encode_ticks(content)
@@ -0,0 +1,118 @@
+from fastapi import APIRouter, Depends, Query, HTTPException
+from typing import Optional, List
+from src.application.analytics import AnalyticsService
+from src.api.dependencies import get_analytics_service
+from src.domain.schemas import SeriesResponse, SummaryResponse, CorrelationResponse
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+async def _run(coro):
+    try:
+        return await coro
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/correlation", response_model=CorrelationResponse)
+async def get_correlation(
+    tickers: List[str] = Query(..., description="Тикеры (параметр повторяется: tickers=btc_usd&tickers=eth_usd)"),
+    window: int = Query(60, ge=2, description="Окно скользящей корреляции в шагах сетки"),
+    step: int = Query(60, ge=1, description="Шаг общей сетки, секунды"),
+    date_from: Optional[int] = Query(None, description="Начальная дата (UNIX timestamp)"),
+    date_to: Optional[int] = Query(None, description="Конечная дата (UNIX timestamp)"),
+    service: AnalyticsService = Depends(get_analytics_service)
+):
+    """
+    Матрица корреляций лог-доходностей и спред/отношение/скользящая корреляция по парам.
+
+    Ряды выравниваются на сетке с шагом step: в каждой точке берется последняя
+    известная цена тикера (forward-fill).
+
+    Пример: /analytics/correlation?tickers=btc_usd&tickers=eth_usd&step=60&window=60
+    """
+    result = await _run(service.get_correlation(tickers, window, step, date_from, date_to))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Prices not found")
+    return result
+
+
+@router.get("/{ticker}/returns", response_model=SeriesResponse)
+async def get_returns(
+    ticker: str,
+    date_from: Optional[int] = Query(None, description="Начальная дата (UNIX timestamp)"),
+    date_to: Optional[int] = Query(None, description="Конечная дата (UNIX timestamp)"),
+    service: AnalyticsService = Depends(get_analytics_service)
+):
+    """
+    Логарифмические доходности между соседними тиками.
+
+    Пример: /analytics/btc_usd/returns?date_from=1705000000
+    """
+    return await _run(service.get_returns(ticker, date_from, date_to))
+
+
+@router.get("/{ticker}/volatility", response_model=SeriesResponse)
+async def get_volatility(
+    ticker: str,
+    window: int = Query(60, ge=1, description="Окно в доходностях"),
+    date_from: Optional[int] = Query(None, description="Начальная дата (UNIX timestamp)"),
+    date_to: Optional[int] = Query(None, description="Конечная дата (UNIX timestamp)"),
+    service: AnalyticsService = Depends(get_analytics_service)
+):
+    """
+    Скользящая реализованная волатильность.
+
+    Пример: /analytics/btc_usd/volatility?window=60
+    """
+    return await _run(service.get_volatility(ticker, window, date_from, date_to))
+
+
+@router.get("/{ticker}/sma", response_model=SeriesResponse)
+async def get_sma(
+    ticker: str,
+    window: int = Query(20, ge=1, description="Окно в тиках"),
+    date_from: Optional[int] = Query(None, description="Начальная дата (UNIX timestamp)"),
+    date_to: Optional[int] = Query(None, description="Конечная дата (UNIX timestamp)"),
+    service: AnalyticsService = Depends(get_analytics_service)
+):
+    """
+    Простое скользящее среднее.
+
+    Пример: /analytics/eth_usd/sma?window=20
+    """
+    return await _run(service.get_sma(ticker, window, date_from, date_to))
+
+
+@router.get("/{ticker}/ema", response_model=SeriesResponse)
+async def get_ema(
+    ticker: str,
+    window: int = Query(20, ge=1, description="Период (span) в тиках"),
+    date_from: Optional[int] = Query(None, description="Начальная дата (UNIX timestamp)"),
+    date_to: Optional[int] = Query(None, description="Конечная дата (UNIX timestamp)"),
+    service: AnalyticsService = Depends(get_analytics_service)
+):
+    """
+    Экспоненциальное скользящее среднее (alpha = 2 / (window + 1)).
+
+    Пример: /analytics/eth_usd/ema?window=20
+    """
+    return await _run(service.get_ema(ticker, window, date_from, date_to))
+
+
+@router.get("/{ticker}/summary", response_model=SummaryResponse)
+async def get_summary(
+    ticker: str,
+    date_from: Optional[int] = Query(None, description="Начальная дата (UNIX timestamp)"),
+    date_to: Optional[int] = Query(None, description="Конечная дата (UNIX timestamp)"),
+    service: AnalyticsService = Depends(get_analytics_service)
+):
+    """
+    TWAP, реализованная волатильность и максимальная просадка за период.
+
+    Пример: /analytics/btc_usd/summary?date_from=1705000000&date_to=1705600000
+    """
+    summary = await _run(service.get_summary(ticker, date_from, date_to))
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Prices not found")
+    return summary
@@ -0,0 +1,97 @@
+import asyncio
+from typing import List
+from fastapi import APIRouter, Depends, Query, HTTPException, WebSocket, status
+from fastapi.responses import StreamingResponse
+from src.core.config import settings
+from src.infrastructure.live import PriceHub, Subscription, get_price_hub
+
+router = APIRouter(tags=["live"])
+
+
+def parse_tickers(tickers: str) -> List[str]:
+    """Список тикеров из параметра вида btc_usd,eth_usd"""
+    parsed = sorted({ticker.strip().lower() for ticker in tickers.split(",") if ticker.strip()})
+    if not parsed:
+        raise ValueError("At least one ticker is required")
+    if len(parsed) > settings.live_max_tickers:
+        raise ValueError(f"At most {settings.live_max_tickers} tickers per subscription")
+    return parsed
+
+
+@router.websocket("/ws/prices")
+async def prices_websocket(
+    websocket: WebSocket,
+    tickers: str = Query(..., description="Тикеры через запятую (например: btc_usd,eth_usd)"),
+    hub: PriceHub = Depends(get_price_hub)
+):
+    """
+    Новые тики выбранных тикеров по WebSocket: каждый тик — текстовое
+    сообщение в формате /prices/last.
+
+    Пример: ws://localhost:8000/ws/prices?tickers=btc_usd,eth_usd
+    """
+    try:
+        subscription = hub.subscribe(parse_tickers(tickers))
+    except ValueError as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(e))
+        return
+
+    try:
+        await websocket.accept()
+        sender = asyncio.create_task(_forward(websocket, subscription))
+        try:
+            # Клиент ничего не присылает, чтение нужно только чтобы заметить отключение
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            sender.cancel()
+    finally:
+        hub.unsubscribe(subscription)
+
+
+async def _forward(websocket: WebSocket, subscription: Subscription) -> None:
+    while True:
+        await websocket.send_text(await subscription.get())
+
+
+@router.get("/prices/stream")
+async def prices_stream(
+    tickers: str = Query(..., description="Тикеры через запятую (например: btc_usd,eth_usd)"),
+    hub: PriceHub = Depends(get_price_hub)
+):
+    """
+    Новые тики выбранных тикеров как Server-Sent Events (событие price).
+
+    В простое раз в live_heartbeat секунд отправляется комментарий, чтобы
+    прокси не закрывали соединение.
+
+    Пример: /prices/stream?tickers=btc_usd,eth_usd
+    """
+    try:
+        parsed = parse_tickers(tickers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(
+        _events(hub, parsed),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _events(hub: PriceHub, tickers: List[str]):
+    # Подписка внутри генератора: если клиент отключится до начала отправки,
+    # генератор не запустится и подписки не будет
+    subscription = hub.subscribe(tickers)
+    try:
+        yield b": connected\n\n"
+        while True:
+            try:
+                payload = await asyncio.wait_for(subscription.get(), settings.live_heartbeat)
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+                continue
+            yield f"event: price\ndata: {payload}\n\n".encode()
+    finally:
+        # Starlette отменяет генератор при отключении клиента
+        hub.unsubscribe(subscription)
@@ -1,37 +1,51 @@
 from fastapi import APIRouter, Depends, Query, HTTPException
-from typing import List, Optional
-from src.application.services import PriceService
-from src.api.dependencies import get_price_service
-from src.domain.schemas import PriceTickResponse
+from fastapi.responses import StreamingResponse
+from src.core.config import settings
+from typing import List, Optional, Literal
+from src.application.services import AsyncPriceService
+from src.api.dependencies import get_async_price_service
+from src.api.responses import TicksResponse
+from src.domain.schemas import PriceTickResponse, CandleResponse
 
 router = APIRouter(prefix="/prices", tags=["prices"])
 
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
 @router.get("/all", response_model=List[PriceTickResponse])
 async def get_all_prices(
     ticker: str = Query(..., description="Тикер валюты (например: btc_usd)"),
-    limit: Optional[int] = Query(100, description="Лимит записей"),
-    service: PriceService = Depends(get_price_service)
+    limit: int = Query(100, ge=1, le=settings.max_page_size, description="Лимит записей"),
+    cursor: Optional[str] = Query(None, description="Курсор из заголовка X-Next-Cursor предыдущей страницы"),
+    service: AsyncPriceService = Depends(get_async_price_service)
 ):
     """
     Получает все сохраненные данные по указанной валюте.
     
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor
+    (заголовка нет на последней странице).
+    
     Пример: /prices/all?ticker=btc_usd&limit=10
     """
-    return service.get_all_prices(ticker, limit)
+    try:
+        rows, next_cursor = await service.get_price_rows(ticker, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _ticks_response(rows, next_cursor)
 
 
 @router.get("/last", response_model=PriceTickResponse)
 async def get_last_price(
     ticker: str = Query(..., description="Тикер валюты (например: btc_usd)"),
-    service: PriceService = Depends(get_price_service)
+    service: AsyncPriceService = Depends(get_async_price_service)
 ):
     """
     Получает последнюю цену валюты.
     
     Пример: /prices/last?ticker=eth_usd
     """
-    price = service.get_last_price(ticker)
+    price = await service.get_last_price(ticker)
     if not price:
         raise HTTPException(status_code=404, detail="Price not found")
     return price
@@ -42,11 +56,72 @@ async def get_filtered_prices(
     ticker: str = Query(..., description="Тикер валюты (например: btc_usd)"),
     date_from: Optional[int] = Query(None, description="Начальная дата (UNIX timestamp)"),
     date_to: Optional[int] = Query(None, description="Конечная дата (UNIX timestamp)"),
-    service: PriceService = Depends(get_price_service)
+    limit: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size, description="Лимит записей"),
+    cursor: Optional[str] = Query(None, description="Курсор из заголовка X-Next-Cursor предыдущей страницы"),
+    service: AsyncPriceService = Depends(get_async_price_service)
 ):
     """
     Получает цену валюты с фильтром по дате.
     
+    Результат разбит на страницы, курсор следующей возвращается в заголовке X-Next-Cursor.
+    
     Пример: /prices/filter?ticker=btc_usd&date_from=1705618800&date_to=1705705200
     """
-    return service.get_prices_by_date_range(ticker, date_from, date_to)
+    try:
+        rows, next_cursor = await service.get_price_rows(
+            ticker, date_from, date_to, limit, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _ticks_response(rows, next_cursor)
+
+
+def _ticks_response(rows, next_cursor: Optional[str]) -> TicksResponse:
+    """
+    Страница тиков строками Core прямо в JSON (response_model остается для OpenAPI,
+    но при возврате Response FastAPI не валидирует и не сериализует его повторно)
+    """
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return TicksResponse(rows, headers=headers)
+
+
+@router.get("/candles", response_model=List[CandleResponse])
+async def get_candles(
+    ticker: str = Query(..., description="Тикер валюты (например: btc_usd)"),
+    interval: Literal["1m", "5m", "1h", "1d"] = Query("1m", description="Интервал свечи"),
+    date_from: Optional[int] = Query(None, description="Начальная дата (UNIX timestamp)"),
+    date_to: Optional[int] = Query(None, description="Конечная дата (UNIX timestamp)"),
+    service: AsyncPriceService = Depends(get_async_price_service)
+):
+    """
+    Получает OHLC-свечи (open/high/low/close/count), посчитанные на сервере.
+    
+    Пример: /prices/candles?ticker=btc_usd&interval=1h&date_from=1705618800&date_to=1705705200
+    """
+    return await service.get_candles(ticker, interval, date_from, date_to)
+
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+@router.get("/export")
+async def export_prices(
+    ticker: str = Query(..., description="Тикер валюты (например: btc_usd)"),
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="Формат выгрузки"),
+    date_from: Optional[int] = Query(None, description="Начальная дата (UNIX timestamp)"),
+    date_to: Optional[int] = Query(None, description="Конечная дата (UNIX timestamp)"),
+    service: AsyncPriceService = Depends(get_async_price_service)
+):
+    """
+    Потоково выгружает всю историю тикера (от старых записей к новым).
+    
+    Пример: /prices/export?ticker=btc_usd&format=csv
+    """
+    return StreamingResponse(
+        service.export_prices(ticker, format, date_from, date_to),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{ticker}.{format}"'},
+    )
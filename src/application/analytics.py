@@ -0,0 +1,225 @@
+from typing import Optional, Tuple, List, Sequence
+import numpy as np
+from src.core.config import settings
+from src.domain import analytics
+from src.domain.schemas import SeriesResponse, SummaryResponse, CorrelationResponse, PairSeries
+from src.infrastructure.archive import PriceArchive
+from src.infrastructure.cache import TTLCache
+from src.infrastructure.repositories import AsyncPriceRepository
+from src.application.history import HistoryReader
+
+
+class AnalyticsService:
+    """Векторная аналитика по ряду цен тикера (NumPy, без циклов по тикам)"""
+
+    def __init__(
+        self,
+        repository: AsyncPriceRepository,
+        max_points: Optional[int] = None,
+        cache: Optional[TTLCache] = None,
+        archive: Optional[PriceArchive] = None,
+        max_tickers: Optional[int] = None,
+        max_pair_points: Optional[int] = None
+    ):
+        self.repository = repository
+        self.history = HistoryReader(repository, archive)
+        self.max_points = max_points or settings.analytics_max_points
+        self.max_tickers = max_tickers or settings.analytics_max_tickers
+        self.max_pair_points = max_pair_points or settings.analytics_max_pair_points
+        self.cache = cache
+
+    async def _load(
+        self,
+        ticker: str,
+        date_from: Optional[int],
+        date_to: Optional[int]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Ряд цен из БД и архива.
+
+        Raises:
+            ValueError: если в периоде больше max_points тиков
+        """
+        timestamps, prices = await self.history.get_series(
+            ticker, date_from, date_to, self.max_points + 1
+        )
+        if len(prices) > self.max_points:
+            raise ValueError(f"Range contains more than {self.max_points} ticks, narrow date_from/date_to")
+        return timestamps, prices
+
+    async def get_returns(
+        self,
+        ticker: str,
+        date_from: Optional[int] = None,
+        date_to: Optional[int] = None
+    ) -> SeriesResponse:
+        """Лог-доходности; timestamp точки — время тика, которым доходность заканчивается"""
+        timestamps, prices = await self._load(ticker, date_from, date_to)
+        returns = analytics.log_returns(prices)
+        return self._series(ticker, "log_return", None, timestamps[1:], returns)
+
+    async def get_volatility(
+        self,
+        ticker: str,
+        window: int,
+        date_from: Optional[int] = None,
+        date_to: Optional[int] = None
+    ) -> SeriesResponse:
+        """Скользящая реализованная волатильность по window доходностям"""
+        timestamps, prices = await self._load(ticker, date_from, date_to)
+        values = analytics.realized_volatility(analytics.log_returns(prices), window)
+        return self._series(ticker, "realized_volatility", window, timestamps[window:], values)
+
+    async def get_sma(
+        self,
+        ticker: str,
+        window: int,
+        date_from: Optional[int] = None,
+        date_to: Optional[int] = None
+    ) -> SeriesResponse:
+        timestamps, prices = await self._load(ticker, date_from, date_to)
+        values = analytics.sma(prices, window)
+        return self._series(ticker, "sma", window, timestamps[window - 1:], values)
+
+    async def get_ema(
+        self,
+        ticker: str,
+        window: int,
+        date_from: Optional[int] = None,
+        date_to: Optional[int] = None
+    ) -> SeriesResponse:
+        timestamps, prices = await self._load(ticker, date_from, date_to)
+        return self._series(ticker, "ema", window, timestamps, analytics.ema(prices, window))
+
+    async def get_summary(
+        self,
+        ticker: str,
+        date_from: Optional[int] = None,
+        date_to: Optional[int] = None
+    ) -> Optional[SummaryResponse]:
+        """Сводка по периоду: TWAP, волатильность, максимальная просадка; None без данных"""
+        timestamps, prices = await self._load(ticker, date_from, date_to)
+        if len(prices) == 0:
+            return None
+
+        returns = analytics.log_returns(prices)
+        drawdown = analytics.max_drawdown(prices)
+        return SummaryResponse(
+            ticker=ticker,
+            count=len(prices),
+            first=prices[0],
+            last=prices[-1],
+            twap=analytics.twap(timestamps, prices),
+            realized_volatility=float(np.sqrt(np.dot(returns, returns))),
+            max_drawdown=drawdown["value"],
+            drawdown_peak=int(timestamps[drawdown["peak"]]),
+            drawdown_trough=int(timestamps[drawdown["trough"]]),
+        )
+
+    async def get_correlation(
+        self,
+        tickers: Sequence[str],
+        window: int,
+        step: int,
+        date_from: Optional[int] = None,
+        date_to: Optional[int] = None
+    ) -> Optional[CorrelationResponse]:
+        """
+        Выравнивает ряды тикеров на общей сетке с шагом step (as-of, forward-fill)
+        и считает матрицу корреляций лог-доходностей, а по каждой паре — спред,
+        отношение и скользящую корреляцию. None, если по какому-то тикеру нет данных.
+
+        Пар N*(N-1)/2, и у каждой ряды длиной в сетку, поэтому ограничены
+        и число тикеров, и общее число точек в рядах пар.
+
+        Raises:
+            ValueError: меньше двух или больше max_tickers тикеров, слишком много точек
+        """
+        tickers = list(dict.fromkeys(tickers))
+        if len(tickers) < 2:
+            raise ValueError("At least two distinct tickers are required")
+        if len(tickers) > self.max_tickers:
+            raise ValueError(f"At most {self.max_tickers} tickers are allowed")
+
+        key = (tuple(tickers), window, step, date_from, date_to)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        series = [await self._load(ticker, date_from, date_to) for ticker in tickers]
+        if any(len(prices) == 0 for _, prices in series):
+            return None
+
+        # Сетка начинается, когда у всех тикеров уже есть цена, поэтому NaN в ней нет
+        start = max(int(timestamps[0]) for timestamps, _ in series)
+        end = max(int(timestamps[-1]) for timestamps, _ in series)
+        points = (end - start) // step + 1
+        if points > self.max_points:
+            raise ValueError(f"Grid contains more than {self.max_points} points, increase step")
+        pair_count = len(tickers) * (len(tickers) - 1) // 2
+        if pair_count * points > self.max_pair_points:
+            raise ValueError(
+                f"{pair_count} pairs x {points} points exceed {self.max_pair_points}, "
+                "increase step or request fewer tickers"
+            )
+        grid = np.arange(start, end + 1, step, dtype=np.int64)
+
+        aligned = np.column_stack([
+            analytics.align_asof(grid, timestamps, prices) for timestamps, prices in series
+        ])
+        pairs: List[PairSeries] = []
+        # Нулевая цена дает бесконечности и NaN, в ответе они станут null
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = np.diff(np.log(aligned), axis=0)
+            if len(returns) >= 2:
+                matrix = analytics.correlation_matrix(returns)
+            else:
+                matrix = np.full((len(tickers), len(tickers)), np.nan)
+
+            for i in range(len(tickers)):
+                for j in range(i + 1, len(tickers)):
+                    # Корреляция в точке t считается по window доходностям, заканчивающимся в t
+                    correlation = np.full(len(grid), np.nan)
+                    correlation[window:] = analytics.rolling_correlation(returns[:, i], returns[:, j], window)
+                    pairs.append(PairSeries.model_construct(
+                        base=tickers[i],
+                        quote=tickers[j],
+                        spread=self._nullable(aligned[:, i] - aligned[:, j]),
+                        ratio=self._nullable(aligned[:, i] / aligned[:, j]),
+                        correlation=self._nullable(correlation),
+                    ))
+
+        result = CorrelationResponse.model_construct(
+            tickers=tickers,
+            step=step,
+            window=window,
+            timestamps=grid.tolist(),
+            matrix=[self._nullable(row) for row in matrix],
+            pairs=pairs,
+        )
+        if self.cache is not None:
+            self.cache.set(key, result)
+        return result
+
+    @staticmethod
+    def _nullable(values: np.ndarray) -> List[Optional[float]]:
+        """NaN и бесконечности (деление на нулевую цену) не сериализуются в JSON: заменяем на None"""
+        return np.where(np.isfinite(values), values, None).tolist()
+
+    @staticmethod
+    def _series(
+        ticker: str,
+        metric: str,
+        window: Optional[int],
+        timestamps: np.ndarray,
+        values: np.ndarray
+    ) -> SeriesResponse:
+        # tolist() конвертирует массив целиком, без поэлементных вызовов из Python
+        return SeriesResponse.model_construct(
+            ticker=ticker,
+            metric=metric,
+            window=window,
+            timestamps=timestamps[:len(values)].tolist(),
+            values=values.tolist(),
+        )
@@ -0,0 +1,134 @@
+"""
+Перенос холодной истории price_ticks в архив Parquet.
+
+Запуск:
+    python -m src.application.archiver --after-months 3
+"""
+import argparse
+import logging
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Iterator, Tuple
+from src.core.config import settings
+from src.infrastructure.archive import PriceArchive, month_of
+from src.infrastructure.partitions import PartitionManager, add_months, month_start
+from src.infrastructure.repositories import RetentionRepository
+
+logger = logging.getLogger(__name__)
+
+
+class PriceArchiver:
+    """
+    Переносит полные месяцы старше after_months из БД в архив.
+
+    Месяц пишется в архив по каждому тикеру, и только после этого
+    из БД удаляются ровно записанные строки: тики тикера за месяц с id не
+    больше прочитанного. Тики, вставленные в месяц после чтения (поздний
+    флаш write-behind, бэкфилл), остаются в БД до следующего запуска.
+    В PostgreSQL секция месяца удаляется целиком, только если в ней нет
+    других строк. Тики месяца читаются и пишутся страницами по batch_size.
+    """
+
+    def __init__(
+        self,
+        repository: RetentionRepository,
+        archive: PriceArchive,
+        after_months: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ):
+        self.repository = repository
+        self.archive = archive
+        self.after_months = settings.archive_after_months if after_months is None else after_months
+        self.batch_size = batch_size or settings.retention_batch_size
+
+    def cutoff(self, now: Optional[datetime] = None) -> int:
+        """Начало самого старого месяца, который остается в БД"""
+        now = now or datetime.now(timezone.utc)
+        return month_start(*add_months(now.year, now.month, -self.after_months))
+
+    def run(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Архивирует и удаляет из БД все месяцы до cutoff, возвращает число строк по месяцам"""
+        cutoff = self.cutoff(now)
+        tickers = self.repository.get_expired_tickers(cutoff)
+        archived: Dict[str, int] = {}
+        if not tickers:
+            return {"cutoff": cutoff, "months": archived}
+
+        first = min(self.repository.get_first_timestamp(ticker) for ticker in tickers)
+        year, month = month_of(first)
+        while month_start(year, month) < cutoff:
+            start, end = month_start(year, month), month_start(*add_months(year, month, 1))
+            rows = 0
+            written: Dict[str, int] = {}  # тикер -> max id записанных в архив тиков
+            for ticker in tickers:
+                count, max_id = self._archive(ticker, year, month, start, end)
+                if count:
+                    written[ticker] = max_id
+                    rows += count
+            if rows:
+                self._purge(year, month, start, end, written, rows)
+                archived[f"{year:04d}-{month:02d}"] = rows
+            year, month = add_months(year, month, 1)
+
+        logger.info(f"Archived months before {cutoff}: {archived}")
+        return {"cutoff": cutoff, "months": archived}
+
+    def _archive(self, ticker: str, year: int, month: int, start: int, end: int) -> Tuple[int, int]:
+        """Пишет тики тикера за месяц в архив страницами, возвращает их число и max id"""
+        count, max_id = 0, 0
+
+        def ticks() -> Iterator[Any]:
+            nonlocal count, max_id
+            after = None
+            while True:
+                page = self.repository.get_ticks(ticker, start, end, limit=self.batch_size, after=after)
+                count += len(page)
+                max_id = max([max_id] + [tick.id for tick in page])
+                yield from page
+                if len(page) < self.batch_size:
+                    return
+                after = (page[-1].timestamp, page[-1].id)
+
+        self.archive.write_month(ticker, year, month, ticks())
+        return count, max_id
+
+    def _purge(self, year: int, month: int, start: int, end: int, written: Dict[str, int], rows: int) -> None:
+        """Удаляет из БД заархивированные тики: по тикеру за месяц с id не больше max id записанных"""
+        db = self.repository.db
+        manager = PartitionManager(db.connection())
+        if manager.is_partitioned() and manager.drop_partition(year, month, expected_rows=rows):
+            db.commit()
+            return
+        # Секции нет, в ней есть незаархивированные строки или таблица не секционирована
+        for ticker, max_id in written.items():
+            while self.repository.delete_ticks_batch(
+                end, self.batch_size, ticker=ticker, date_from=start, max_id=max_id
+            ) == self.batch_size:
+                pass
+
+
+def main() -> None:
+    from src.infrastructure.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Перенос старых месяцев price_ticks в архив Parquet")
+    parser.add_argument("--archive-path", default=settings.archive_path, help="Каталог архива")
+    parser.add_argument("--after-months", type=int, help="Сколько полных месяцев оставлять в БД")
+    args = parser.parse_args()
+
+    if not args.archive_path:
+        parser.error("archive path is not configured (ARCHIVE_PATH or --archive-path)")
+
+    logging.basicConfig(
+        level=settings.log_level,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+
+    db = SessionLocal()
+    try:
+        archiver = PriceArchiver(RetentionRepository(db), PriceArchive(args.archive_path), args.after_months)
+        print(archiver.run())
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Дозагрузка пропущенной истории price_ticks из Deribit (public/get_index_chart_data).
+
+Запуск:
+    python -m src.application.backfill --days 30
+    python -m src.application.backfill --tickers btc_usd sol_usdc --dry-run
+"""
+import argparse
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Sequence, Tuple, Any
+from src.core.config import settings
+from src.domain.candles import ROLLUP_INTERVALS, bucket_start
+from src.domain.schemas import PriceTickCreate
+from src.infrastructure.archive import PriceArchive, get_price_archive
+from src.infrastructure.deribit_client import DeribitClient
+from src.infrastructure.resilience import TokenBucket
+from src.infrastructure.repositories import BackfillRepository, PriceRepository, RollupRepository
+
+logger = logging.getLogger(__name__)
+
+# Интервалы get_index_chart_data: Deribit отдает историю только за последний интервал
+CHART_RANGES: Tuple[Tuple[str, Optional[int]], ...] = (
+    ("1h", 60 * 60),
+    ("1d", 24 * 60 * 60),
+    ("2d", 2 * 24 * 60 * 60),
+    ("1m", 30 * 24 * 60 * 60),
+    ("1y", 365 * 24 * 60 * 60),
+    ("all", None),
+)
+
+Gap = Tuple[int, int]
+
+DAY = max(ROLLUP_INTERVALS)
+
+
+def chart_range(age: int) -> str:
+    """Самый короткий (и самый подробный) интервал, покрывающий age секунд до текущего момента"""
+    for name, seconds in CHART_RANGES:
+        if seconds is None or age <= seconds:
+            return name
+    return CHART_RANGES[-1][0]
+
+
+def is_covered(gap: Gap, checkpoints: Sequence[Gap]) -> bool:
+    """Дыра целиком лежит внутри уже обработанной (после дозагрузки дыры только дробятся)"""
+    return any(start <= gap[0] and gap[1] <= end for start, end in checkpoints)
+
+
+class Backfiller:
+    """
+    Находит дыры в истории тикеров и заполняет их из Deribit.
+
+    Дыры группируются по запросу (тикер, интервал графика), запросы идут
+    параллельно с ограничением числа одновременных и частоты. Тики пишутся
+    через bulk_upsert (повторная запись ничего не дублирует) вместе с роллапами,
+    а обработанная дыра сохраняется чекпоинтом, поэтому прерванный запуск
+    продолжится с необработанных дыр.
+
+    История старше порога хранения сырых тиков и заархивированные месяцы
+    удалены намеренно и дырами не считаются: поиск идет только от floor().
+    """
+
+    def __init__(
+        self,
+        prices: PriceRepository,
+        rollups: RollupRepository,
+        checkpoints: BackfillRepository,
+        client: DeribitClient,
+        min_gap: Optional[int] = None,
+        lookback_days: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        rate_limit: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        archive: Optional[PriceArchive] = None,
+        raw_days: Optional[int] = None
+    ):
+        self.prices = prices
+        self.rollups = rollups
+        self.checkpoints = checkpoints
+        self.client = client
+        self.min_gap = min_gap or settings.backfill_min_gap
+        self.lookback_days = lookback_days or settings.backfill_lookback_days
+        self.concurrency = concurrency or settings.backfill_concurrency
+        self.rate_limit = settings.backfill_rate_limit if rate_limit is None else rate_limit
+        self.batch_size = batch_size or settings.backfill_batch_size
+        self.archive = archive
+        self.raw_days = settings.retention_raw_days if raw_days is None else raw_days
+
+    def floor(self, ticker: str, now: int) -> Optional[int]:
+        """
+        Начало истории, которая должна лежать в БД сырыми тиками: максимум из
+        порога хранения (как в RetentionManager) и границы архива тикера.
+        """
+        bounds = []
+        if self.raw_days > 0:
+            bounds.append(bucket_start(now, DAY) - self.raw_days * DAY)
+        if self.archive is not None:
+            bounds.append(self.archive.upper_bound(ticker))
+        bounds = [bound for bound in bounds if bound is not None]
+        return max(bounds) if bounds else None
+
+    def plan(
+        self,
+        tickers: Sequence[str],
+        now: int,
+        since: Optional[int] = None,
+        force: bool = False
+    ) -> Dict[Tuple[str, str], List[Gap]]:
+        """Необработанные дыры, сгруппированные по запросу (тикер, интервал графика)"""
+        since = since if since is not None else now - self.lookback_days * 24 * 60 * 60
+        requests: Dict[Tuple[str, str], List[Gap]] = {}
+        for ticker in tickers:
+            date_from = max(since, self.floor(ticker, now) or since)
+            if date_from >= now:
+                continue
+            done = [] if force else self.checkpoints.get_checkpoints(ticker, date_from)
+            for gap in self.checkpoints.find_gaps(ticker, date_from, now, self.min_gap):
+                if not is_covered(gap, done):
+                    requests.setdefault((ticker, chart_range(now - gap[0])), []).append(gap)
+        return requests
+
+    async def run(
+        self,
+        tickers: Optional[Sequence[str]] = None,
+        now: Optional[int] = None,
+        since: Optional[int] = None,
+        dry_run: bool = False,
+        force: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Заполняет дыры с since (по умолчанию за последние lookback_days суток) до now.
+
+        Returns:
+            {"gaps": число дыр, "inserted": {тикер: строк}, "failed": [запросы с ошибкой]}
+        """
+        now = now or int(time.time())
+        requests = self.plan(tickers or settings.tracked_tickers, now, since, force)
+        report: Dict[str, Any] = {
+            "gaps": sum(len(gaps) for gaps in requests.values()),
+            "inserted": {},
+            "failed": [],
+        }
+        if dry_run or not requests:
+            report["plan"] = {f"{ticker}:{name}": gaps for (ticker, name), gaps in requests.items()}
+            return report
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # Свой лимит поверх общего лимита клиента: дозагрузка не должна выедать запас ингеста
+        limiter = TokenBucket(self.rate_limit, 1)
+
+        async def fetch(key: Tuple[str, str]):
+            async with semaphore:
+                await limiter.acquire()
+                return key, await self.client.get_index_chart_data(*key)
+
+        # Запись идет по мере получения ответов, в одном потоке (синхронная сессия)
+        for completed in asyncio.as_completed([fetch(key) for key in requests]):
+            (ticker, name), points = await completed
+            if points is None:
+                # Без чекпоинта: дыры этого запроса повторятся при следующем запуске
+                report["failed"].append(f"{ticker}:{name}")
+                continue
+            for gap in requests[(ticker, name)]:
+                inserted = self._store(ticker, gap, points, self.floor(ticker, now))
+                report["inserted"][ticker] = report["inserted"].get(ticker, 0) + inserted
+
+        logger.info(f"Backfill finished: {report}")
+        return report
+
+    def _store(self, ticker: str, gap: Gap, points: List[Dict[str, Any]], floor: Optional[int] = None) -> int:
+        """
+        Пишет точки внутри дыры пачками и сохраняет чекпоинт дыры. Если не
+        вставлено ничего, чекпоинт не сохраняется: дыра повторится при следующем запуске.
+
+        Порог floor пересчитывается перед записью (архиватор мог сдвинуть его
+        после планирования): свечи до него уже не сверяются с сырыми тиками,
+        поэтому существующие там не трогаются, создаются только недостающие.
+        """
+        ticks = [
+            PriceTickCreate(**point)
+            for point in points
+            if gap[0] <= point["timestamp"] < gap[1]
+        ]
+        inserted = 0
+        for offset in range(0, len(ticks), self.batch_size):
+            created = self.prices.bulk_upsert(ticks[offset:offset + self.batch_size], commit=False)
+            self.rollups.apply_ticks(created, keep_existing_before=floor)  # коммитит и тики, и роллапы
+            inserted += len(created)
+        if inserted:
+            self.checkpoints.save_checkpoint(ticker, gap[0], gap[1], inserted)
+        else:
+            logger.warning(f"Backfill of {ticker} gap {gap} inserted nothing, leaving it without checkpoint")
+        return inserted
+
+
+def create_backfiller(db, client: DeribitClient, **options) -> Backfiller:
+    """Собирает Backfiller на одной сессии (с архивом из настроек, если не передан)"""
+    options.setdefault("archive", get_price_archive())
+    return Backfiller(
+        PriceRepository(db),
+        RollupRepository(db),
+        BackfillRepository(db),
+        client,
+        **options
+    )
+
+
+def main() -> None:
+    from src.infrastructure.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Дозагрузка пропущенной истории цен из Deribit")
+    parser.add_argument("--tickers", nargs="+", help="Тикеры (по умолчанию TRACKED_TICKERS)")
+    parser.add_argument("--days", type=int, help="Глубина поиска дыр в сутках")
+    parser.add_argument("--min-gap", type=int, help="Минимальная длина дыры в секундах")
+    parser.add_argument("--dry-run", action="store_true", help="Только показать найденные дыры")
+    parser.add_argument("--force", action="store_true", help="Игнорировать чекпоинты")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=settings.log_level,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+
+    async def run() -> Dict[str, Any]:
+        client = DeribitClient()
+        try:
+            backfiller = create_backfiller(db, client, lookback_days=args.days, min_gap=args.min_gap)
+            return await backfiller.run(args.tickers, dry_run=args.dry_run, force=args.force)
+        finally:
+            await client.close()
+
+    db = SessionLocal()
+    try:
+        print(asyncio.run(run()))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
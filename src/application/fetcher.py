@@ -0,0 +1,69 @@
+from typing import List, Optional, Dict, Any
+import asyncio
+import logging
+import time
+from src.core.config import settings
+from src.infrastructure.deribit_client import DeribitClient
+from src.domain.schemas import PriceTickCreate
+
+logger = logging.getLogger(__name__)
+
+
+class PriceFetcher:
+    """Параллельно получает цены по набору индексов Deribit"""
+
+    def __init__(
+        self,
+        client: DeribitClient,
+        tickers: Optional[List[str]] = None,
+        concurrency: Optional[int] = None,
+        timestamp: Optional[int] = None
+    ):
+        self.client = client
+        self.tickers = list(tickers if tickers is not None else settings.tracked_tickers)
+        self.concurrency = concurrency or settings.fetch_concurrency
+        # Слот расписания: все тики запуска получают его вместо времени ответа
+        self.timestamp = timestamp
+
+    async def fetch_all(self) -> Dict[str, Any]:
+        """
+        Опрашивает все индексы, одновременно не более `concurrency` запросов.
+
+        Ошибка по одному индексу не влияет на остальные.
+
+        Returns:
+            {"ticks": [PriceTickCreate], "instruments": {ticker: статус и время запроса}}
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        outcomes = await asyncio.gather(
+            *(self._fetch_one(ticker, semaphore) for ticker in self.tickers)
+        )
+
+        ticks = [tick for tick, _ in outcomes if tick is not None]
+        instruments = {ticker: info for ticker, (_, info) in zip(self.tickers, outcomes)}
+        return {"ticks": ticks, "instruments": instruments}
+
+    async def _fetch_one(self, ticker: str, semaphore: asyncio.Semaphore):
+        """Получает цену одного индекса и замеряет время запроса"""
+        async with semaphore:
+            start_time = time.perf_counter()
+            try:
+                data = await self.client.get_index_price_by_name(ticker)
+                if data and self.timestamp is not None:
+                    data = {**data, "timestamp": self.timestamp}
+                tick = PriceTickCreate(**data) if data else None
+                error = None if tick else "no data"
+            except Exception as e:
+                tick, error = None, str(e)
+            elapsed_time = time.perf_counter() - start_time
+
+        if error:
+            logger.error(f"Error fetching {ticker}: {error}")
+        else:
+            logger.info(f"Fetched {ticker}: ${tick.price:,.2f}")
+
+        return tick, {
+            "status": "error" if error else "ok",
+            "elapsed": round(elapsed_time, 4),
+            "error": error,
+        }
@@ -0,0 +1,193 @@
+"""
+Чтение истории тикера сквозь архив Parquet и БД, от старых тиков к новым.
+
+Месяцы до PriceArchive.upper_bound читаются из архива и сливаются со строками
+БД тех же месяцев (они лежат там до очистки архиватором или вставлены позже,
+например бэкфиллом); начиная с границы архива история читается только из БД.
+Оба источника читаются пачками, поэтому месяц архива целиком в память не попадает.
+"""
+import asyncio
+from collections import namedtuple
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import numpy as np
+from src.domain.candles import CandleBuilder
+from src.infrastructure.archive import PriceArchive, month_of
+from src.infrastructure.partitions import add_months, month_start
+from src.infrastructure.repositories import AsyncPriceRepository
+
+# Строка архива с теми же полями, что строки Core из AsyncPriceRepository.stream_rows
+ArchivedRow = namedtuple("ArchivedRow", ["id", "ticker", "price", "timestamp", "created_at"])
+
+
+class HistoryReader:
+    """История тикера из БД и, если архив настроен, из архива"""
+
+    def __init__(self, repository: AsyncPriceRepository, archive: Optional[PriceArchive] = None):
+        self.repository = repository
+        self.archive = archive
+
+    async def archive_bound(self, ticker: str, date_from: Optional[int] = None) -> Optional[int]:
+        """Граница архива тикера, если период заходит в архив, иначе None"""
+        if self.archive is None:
+            return None
+        bound = await asyncio.to_thread(self.archive.upper_bound, ticker)
+        if bound is None or (date_from is not None and date_from >= bound):
+            return None
+        return bound
+
+    async def archived_chunks(
+        self,
+        ticker: str,
+        bound: int,
+        date_from: Optional[int] = None,
+        date_to: Optional[int] = None
+    ) -> AsyncIterator[List[Any]]:
+        """Тики периода до границы архива пачками: архив и строки БД без дубликатов по id"""
+        months = await asyncio.to_thread(self.archive.months, ticker)
+        first = await self.repository.get_first_timestamp(ticker, date_to=bound)
+        year, month = months[0]
+        if first is not None:
+            year, month = min((year, month), month_of(first))
+        if date_from is not None:
+            year, month = max((year, month), month_of(date_from))
+
+        while month_start(year, month) < bound:
+            start = month_start(year, month)
+            end = month_start(*add_months(year, month, 1)) - 1
+            if date_to is not None and start > date_to:
+                break
+            lower = start if date_from is None else max(start, date_from)
+            upper = end if date_to is None else min(end, date_to)
+
+            recent = self.repository.stream_rows(ticker, lower, upper)
+            try:
+                async for rows in merge_ascending(recent, self._archived_pages(ticker, year, month, lower, upper)):
+                    yield rows
+            finally:
+                await recent.aclose()
+            year, month = add_months(year, month, 1)
+
+    async def _archived_pages(
+        self,
+        ticker: str,
+        year: int,
+        month: int,
+        date_from: int,
+        date_to: int
+    ) -> AsyncIterator[List[ArchivedRow]]:
+        batches = self.archive.iter_month(ticker, year, month, date_from, date_to)
+        while True:
+            rows = await asyncio.to_thread(next, batches, None)
+            if rows is None:
+                return
+            yield [ArchivedRow(**row) for row in rows]
+
+    async def stream_rows(
+        self,
+        ticker: str,
+        date_from: Optional[int] = None,
+        date_to: Optional[int] = None
+    ) -> AsyncIterator[List[Any]]:
+        """То же, что AsyncPriceRepository.stream_rows, но вместе с архивом"""
+        bound = await self.archive_bound(ticker, date_from)
+        if bound is not None:
+            async for rows in self.archived_chunks(ticker, bound, date_from, date_to):
+                yield rows
+            if date_to is not None and date_to < bound:
+                return
+            date_from = bound
+
+        async for rows in self.repository.stream_rows(ticker, date_from, date_to):
+            yield rows
+
+    async def get_series(
+        self,
+        ticker: str,
+        date_from: Optional[int] = None,
+        date_to: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """То же, что AsyncPriceRepository.get_series, но вместе с архивом"""
+        bound = await self.archive_bound(ticker, date_from)
+        if bound is None:
+            return await self.repository.get_series(ticker, date_from, date_to, limit)
+
+        timestamps: List[int] = []
+        prices: List[float] = []
+        async for rows in self.archived_chunks(ticker, bound, date_from, date_to):
+            timestamps.extend(row.timestamp for row in rows)
+            prices.extend(float(row.price) for row in rows)
+            if limit and len(prices) >= limit:
+                return (
+                    np.array(timestamps[:limit], dtype=np.int64),
+                    np.array(prices[:limit], dtype=np.float64),
+                )
+
+        if date_to is None or date_to >= bound:
+            rest = limit - len(prices) if limit else None
+            recent_timestamps, recent_prices = await self.repository.get_series(ticker, bound, date_to, rest)
+            timestamps.extend(recent_timestamps.tolist())
+            prices.extend(recent_prices.tolist())
+        return np.array(timestamps, dtype=np.int64), np.array(prices, dtype=np.float64)
+
+    async def get_candles(
+        self,
+        ticker: str,
+        interval: int,
+        date_from: Optional[int] = None,
+        date_to: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        То же, что AsyncPriceRepository.get_candles, но вместе с архивом.
+        Граница архива — начало месяца, поэтому свечи (не длиннее суток) ее не пересекают.
+        """
+        bound = await self.archive_bound(ticker, date_from)
+        if bound is None:
+            return await self.repository.get_candles(ticker, interval, date_from, date_to)
+
+        builder = CandleBuilder(interval)
+        async for rows in self.archived_chunks(ticker, bound, date_from, date_to):
+            for row in rows:
+                builder.add(row.timestamp, row.price)
+        if date_to is not None and date_to < bound:
+            return builder.candles
+        return builder.candles + await self.repository.get_candles(ticker, interval, bound, date_to)
+
+
+async def merge_ascending(recent: AsyncIterator[List[Any]], archived: AsyncIterator[List[Any]]) -> AsyncIterator[List[Any]]:
+    """
+    Сливает два потока пачек, упорядоченных по (timestamp, id), в один такой же.
+
+    Строка может оказаться в обоих источниках, пока архиватор не удалил
+    ее из БД, поэтому дубликаты по id отбрасываются (остается строка БД).
+    """
+    def key(row):
+        return row.timestamp, row.id
+
+    left, right = await _pull(recent), await _pull(archived)
+    while left or right:
+        if not right:
+            yield left
+            left = await _pull(recent)
+            continue
+        if not left:
+            yield right
+            right = await _pull(archived)
+            continue
+
+        # Строки не новее конца любой из пачек можно отдать: раньше них в потоках ничего не осталось
+        bound = min(key(left[-1]), key(right[-1]))
+        ready_left = [row for row in left if key(row) <= bound]
+        seen = {row.id for row in ready_left}
+        ready = ready_left + [row for row in right if key(row) <= bound and row.id not in seen]
+        yield sorted(ready, key=key)
+        left = left[len(ready_left):] or await _pull(recent)
+        right = [row for row in right if key(row) > bound] or await _pull(archived)
+
+
+async def _pull(pages: AsyncIterator[List[Any]]) -> Optional[List[Any]]:
+    """Следующая непустая пачка потока или None"""
+    async for rows in pages:
+        if rows:
+            return list(rows)
+    return None
@@ -0,0 +1,157 @@
+"""
+Многоуровневое хранение истории: сырые тики -> минутные свечи -> часовые.
+
+Запуск:
+    python -m src.application.retention --dry-run
+    python -m src.application.retention --raw-days 30 --minute-months 6
+"""
+import argparse
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any
+from src.core.config import settings
+from src.domain.candles import ROLLUP_INTERVALS, bucket_start
+from src.infrastructure.partitions import add_months, month_start
+from src.infrastructure.repositories import RetentionRepository, RollupRepository
+
+logger = logging.getLogger(__name__)
+
+DAY = max(ROLLUP_INTERVALS)
+MINUTE = min(ROLLUP_INTERVALS)
+
+
+class RetentionManager:
+    """
+    Применяет политику хранения пачками.
+
+    Перед удалением сырых тиков минутные роллапы по ним сверяются с тиками
+    и при расхождении пересчитываются за сутки, поэтому свечи после удаления
+    сырых данных остаются точными. Часовые и дневные роллапы не удаляются.
+    """
+
+    def __init__(
+        self,
+        repository: RetentionRepository,
+        rollups: RollupRepository,
+        raw_days: Optional[int] = None,
+        minute_months: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        batch_pause: Optional[float] = None,
+        max_batches: Optional[int] = None
+    ):
+        self.repository = repository
+        self.rollups = rollups
+        self.raw_days = settings.retention_raw_days if raw_days is None else raw_days
+        self.minute_months = settings.retention_minute_months if minute_months is None else minute_months
+        self.batch_size = batch_size or settings.retention_batch_size
+        self.batch_pause = settings.retention_batch_pause if batch_pause is None else batch_pause
+        self.max_batches = max_batches or settings.retention_max_batches
+
+    def cutoffs(self, now: Optional[datetime] = None) -> Dict[str, Optional[int]]:
+        """Границы уровней (UNIX timestamp, выровнены по суткам); None — уровень бессрочный"""
+        now = now or datetime.now(timezone.utc)
+        raw = None
+        if self.raw_days > 0:
+            raw = bucket_start(int(now.timestamp()), DAY) - self.raw_days * DAY
+        minute = None
+        if self.minute_months > 0:
+            minute = month_start(*add_months(now.year, now.month, -self.minute_months))
+        return {"raw": raw, "minute": minute}
+
+    def report(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Dry-run: сколько строк и байт освободит запуск, ничего не удаляя"""
+        cutoffs = self.cutoffs(now)
+        result = {}
+
+        rows = self.repository.count_ticks(cutoffs["raw"]) if cutoffs["raw"] is not None else 0
+        result["raw"] = {
+            "cutoff": cutoffs["raw"],
+            "rows": rows,
+            "bytes": int(rows * self.repository.estimate_row_bytes("price_ticks")),
+        }
+
+        rows = self.repository.count_rollups(MINUTE, cutoffs["minute"]) if cutoffs["minute"] is not None else 0
+        result["minute"] = {
+            "cutoff": cutoffs["minute"],
+            "rows": rows,
+            "bytes": int(rows * self.repository.estimate_row_bytes("price_rollups")),
+        }
+        return result
+
+    def apply(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Даунсэмплит и удаляет просроченные данные, возвращает число удаленных строк"""
+        cutoffs = self.cutoffs(now)
+        result = {"raw": {"cutoff": cutoffs["raw"], "rows": 0, "rebuilt_days": 0},
+                  "minute": {"cutoff": cutoffs["minute"], "rows": 0}}
+
+        if cutoffs["raw"] is not None:
+            result["raw"]["rebuilt_days"] = self._downsample(cutoffs["raw"])
+            result["raw"]["rows"] = self._delete_batches(
+                lambda: self.repository.delete_ticks_batch(cutoffs["raw"], self.batch_size)
+            )
+
+        if cutoffs["minute"] is not None:
+            result["minute"]["rows"] = self._delete_batches(
+                lambda: self.repository.delete_rollups_batch(MINUTE, cutoffs["minute"], self.batch_size)
+            )
+
+        logger.info(f"Retention applied: {result}")
+        return result
+
+    def _downsample(self, cutoff: int) -> int:
+        """Досчитывает роллапы за сутки, где минутные свечи учли не все сырые тики"""
+        rebuilt = 0
+        for ticker in self.repository.get_expired_tickers(cutoff):
+            first, _ = self.rollups.get_tick_bounds(ticker)
+            for day in range(bucket_start(first, DAY), cutoff, DAY):
+                raw = self.repository.count_ticks(day + DAY, ticker=ticker, date_from=day)
+                # raw < rolled_up — сутки уже частично удалены прошлым запуском, их не трогаем
+                if raw > self.repository.count_rolled_up_ticks(ticker, day, day + DAY):
+                    self.rollups.rebuild_range(ticker, day, day + DAY)
+                    rebuilt += 1
+        return rebuilt
+
+    def _delete_batches(self, delete_batch) -> int:
+        total = 0
+        for _ in range(self.max_batches):
+            deleted = delete_batch()
+            total += deleted
+            if deleted < self.batch_size:
+                break
+            if self.batch_pause:
+                # Пауза между пачками дает место конкурентной записи и автовакууму
+                time.sleep(self.batch_pause)
+        else:
+            logger.warning(f"Retention stopped after {self.max_batches} batches, will resume on next run")
+        return total
+
+
+def main() -> None:
+    from src.infrastructure.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Политика хранения price_ticks и price_rollups")
+    parser.add_argument("--dry-run", action="store_true", help="Только показать, сколько будет удалено")
+    parser.add_argument("--raw-days", type=int, help="Срок хранения сырых тиков в сутках")
+    parser.add_argument("--minute-months", type=int, help="Срок хранения минутных свечей в месяцах")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=settings.log_level,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+
+    db = SessionLocal()
+    try:
+        manager = RetentionManager(
+            RetentionRepository(db), RollupRepository(db), args.raw_days, args.minute_months
+        )
+        result = manager.report() if args.dry_run else manager.apply()
+        for tier, values in result.items():
+            print(f"{tier:<7} {values}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
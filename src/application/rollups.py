@@ -0,0 +1,84 @@
+"""
+Пересчет роллапов по истории сырых тиков.
+
+Запуск:
+    python -m src.application.rollups --ticker btc_usd --chunk-days 7
+    python -m src.application.rollups --date-from 1704067200 --date-to 1706745600
+"""
+import argparse
+import logging
+from typing import Optional, List, Dict
+from src.core.config import settings
+from src.domain.candles import ROLLUP_INTERVALS, bucket_start
+from src.infrastructure.repositories import RollupRepository
+
+logger = logging.getLogger(__name__)
+
+
+class RollupRebuilder:
+    """Пересчитывает роллапы кусками по N суток, каждый кусок в своей транзакции"""
+
+    def __init__(self, repository: RollupRepository, chunk_days: int = 1):
+        self.repository = repository
+        self.chunk_seconds = chunk_days * max(ROLLUP_INTERVALS)
+
+    def rebuild(
+        self,
+        tickers: Optional[List[str]] = None,
+        date_from: Optional[int] = None,
+        date_to: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Пересчитывает роллапы по указанным тикерам (по умолчанию по всем).
+
+        Returns:
+            Количество обработанных тиков по каждому тикеру
+        """
+        day = max(ROLLUP_INTERVALS)
+        processed = {}
+
+        for ticker in tickers or self.repository.get_tickers():
+            bounds = self.repository.get_tick_bounds(ticker)
+            if bounds is None:
+                processed[ticker] = 0
+                continue
+
+            # Выравниваем по суткам, чтобы не пересчитывать свечи частично
+            start = bucket_start(date_from if date_from is not None else bounds[0], day)
+            end = bucket_start(date_to if date_to is not None else bounds[1], day) + day
+
+            processed[ticker] = 0
+            for chunk_start in range(start, end, self.chunk_seconds):
+                chunk_end = min(chunk_start + self.chunk_seconds, end)
+                processed[ticker] += self.repository.rebuild_range(ticker, chunk_start, chunk_end)
+
+            logger.info(f"Rebuilt rollups for {ticker}: {processed[ticker]} ticks")
+
+        return processed
+
+
+def main() -> None:
+    from src.infrastructure.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Пересчет роллапов price_rollups")
+    parser.add_argument("--ticker", action="append", help="Тикер (можно несколько раз), по умолчанию все")
+    parser.add_argument("--date-from", type=int, help="UNIX timestamp начала")
+    parser.add_argument("--date-to", type=int, help="UNIX timestamp конца")
+    parser.add_argument("--chunk-days", type=int, default=1, help="Размер куска в сутках")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=settings.log_level,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+
+    db = SessionLocal()
+    try:
+        rebuilder = RollupRebuilder(RollupRepository(db), args.chunk_days)
+        rebuilder.rebuild(args.ticker, args.date_from, args.date_to)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
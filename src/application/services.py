@@ -1,84 +1,155 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, AsyncIterator
 import logging
 import asyncio
+import csv
+import io
+import json
 from src.infrastructure.deribit_client import DeribitClient
-from src.infrastructure.repositories import PriceRepository
-from src.domain.schemas import PriceTickCreate, PriceTickResponse
+from src.application.fetcher import PriceFetcher
+from sqlalchemy.orm import Session
+from src.core.config import settings
+from src.infrastructure.repositories import PriceRepository, AsyncPriceRepository, RollupRepository
+from src.infrastructure.cache import LatestPriceCache, get_price_cache
+from src.infrastructure.live import PriceHub, get_price_hub
+from src.infrastructure.archive import PriceArchive, merge_pages
+from src.application.history import HistoryReader
+from src.infrastructure.metrics import observe_ingest
+from src.domain.schemas import PriceTickCreate, PriceTickResponse, CandleResponse
+from src.domain.candles import CANDLE_INTERVALS, ROLLUP_INTERVALS, merge_candles
+from src.domain.pagination import encode_cursor, decode_cursor
 from src.domain.models import PriceTick
 
 logger = logging.getLogger(__name__)
 
 
+def _page(records: List[Any], limit: int) -> Tuple[List[PriceTickResponse], Optional[str]]:
+    """Отрезает лишнюю запись, запрошенную для проверки наличия следующей страницы"""
+    items = [PriceTickResponse.model_validate(record) for record in records[:limit]]
+    next_cursor = None
+    if len(records) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last.timestamp, last.id)
+    return items, next_cursor
+
+
 class PriceService:
     """Сервис для работы с ценами"""
     
-    def __init__(self, repository: PriceRepository):
+    def __init__(
+        self,
+        repository: PriceRepository,
+        client: Optional[DeribitClient] = None,
+        cache: Optional[LatestPriceCache] = None,
+        rollups: Optional[RollupRepository] = None,
+        archive: Optional[PriceArchive] = None,
+        hub: Optional[PriceHub] = None,
+        buffer=None
+    ):
         self.repository = repository
+        # Внешний клиент (например, из WorkerRuntime) живет дольше сервиса и не закрывается им
+        self.client = client
+        self.cache = cache
+        self.rollups = rollups
+        self.archive = archive
+        self.hub = hub
+        # Буфер write-behind: полученные тики уходят в него, а пишет их GroupCommitFlusher
+        self.buffer = buffer
         
     async def fetch_and_store_prices_async(self) -> List[Dict[str, Any]]:
         """
         Асинхронно получает и сохраняет текущие цены с Deribit.
         Использует aiohttp для асинхронных запросов.
         """
-        results = []
-        client = DeribitClient()
+        report = await self.fetch_and_store_report_async()
+        return report["prices"]
+
+    async def fetch_and_store_report_async(
+        self,
+        tickers: Optional[List[str]] = None,
+        timestamp: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Получает цены по всем отслеживаемым индексам и сохраняет их одной пачкой.
+        С timestamp (слот расписания) он становится временем всех тиков.
+
+        Ошибки запроса к Deribit логируются и дают пустой отчет, а ошибки
+        записи пробрасываются: задача должна повторить или провалить запуск.
+
+        Returns:
+            {"prices": [...], "instruments": {ticker: статус и время запроса}}
+        """
+        report = {"prices": [], "instruments": {}}
+        client = self.client or DeribitClient()
         
         try:
-            # Получаем цены для BTC и ETH параллельно
-            btc_task = client.get_index_price("BTC")
-            eth_task = client.get_index_price("ETH")
-            
-            btc_data, eth_data = await asyncio.gather(
-                btc_task, eth_task, 
-                return_exceptions=True
-            )
-            
-            # Обрабатываем BTC
-            if isinstance(btc_data, Exception):
-                logger.error(f"Error fetching BTC: {btc_data}")
-            elif btc_data:
-                ticker_data = PriceTickCreate(**btc_data)
-                saved = self.repository.create(ticker_data)
-                results.append({
-                    "ticker": saved.ticker,
-                    "price": float(saved.price),
-                    "timestamp": saved.timestamp
-                })
-                logger.info(f"Fetched BTC: ${btc_data['price']:,.2f}")
-            
-            # Обрабатываем ETH
-            if isinstance(eth_data, Exception):
-                logger.error(f"Error fetching ETH: {eth_data}")
-            elif eth_data:
-                ticker_data = PriceTickCreate(**eth_data)
-                saved = self.repository.create(ticker_data)
-                results.append({
-                    "ticker": saved.ticker,
-                    "price": float(saved.price),
-                    "timestamp": saved.timestamp
-                })
-                logger.info(f"Fetched ETH: ${eth_data['price']:,.2f}")
-                
+            fetched = await PriceFetcher(client, tickers, timestamp=timestamp).fetch_all()
         except Exception as e:
-            logger.error(f"Error in fetch_and_store_prices_async: {e}")
+            logger.error(f"Error in fetch_and_store_report_async: {e}")
+            return report
         finally:
-            await client.close()
-            
-        return results
+            if client is not self.client:
+                await client.close()
+
+        report["instruments"] = fetched["instruments"]
+        # Все цены сохраняются одним запросом
+        ticks = fetched["ticks"]
+        if self.buffer is not None:
+            await self.buffer.put(ticks)
+        else:
+            self.store_ticks(ticks)
+        report["prices"] = [
+            {
+                "ticker": tick.ticker,
+                "price": float(tick.price),
+                "timestamp": tick.timestamp
+            }
+            for tick in ticks
+        ]
+        return report
     
     def fetch_and_store_prices_sync(self) -> List[Dict[str, Any]]:
         """
         Синхронная версия для Celery задач.
         Celery не поддерживает асинхронные функции напрямую.
         """
+        return self.fetch_and_store_report_sync()["prices"]
+
+    def fetch_and_store_report_sync(self, tickers: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Синхронная версия fetch_and_store_report_async для Celery задач"""
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         try:
-            result = loop.run_until_complete(self.fetch_and_store_prices_async())
+            result = loop.run_until_complete(self.fetch_and_store_report_async(tickers))
             return result
         finally:
             loop.close()
 
+    def store_ticks(self, ticks: List[PriceTickCreate]) -> List[Any]:
+        """
+        Единая точка записи цен: пачка сохраняется одним bulk_upsert,
+        в той же транзакции обновляются роллапы, затем кэш последних цен
+        и рассылка новых тиков подписчикам.
+        """
+        created = self.repository.bulk_upsert(ticks, commit=self.rollups is None)
+        if self.rollups is not None:
+            self.rollups.apply_ticks(created)
+        observe_ingest(len(ticks), created)
+
+        if self.cache is not None:
+            latest: Dict[str, Any] = {}
+            for record in created:
+                if record.ticker not in latest or latest[record.ticker].timestamp < record.timestamp:
+                    latest[record.ticker] = record
+            self.cache.set_latest_many(PriceTickResponse.model_validate(record) for record in latest.values())
+
+        if self.hub is not None and created:
+            self.hub.publish([
+                PriceTickResponse.model_validate(record)
+                for record in sorted(created, key=lambda record: record.timestamp)
+            ])
+
+        return created
+
     def get_all_prices(self, ticker: str, limit: Optional[int] = 100) -> List[PriceTickResponse]:
         """Получает все цены по тикеру"""
         records = self.repository.get_all_by_ticker(ticker, limit)
@@ -95,8 +166,226 @@ class PriceService:
         self, 
         ticker: str, 
         date_from: Optional[int] = None,
+        date_to: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[PriceTickResponse], Optional[str]]:
+        """
+        Получает страницу цен за период (из БД и, если настроен, из архива).
+
+        Returns:
+            (цены, курсор следующей страницы или None)
+
+        Raises:
+            ValueError: если курсор поврежден
+        """
+        limit = limit or settings.default_page_size
+        position = decode_cursor(cursor) if cursor else None
+        records = self.repository.get_by_date_range(ticker, date_from, date_to, limit + 1, position)
+        if self.archive is not None:
+            archived = self.archive.read_range(ticker, date_from, date_to, limit + 1, position)
+            records = merge_pages(records, archived, limit + 1)
+        return _page(records, limit)
+
+
+def create_price_service(db: Session, client: Optional[DeribitClient] = None, buffer=None) -> PriceService:
+    """Собирает PriceService для ингеста: цены, роллапы, кэш последних цен и рассылка"""
+    return PriceService(
+        PriceRepository(db),
+        client=client,
+        cache=get_price_cache(),
+        rollups=RollupRepository(db),
+        hub=get_price_hub(),
+        buffer=buffer
+    )
+
+
+class AsyncPriceService:
+    """Асинхронный сервис чтения цен для FastAPI"""
+
+    def __init__(
+        self,
+        repository: AsyncPriceRepository,
+        cache: Optional[LatestPriceCache] = None,
+        archive: Optional[PriceArchive] = None
+    ):
+        self.repository = repository
+        self.cache = cache
+        self.archive = archive
+        self.history = HistoryReader(repository, archive)
+
+    async def get_all_prices(
+        self,
+        ticker: str,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[PriceTickResponse], Optional[str]]:
+        """
+        Получает страницу цен по тикеру.
+
+        Returns:
+            (цены, курсор следующей страницы или None)
+
+        Raises:
+            ValueError: если курсор поврежден
+        """
+        return await self.get_prices_by_date_range(ticker, limit=limit, cursor=cursor)
+
+    async def get_last_price(self, ticker: str) -> Optional[PriceTickResponse]:
+        """Получает последнюю цену (сначала из кэша)"""
+        if self.cache is not None:
+            price = await self.cache.get_latest(ticker)
+            if price is not None:
+                return price
+
+        record = await self.repository.get_last_price(ticker)
+        if not record:
+            return None
+
+        price = PriceTickResponse.model_validate(record)
+        if self.cache is not None:
+            await self.cache.populate(price)
+        return price
+
+    async def get_prices_by_date_range(
+        self,
+        ticker: str,
+        date_from: Optional[int] = None,
+        date_to: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[PriceTickResponse], Optional[str]]:
+        """
+        Получает страницу цен за период.
+
+        Returns:
+            (цены, курсор следующей страницы или None)
+
+        Raises:
+            ValueError: если курсор поврежден
+        """
+        limit = limit or settings.default_page_size
+        records = await self._fetch(
+            self.repository.get_by_date_range, ticker, date_from, date_to, limit, cursor
+        )
+        return _page(records, limit)
+
+    async def get_price_rows(
+        self,
+        ticker: str,
+        date_from: Optional[int] = None,
+        date_to: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Any], Optional[str]]:
+        """
+        Та же страница, что get_prices_by_date_range, но без ORM и Pydantic:
+        строки Core (или словари архива) для прямой сериализации в JSON.
+
+        Returns:
+            (строки с полями PriceTickResponse, курсор следующей страницы или None)
+
+        Raises:
+            ValueError: если курсор поврежден
+        """
+        limit = limit or settings.default_page_size
+        records = await self._fetch(
+            self.repository.get_rows_by_date_range, ticker, date_from, date_to, limit, cursor
+        )
+        next_cursor = None
+        if len(records) > limit:
+            last = records[limit - 1]
+            next_cursor = (
+                encode_cursor(last["timestamp"], last["id"]) if isinstance(last, dict)
+                else encode_cursor(last.timestamp, last.id)
+            )
+        return records[:limit], next_cursor
+
+    async def _fetch(
+        self,
+        query,
+        ticker: str,
+        date_from: Optional[int],
+        date_to: Optional[int],
+        limit: int,
+        cursor: Optional[str]
+    ) -> List[Any]:
+        """Страница из БД (на одну запись больше limit) с догрузкой из архива"""
+        position = decode_cursor(cursor) if cursor else None
+        records = await query(ticker, date_from, date_to, limit + 1, position)
+        if self.archive is not None:
+            # Архив нужен, только если страница БД не заполнена или заходит
+            # в месяцы, которые уже лежат в архиве
+            bound = await asyncio.to_thread(self.archive.upper_bound, ticker)
+            if bound is not None and (len(records) <= limit or records[-1].timestamp < bound):
+                archived = await asyncio.to_thread(
+                    self.archive.read_range, ticker, date_from, date_to, limit + 1, position
+                )
+                records = merge_pages(records, archived, limit + 1)
+        return records
+
+    async def get_candles(
+        self,
+        ticker: str,
+        interval: str,
+        date_from: Optional[int] = None,
         date_to: Optional[int] = None
-    ) -> List[PriceTickResponse]:
-        """Получает цены за период"""
-        records = self.repository.get_by_date_range(ticker, date_from, date_to)
-        return [PriceTickResponse.from_orm(record) for record in records]
+    ) -> List[CandleResponse]:
+        """
+        Получает OHLC-свечи за период.
+
+        По умолчанию читает роллапы: 1m/1h/1d напрямую, 5m укрупняет из 1m.
+        Свечи роллапов берутся целиком, даже если date_from попадает в середину свечи.
+        Свечи из сырых тиков считаются и по заархивированным месяцам.
+        """
+        seconds = CANDLE_INTERVALS[interval]
+
+        if settings.candles_source == "rollups":
+            rollup_interval = max(step for step in ROLLUP_INTERVALS if seconds % step == 0)
+            candles = await self.repository.get_rollup_candles(
+                ticker, rollup_interval, date_from, date_to
+            )
+            if rollup_interval != seconds:
+                candles = merge_candles(candles, seconds)
+        else:
+            candles = await self.history.get_candles(ticker, seconds, date_from, date_to)
+
+        return [CandleResponse(**candle) for candle in candles]
+
+    async def export_prices(
+        self,
+        ticker: str,
+        export_format: str = "ndjson",
+        date_from: Optional[int] = None,
+        date_to: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Выгружает историю тикера в NDJSON или CSV кусками байт.
+
+        Строки сериализуются напрямую, минуя ORM и Pydantic; набор полей
+        совпадает с PriceTickResponse. Заархивированные месяцы читаются из архива.
+        """
+        if export_format == "csv":
+            yield b"ticker,price,timestamp,id,created_at\r\n"
+
+        async for rows in self.history.stream_rows(ticker, date_from, date_to):
+            if export_format == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerows(
+                    (row.ticker, float(row.price), row.timestamp, row.id,
+                     row.created_at.isoformat() if row.created_at else "")
+                    for row in rows
+                )
+                yield buffer.getvalue().encode()
+            else:
+                yield "".join(
+                    json.dumps({
+                        "ticker": row.ticker,
+                        "price": float(row.price),
+                        "timestamp": row.timestamp,
+                        "id": row.id,
+                        "created_at": row.created_at.isoformat() if row.created_at else None,
+                    }) + "\n"
+                    for row in rows
+                ).encode()
@@ -0,0 +1,83 @@
+"""
+Разбиение инструментов ингеста на шарды по замеренной задержке.
+
+Шард опрашивается одной задачей Celery с fetch_concurrency параллельными
+запросами, поэтому его время оценивается как max(самый медленный инструмент,
+сумма задержек / concurrency). Число шардов растет с суммарной задержкой,
+и запуск масштабируется добавлением воркеров.
+"""
+import math
+from typing import Dict, List, Optional, Sequence
+from src.core.config import settings
+from src.infrastructure.lease import InstrumentLatencyStore
+
+
+def estimate_shard_seconds(latencies: Sequence[float], concurrency: int) -> float:
+    """Оценка времени шарда с concurrency одновременными запросами"""
+    if not latencies:
+        return 0.0
+    return max(max(latencies), sum(latencies) / concurrency)
+
+
+def plan_shards(
+    latencies: Dict[str, float],
+    concurrency: int,
+    target_seconds: float,
+    max_shard_size: int
+) -> List[List[str]]:
+    """
+    Делит инструменты на шарды с оценкой не больше target_seconds.
+
+    Число шардов — минимальное по бюджету времени и размеру шарда; инструменты
+    раскладываются жадно (LPT): самый медленный — в наименее загруженный шард.
+    """
+    if not latencies:
+        return []
+    total = sum(latencies.values())
+    count = max(
+        1,
+        math.ceil(total / (concurrency * target_seconds)),
+        math.ceil(len(latencies) / max_shard_size),
+    )
+    count = min(count, len(latencies))
+
+    shards: List[List[str]] = [[] for _ in range(count)]
+    loads = [0.0] * count
+    for ticker in sorted(latencies, key=lambda ticker: (-latencies[ticker], ticker)):
+        candidates = [index for index in range(count) if len(shards[index]) < max_shard_size]
+        index = min(candidates, key=lambda index: (loads[index], index))
+        shards[index].append(ticker)
+        loads[index] += latencies[ticker]
+    return [sorted(shard) for shard in shards if shard]
+
+
+class ShardPlanner:
+    """Строит шарды запуска по задержкам из InstrumentLatencyStore"""
+
+    def __init__(
+        self,
+        latencies: InstrumentLatencyStore,
+        target_seconds: Optional[float] = None,
+        max_shard_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        default_latency: Optional[float] = None
+    ):
+        self.latencies = latencies
+        self.target_seconds = target_seconds or settings.ingest_shard_target
+        self.max_shard_size = max_shard_size or settings.ingest_max_shard_size
+        self.concurrency = concurrency or settings.fetch_concurrency
+        self.default_latency = default_latency or settings.ingest_default_latency
+
+    def plan(self, tickers: Optional[Sequence[str]] = None) -> List[List[str]]:
+        tickers = list(dict.fromkeys(tickers if tickers is not None else settings.tracked_tickers))
+        measured = self.latencies.get(tickers)
+        latencies = {ticker: measured.get(ticker, self.default_latency) for ticker in tickers}
+        return plan_shards(latencies, self.concurrency, self.target_seconds, self.max_shard_size)
+
+    def record(self, instruments: Dict[str, Dict]) -> None:
+        """Обновляет замеры по отчету PriceFetcher; инструменты с ошибкой не учитываются"""
+        self.latencies.update({
+            ticker: info["elapsed"]
+            for ticker, info in instruments.items()
+            if info.get("status") == "ok"
+        })
@@ -0,0 +1,126 @@
+"""
+Потоковый сбор цен через WebSocket Deribit.
+
+Запуск:
+    python -m src.application.streaming
+"""
+import asyncio
+import logging
+import signal
+from typing import Dict, Optional
+from src.core.config import settings
+from src.domain.schemas import PriceTickCreate
+from src.infrastructure.deribit_stream import DeribitStreamClient
+from src.infrastructure.metrics import WRITE_BEHIND_COALESCED
+from src.infrastructure.tick_buffer import MemoryTickBuffer
+from src.application.services import PriceService, create_price_service
+from src.application.write_behind import GroupCommitFlusher
+
+logger = logging.getLogger(__name__)
+
+
+class StreamIngester:
+    """
+    Кладет тики из потока в буфер write-behind, GroupCommitFlusher пишет
+    их в price_ticks микро-пачками.
+
+    Сокет читается всегда, даже когда запись отстает: иначе некому ответить
+    на heartbeat test_request, и Deribit разорвет соединение. Пока буфер
+    полон, тики копятся в pending по одному на тикер (более свежий заменяет
+    предыдущий) и уходят в буфер с очередным тиком, как только в нем
+    появится место.
+    """
+
+    def __init__(
+        self,
+        stream: DeribitStreamClient,
+        service: PriceService,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        buffer: Optional[MemoryTickBuffer] = None
+    ):
+        self.stream = stream
+        self.service = service
+        self.buffer = buffer or MemoryTickBuffer()
+        self.pending: Dict[str, PriceTickCreate] = {}
+        self.flusher = GroupCommitFlusher(
+            self.buffer,
+            service.store_ticks,
+            batch_size or settings.stream_batch_size,
+            flush_interval or settings.stream_flush_interval,
+        )
+
+    @property
+    def stored(self) -> int:
+        return self.flusher.stored
+
+    async def run(self) -> None:
+        """Читает поток до вызова stop() и сбрасывает остаток буфера при выходе"""
+        flusher = asyncio.create_task(self.flusher.run())
+        try:
+            async for data in self.stream.ticks():
+                try:
+                    tick = PriceTickCreate(**data)
+                except ValueError as e:
+                    logger.error(f"Invalid tick from stream {data}: {e}")
+                    continue
+
+                # Несколько тиков одной секунды: внутри пачки bulk_upsert оставит последний,
+                # а если секунда уже записана прошлой пачкой, ON CONFLICT DO NOTHING сохранит
+                # первый (перезапись сломала бы инкрементальные роллапы по вставленным тикам)
+                await self._enqueue(tick)
+        finally:
+            if self.pending:
+                # Флашер еще работает, поэтому место в буфере освободится
+                await self.buffer.put(list(self.pending.values()))
+                self.pending.clear()
+            self.flusher.stop()
+            await flusher
+
+    async def _enqueue(self, tick: PriceTickCreate) -> None:
+        """Кладет тик в буфер без ожидания; при полном буфере оставляет последний тик тикера в pending"""
+        if not self.pending and await self.buffer.offer([tick]):
+            return
+        previous = self.pending.get(tick.ticker)
+        if previous is not None:
+            WRITE_BEHIND_COALESCED.inc()
+            if previous.timestamp > tick.timestamp:
+                tick = previous
+        self.pending[tick.ticker] = tick
+        if await self.buffer.offer(list(self.pending.values())):
+            self.pending.clear()
+
+    async def stop(self) -> None:
+        await self.stream.stop()
+
+    async def flush(self) -> None:
+        """Сохраняет накопленные тики, не дожидаясь флашера"""
+        await self.flusher.drain()
+
+
+def main() -> None:
+    from src.infrastructure.database import SessionLocal
+
+    logging.basicConfig(
+        level=settings.log_level,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+
+    async def run() -> None:
+        ingester = StreamIngester(DeribitStreamClient(), create_price_service(db))
+        # SIGTERM (docker stop) и SIGINT останавливают поток, run() сбрасывает буфер перед выходом
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, lambda: asyncio.ensure_future(ingester.stop()))
+        await ingester.run()
+        logger.info(f"Stream ingester stopped: {ingester.flusher.stats()}")
+
+    db = SessionLocal()
+    try:
+        asyncio.run(run())
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,58 @@
-from celery import shared_task
+from celery import chord, shared_task
 import logging
-from src.infrastructure.database import SessionLocal
-from src.application.services import PriceService
-from src.infrastructure.repositories import PriceRepository
+from datetime import datetime, timedelta, timezone
+from src.core.config import settings
+from src.infrastructure.database import SessionLocal, engine
+from src.infrastructure.partitions import PartitionManager
+from src.infrastructure.repositories import RetentionRepository, RollupRepository
+from src.application.retention import RetentionManager
+from src.application.archiver import PriceArchiver
+from src.application.backfill import create_backfiller
+from src.infrastructure.archive import get_price_archive
+from src.infrastructure.metrics import TASK_DURATION, INGEST_SHARDS, INGEST_SKIPPED_RUNS
+from src.infrastructure.lease import InstrumentLatencyStore, RedisLease, get_coordination_redis
+from src.infrastructure.scheduling import is_expired
+from src.application.sharding import ShardPlanner
+from src.application.services import create_price_service
+from src.infrastructure.worker_runtime import worker_runtime
 import time
 
 logger = logging.getLogger(__name__)
 
 
+def _fetch_and_store(tickers=None, slot=None):
+    """Опрашивает индексы через runtime воркера и сохраняет цены одной пачкой"""
+    db = SessionLocal()
+    try:
+        # Для pool=solo сигнал worker_process_init не приходит, поэтому запускаем лениво
+        worker_runtime.start()
+        service = create_price_service(db, client=worker_runtime.client, buffer=worker_runtime.buffer)
+        return worker_runtime.run(service.fetch_and_store_report_async(tickers, timestamp=slot))
+    finally:
+        db.close()
+
+
 @shared_task(bind=True, max_retries=3)
-def fetch_and_store_prices_task(self):
+def fetch_and_store_prices_task(self, slot=None):
     """
-    Celery задача для получения и сохранения цен каждую минуту.
+    Celery задача для получения и сохранения всех цен одним процессом.
+    С slot (начало слота расписания) тики получают его время,
+    а после дедлайна слота задача не выполняется и не повторяется.
     """
     task_id = self.request.id
     logger.info(f"[Task {task_id}] Starting fetch_and_store_prices_task")
+    if is_expired(slot):
+        logger.warning(f"[Task {task_id}] Slot {slot} missed its deadline, dropping")
+        return {"task_id": task_id, "status": "expired", "slot": slot}
     
-    db = SessionLocal()
+    start_time = time.time()
     try:
-        repository = PriceRepository(db)
-        service = PriceService(repository)
-        
-        # ИСПРАВЛЕНО: используем синхронную версию
-        start_time = time.time()
-        results = service.fetch_and_store_prices_sync()  # Было: fetch_and_store_prices()
+        report = _fetch_and_store(slot=slot)
+        results = report["prices"]
         elapsed_time = time.time() - start_time
         
         logger.info(f"[Task {task_id}] Successfully fetched {len(results)} prices in {elapsed_time:.2f}s")
+        TASK_DURATION.labels("fetch_and_store_prices", "success").observe(elapsed_time)
         
         return {
             "task_id": task_id,
@@ -34,15 +60,204 @@ def fetch_and_store_prices_task(self):
             "timestamp": time.time(),
             "prices_fetched": len(results),
             "prices": results,
+            "instruments": report["instruments"],
+            "deribit": worker_runtime.client.stats(),
             "execution_time": elapsed_time
         }
         
     except Exception as e:
         logger.error(f"[Task {task_id}] Failed to fetch prices: {str(e)}")
+        TASK_DURATION.labels("fetch_and_store_prices", "failure").observe(time.time() - start_time)
         
+        if is_expired(slot, time.time() + 30):
+            # Повтор пришелся бы на чужой слот
+            raise
         # Повторяем задачу через 30 секунд при ошибке
         raise self.retry(exc=e, countdown=30)
-        
+
+
+def _ingest_lease():
+    return RedisLease(get_coordination_redis(), "ingest", int(settings.ingest_lease_ttl * 1000))
+
+
+@shared_task
+def dispatch_ingest_task(tickers=None, slot=None):
+    """
+    Celery задача запуска ингеста по шардам (из beat на каждой границе слота).
+
+    Запуск, опоздавший к дедлайну слота, отбрасывается. Берет аренду
+    запуска: если предыдущий запуск еще идет, тик пропускается.
+    Шарды строятся по замерам задержки инструментов и уходят chord-ом
+    fetch_shard_task; finalize_ingest_task собирает итог и снимает аренду.
+    Если шард упал окончательно, аренда истечет через ingest_lease_ttl.
+    """
+    if is_expired(slot):
+        logger.warning(f"Ingest slot {slot} missed its deadline, dropping")
+        INGEST_SKIPPED_RUNS.labels("deadline").inc()
+        return {"status": "expired", "slot": slot}
+
+    lease = _ingest_lease()
+    token = lease.acquire()
+    if token is None:
+        logger.warning("Previous ingest run is still in progress, skipping")
+        INGEST_SKIPPED_RUNS.labels("overlap").inc()
+        return {"status": "skipped"}
+
+    try:
+        shards = ShardPlanner(InstrumentLatencyStore(get_coordination_redis())).plan(tickers)
+        if not shards:
+            lease.release(token)
+            return {"status": "success", "shards": []}
+        INGEST_SHARDS.observe(len(shards))
+        logger.info(f"Dispatching ingest run: {len(shards)} shards")
+        result = chord(fetch_shard_task.s(shard, slot) for shard in shards)(
+            finalize_ingest_task.s(token, time.time())
+        )
+    except Exception:
+        lease.release(token)
+        raise
+
+    return {"status": "dispatched", "slot": slot, "shards": shards, "result_id": result.id}
+
+
+@shared_task(bind=True, max_retries=3)
+def fetch_shard_task(self, tickers, slot=None):
+    """
+    Celery задача одного шарда: опрашивает и сохраняет свои индексы
+    и обновляет замеры их задержки для следующего разбиения.
+
+    После дедлайна слота шард не выполняется и не повторяется, но возвращает
+    результат, чтобы chord завершился и снял аренду запуска.
+    """
+    expired = {"tickers": tickers, "prices_fetched": 0, "instruments": {}, "execution_time": 0.0, "expired": True}
+    if is_expired(slot):
+        logger.warning(f"[Task {self.request.id}] Slot {slot} missed its deadline, dropping shard")
+        return expired
+
+    start_time = time.time()
+    try:
+        report = _fetch_and_store(tickers, slot)
+    except Exception as e:
+        logger.error(f"[Task {self.request.id}] Shard of {len(tickers)} tickers failed: {e}")
+        TASK_DURATION.labels("fetch_shard", "failure").observe(time.time() - start_time)
+        if is_expired(slot, time.time() + 5):
+            return expired
+        raise self.retry(exc=e, countdown=5)
+
+    elapsed_time = time.time() - start_time
+    TASK_DURATION.labels("fetch_shard", "success").observe(elapsed_time)
+    try:
+        ShardPlanner(InstrumentLatencyStore(get_coordination_redis())).record(report["instruments"])
+    except Exception as e:
+        # Без свежих замеров следующий запуск разобьется по старым
+        logger.error(f"Failed to record instrument latencies: {e}")
+
+    return {
+        "tickers": tickers,
+        "prices_fetched": len(report["prices"]),
+        "instruments": report["instruments"],
+        "execution_time": elapsed_time,
+        "expired": False,
+    }
+
+
+@shared_task
+def finalize_ingest_task(shards, token, started):
+    """Callback chord-а: сводка по шардам и снятие аренды запуска"""
+    _ingest_lease().release(token)
+    elapsed_time = time.time() - started
+    TASK_DURATION.labels("ingest_run", "success").observe(elapsed_time)
+
+    instruments = {}
+    for shard in shards:
+        instruments.update(shard["instruments"])
+    errors = sorted(ticker for ticker, info in instruments.items() if info["status"] != "ok")
+    logger.info(
+        f"Ingest run finished: {len(shards)} shards, "
+        f"{sum(shard['prices_fetched'] for shard in shards)} prices in {elapsed_time:.2f}s"
+    )
+    return {
+        "status": "success",
+        "shards": len(shards),
+        "prices_fetched": sum(shard["prices_fetched"] for shard in shards),
+        "errors": errors,
+        "expired_shards": sum(1 for shard in shards if shard["expired"]),
+        "slowest_shard": max(shard["execution_time"] for shard in shards),
+        "execution_time": elapsed_time,
+    }
+
+
+@shared_task
+def maintain_partitions_task():
+    """
+    Celery задача обслуживания секций price_ticks: создает будущие и прошлые
+    (за окно бэкфилла и для строк из секции по умолчанию) и отсоединяет
+    устаревшие. На БД без секционирования ничего не делает.
+    """
+    with engine.begin() as connection:
+        manager = PartitionManager(connection)
+        if not manager.is_partitioned():
+            logger.info("price_ticks is not partitioned, skipping maintenance")
+            return {"status": "skipped", "created": [], "detached": []}
+
+        since = datetime.now(timezone.utc) - timedelta(days=settings.backfill_lookback_days)
+        created = manager.ensure_partitions(settings.partition_months_ahead, since=since)
+        detached = manager.detach_old_partitions(settings.partition_retain_months)
+
+    logger.info(f"Partition maintenance: created={created}, detached={detached}")
+    return {"status": "success", "created": created, "detached": detached}
+
+
+@shared_task
+def apply_retention_task(dry_run: bool = False):
+    """
+    Celery задача политики хранения: даунсэмплит и удаляет просроченные
+    тики и минутные свечи пачками. С dry_run=True только считает объем.
+    """
+    db = SessionLocal()
+    try:
+        manager = RetentionManager(RetentionRepository(db), RollupRepository(db))
+        result = manager.report() if dry_run else manager.apply()
+        return {"status": "success", "dry_run": dry_run, "tiers": result}
+    finally:
+        db.close()
+
+
+@shared_task
+def archive_prices_task():
+    """
+    Celery задача переноса месяцев старше ARCHIVE_AFTER_MONTHS в архив Parquet.
+    Без ARCHIVE_PATH ничего не делает.
+    """
+    archive = get_price_archive()
+    if archive is None:
+        return {"status": "skipped", "months": {}}
+
+    db = SessionLocal()
+    try:
+        result = PriceArchiver(RetentionRepository(db), archive).run()
+        return {"status": "success", **result}
+    finally:
+        db.close()
+
+
+@shared_task
+def backfill_prices_task(tickers=None, lookback_days=None):
+    """
+    Celery задача дозагрузки дыр в истории цен из Deribit.
+    Обработанные дыры сохраняются чекпоинтами, повторный запуск их не трогает.
+    """
+    db = SessionLocal()
+    start_time = time.time()
+    try:
+        worker_runtime.start()
+        backfiller = create_backfiller(db, worker_runtime.client, lookback_days=lookback_days)
+        report = worker_runtime.run(backfiller.run(tickers))
+        TASK_DURATION.labels("backfill_prices", "success").observe(time.time() - start_time)
+        return {"status": "success", **report}
+    except Exception:
+        TASK_DURATION.labels("backfill_prices", "failure").observe(time.time() - start_time)
+        raise
     finally:
         db.close()
 
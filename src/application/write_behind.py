@@ -0,0 +1,181 @@
+"""
+Групповая запись тиков из буфера write-behind.
+
+Запуск флашера для буфера в Redis (WRITE_BEHIND_BACKEND=redis):
+    python -m src.application.write_behind
+"""
+import asyncio
+import logging
+import signal
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy.exc import InterfaceError, OperationalError
+from src.core.config import settings
+from src.domain.schemas import PriceTickCreate
+from src.infrastructure.metrics import WRITE_BEHIND_DEAD_LETTERS, WRITE_BEHIND_PENDING
+from src.infrastructure.tick_buffer import create_tick_buffer
+
+logger = logging.getLogger(__name__)
+
+# Ошибки соединения с БД: виновата не пачка, поэтому такие пачки повторяются без ограничения
+OUTAGE_ERRORS = (OperationalError, InterfaceError)
+
+
+class GroupCommitFlusher:
+    """
+    Забирает тики из буфера и пишет их пачками: как только набралось
+    batch_size тиков или прошло flush_interval секунд.
+
+    На буфер должен быть один флашер: пачки пишутся строго по очереди,
+    поэтому порядок тиков каждого тикера сохраняется. Неудачная пачка
+    возвращается в начало буфера и повторяется через retry_delay. После
+    max_attempts неудач подряд (не считая ошибок соединения с БД) пачка
+    делится пополам, пока битые тики не останутся поодиночке: они уходят
+    в dead-letter буфера, остальные записываются.
+    """
+
+    def __init__(
+        self,
+        buffer,
+        store: Callable[[List[PriceTickCreate]], List[Any]],
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        retry_delay: float = 1.0,
+        max_attempts: Optional[int] = None
+    ):
+        self.buffer = buffer
+        self.store = store
+        self.batch_size = batch_size or settings.write_behind_batch_size
+        self.flush_interval = flush_interval or settings.write_behind_flush_interval
+        self.retry_delay = retry_delay
+        self.max_attempts = max_attempts or settings.write_behind_max_attempts
+        self._attempts = 0
+        self._stopping = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self.stored = 0
+        self.batches = 0
+        self.failures = 0
+        self.dead_letters = 0
+
+    async def run(self) -> None:
+        """Пишет пачки до вызова stop(), затем сбрасывает остаток буфера"""
+        try:
+            while not self._stopping.is_set():
+                await self.buffer.wait(self.batch_size, self.flush_interval)
+                if await self.flush() is None:
+                    await self._sleep(self.retry_delay)
+        finally:
+            await self.drain()
+
+    def stop(self) -> None:
+        """Просит run() завершиться после текущей пачки и сбросить буфер"""
+        self._stopping.set()
+
+    async def flush(self) -> Optional[int]:
+        """
+        Записывает одну пачку (синхронный store выполняется в отдельном потоке).
+
+        Returns:
+            Число вставленных тиков или None, если запись не удалась
+        """
+        async with self._lock:
+            batch = await self.buffer.take(self.batch_size)
+            if not batch:
+                return 0
+            try:
+                created = await asyncio.to_thread(self.store, batch)
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Failed to flush {len(batch)} buffered ticks: {e}")
+                if not isinstance(e, OUTAGE_ERRORS):
+                    self._attempts += 1
+                if self._attempts < self.max_attempts:
+                    await self.buffer.requeue(batch)
+                    WRITE_BEHIND_PENDING.set(await self.buffer.size())
+                    return None
+                created = await self._isolate(batch)
+            WRITE_BEHIND_PENDING.set(await self.buffer.size())
+            if created is None:
+                return None
+            self._attempts = 0
+            self.batches += 1
+            self.stored += len(created)
+            return len(created)
+
+    async def _isolate(self, batch: List[PriceTickCreate]) -> Optional[List[Any]]:
+        """
+        Пишет пачку частями, деля неудачные части пополам; тик, который не пишется
+        и один, уходит в dead-letter. При ошибке соединения с БД незаписанные части
+        возвращаются в начало буфера.
+
+        Returns:
+            Вставленные записи или None, если деление прервала ошибка соединения
+        """
+        created: List[Any] = []
+        parts = [batch]
+        while parts:
+            part = parts.pop(0)
+            try:
+                created.extend(await asyncio.to_thread(self.store, part))
+            except Exception as e:
+                if isinstance(e, OUTAGE_ERRORS):
+                    await self.buffer.requeue([tick for rest in [part, *parts] for tick in rest])
+                    self.stored += len(created)
+                    return None
+                if len(part) > 1:
+                    middle = len(part) // 2
+                    parts[:0] = [part[:middle], part[middle:]]
+                    continue
+                logger.error(f"Dead-lettering tick {part[0].ticker}@{part[0].timestamp}: {e}")
+                await self.buffer.dead_letter(part)
+                self.dead_letters += 1
+                WRITE_BEHIND_DEAD_LETTERS.inc()
+        return created
+
+    async def drain(self) -> None:
+        """Записывает все, что осталось в буфере; при ошибке записи тики остаются в буфере"""
+        while await self.buffer.size():
+            if await self.flush() is None:
+                logger.error(f"Write-behind buffer not drained: {await self.buffer.size()} ticks left")
+                return
+
+    async def _sleep(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self._stopping.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "stored": self.stored,
+            "batches": self.batches,
+            "failures": self.failures,
+            "dead_letters": self.dead_letters,
+        }
+
+
+def main() -> None:
+    from src.infrastructure.database import SessionLocal
+    from src.application.services import create_price_service
+
+    logging.basicConfig(
+        level=settings.log_level,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+
+    async def run() -> None:
+        flusher = GroupCommitFlusher(create_tick_buffer("redis"), create_price_service(db).store_ticks)
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, flusher.stop)
+        await flusher.run()
+        logger.info(f"Write-behind flusher stopped: {flusher.stats()}")
+
+    db = SessionLocal()
+    try:
+        asyncio.run(run())
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import List
 
 
 class Settings(BaseSettings):
@@ -13,8 +14,132 @@ class Settings(BaseSettings):
     # Redis
     redis_url: str = "redis://localhost:6379/0"
 
+    # Cache
+    # redis | fakeredis | memory
+    cache_backend: str = "redis"
+    cache_local_ttl: float = 1.0
+    cache_redis_ttl: int = 300
+
+    # Live
+    # Рассылка новых тиков подписчикам /ws/prices и /prices/stream:
+    # redis — через pub/sub между узлами, fakeredis — в памяти (тесты), memory — только в процессе
+    live_backend: str = "redis"
+    # Очередь подписчика: при переполнении отбрасываются самые старые тики
+    live_queue_size: int = 256
+    # Интервал комментария-пинга SSE в простое, секунды
+    live_heartbeat: float = 15.0
+    live_max_tickers: int = 50
+
+    # API
+    default_page_size: int = 1000
+    max_page_size: int = 5000
+
+    # Storage
+    # Секции price_ticks (только PostgreSQL): сколько месяцев создавать заранее
+    # и сколько полных месяцев держать присоединенными (0 — не отсоединять)
+    partition_months_ahead: int = 3
+    partition_retain_months: int = 0
+    # Сроки хранения: сырые тики N суток, минутные свечи M месяцев,
+    # часовые и дневные — бессрочно (0 — хранить уровень бессрочно)
+    retention_raw_days: int = 0
+    retention_minute_months: int = 0
+    retention_batch_size: int = 5000
+    retention_batch_pause: float = 0.1
+    retention_max_batches: int = 1000
+    # Архив Parquet для холодной истории: каталог (пусто — архив выключен)
+    # и возраст в полных месяцах, после которого месяц уходит из БД в архив
+    archive_path: str = ""
+    archive_after_months: int = 3
+
+    # Analytics
+    # rollups — свечи из предрассчитанных таблиц, raw — агрегация сырых тиков
+    candles_source: str = "rollups"
+    # Максимум тиков, загружаемых в память одним запросом /analytics
+    analytics_max_points: int = 2_000_000
+    # Лимиты /analytics/correlation: число тикеров и точек во всех рядах пар (пары x сетка)
+    analytics_max_tickers: int = 10
+    analytics_max_pair_points: int = 1_000_000
+    # Время жизни in-process кэша матриц корреляций, секунды
+    analytics_cache_ttl: float = 30.0
+
     # Deribit
     deribit_base_url: str = "https://deribit.com/api/v2"
+    deribit_pool_size: int = 20
+    deribit_dns_cache_ttl: int = 300
+    deribit_keepalive_timeout: float = 75.0
+    deribit_ws_url: str = "wss://www.deribit.com/ws/api/v2"
+    deribit_connect_timeout: float = 2.0
+    # Таймаут одной попытки; общий бюджет запроса — попытки плюс паузы между ними
+    deribit_request_timeout: float = 5.0
+    # Клиентский лимит частоты (token bucket на процесс), запросов в секунду и размер всплеска
+    deribit_rate_limit: float = 20.0
+    deribit_rate_burst: int = 20
+    # Повторы с джиттером; бюджет повторов — не больше deribit_retry_rate повторов в секунду на процесс
+    deribit_max_retries: int = 2
+    deribit_retry_rate: float = 2.0
+    deribit_backoff_base: float = 0.1
+    deribit_backoff_max: float = 2.0
+    # Предохранитель на эндпоинт: размыкается после N ошибок подряд на reset секунд
+    deribit_breaker_failures: int = 5
+    deribit_breaker_reset: float = 30.0
+    # Дублирующий запрос, если ответа нет дольше квантиля задержки эндпоинта
+    deribit_hedge: bool = False
+    deribit_hedge_quantile: float = 0.95
+    deribit_hedge_min_samples: int = 20
+
+    # Ingestion
+    # Индексы Deribit, которые собираются на каждом запуске (в .env задается JSON-списком)
+    tracked_tickers: List[str] = ["btc_usd", "eth_usd"]
+    fetch_concurrency: int = 10
+    stream_batch_size: int = 500
+    stream_flush_interval: float = 1.0
+    # Периодичность запусков в секундах (от 1), выровненная по границам часов;
+    # запуск, не начатый за ingest_deadline секунд от начала слота, отбрасывается (0 — весь интервал)
+    ingest_interval: int = 60
+    ingest_deadline: float = 0.0
+    # Шардирование: запуск делится на шарды, каждый из которых по замерам задержки
+    # инструментов укладывается в ingest_shard_target секунд; шарды идут параллельно на воркерах
+    ingest_shard_target: float = 10.0
+    ingest_max_shard_size: int = 200
+    # Оценка задержки инструмента без замеров, секунды
+    ingest_default_latency: float = 0.5
+    # Аренда запуска: следующий тик beat пропускается, пока не завершились шарды предыдущего;
+    # брошенная аренда истекает через ingest_lease_ttl секунд
+    ingest_lease_ttl: float = 120.0
+    # redis | fakeredis (тесты)
+    ingest_coordination_backend: str = "redis"
+
+    # Write-behind
+    # Буфер тиков перед записью в БД: пусто — ингест пишет сам; redis — список Redis, который
+    # разбирает python -m src.application.write_behind; memory используется потоковым ингестом
+    write_behind_backend: str = ""
+    # Лимит буфера: при заполнении ингест ждет записи
+    write_behind_max_size: int = 100_000
+    write_behind_batch_size: int = 2000
+    write_behind_flush_interval: float = 0.5
+    # Пачка, не записанная столько раз подряд, делится пополам до отдельных тиков;
+    # тик, который не пишется и один, уходит в dead-letter (ошибки соединения с БД не считаются)
+    write_behind_max_attempts: int = 3
+
+    # Backfill
+    # Дыра в истории — интервал между соседними тиками длиннее backfill_min_gap секунд;
+    # дыры ищутся за последние backfill_lookback_days суток
+    backfill_min_gap: int = 180
+    backfill_lookback_days: int = 30
+    backfill_concurrency: int = 4
+    # Не больше стольких запросов к Deribit в секунду
+    backfill_rate_limit: float = 5.0
+    backfill_batch_size: int = 5000
+
+    # Profiling (все выключено по умолчанию)
+    # Доля запросов, профилируемых cProfile; 0 — только по заголовку
+    profiling_sample_rate: float = 0.0
+    profiling_dir: str = "profiles"
+    # Запрос с заголовком X-Profile: <token> профилируется всегда; пусто — заголовок игнорируется
+    profiling_token: str = ""
+    # Порог журнала медленных SQL в миллисекундах; 0 — журнал выключен
+    slow_query_threshold_ms: float = 0.0
+    slow_query_explain: bool = True
 
     # App
     app_name: str = "Crypto Tracker API"
@@ -25,6 +150,10 @@ class Settings(BaseSettings):
     def database_url(self) -> str:
         return f"postgresql://{self.postgres_user}:{self.postgres_password}@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
 
+    @property
+    def async_database_url(self) -> str:
+        return f"postgresql+asyncpg://{self.postgres_user}:{self.postgres_password}@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,121 @@
+import math
+from typing import Dict, Any
+import numpy as np
+
+# Блок EMA ограничен так, чтобы веса beta**-k внутри блока не выходили за 1e100
+EMA_MAX_WEIGHT_EXPONENT = 100 * math.log(10)
+EMA_MAX_BLOCK = 4096
+
+
+def log_returns(prices: np.ndarray) -> np.ndarray:
+    """Логарифмические доходности соседних тиков (длина n - 1)"""
+    return np.diff(np.log(prices))
+
+
+def rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """Суммы скользящего окна через кумулятивную сумму (длина n - window + 1)"""
+    if window > len(values):
+        return np.empty(0, dtype=np.float64)
+    cumulative = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+    return cumulative[window:] - cumulative[:-window]
+
+
+def sma(prices: np.ndarray, window: int) -> np.ndarray:
+    """Простое скользящее среднее; первое значение соответствует тику window - 1"""
+    return rolling_sum(prices, window) / window
+
+
+def realized_volatility(returns: np.ndarray, window: int) -> np.ndarray:
+    """Реализованная волатильность окна: корень из суммы квадратов лог-доходностей"""
+    # Квадраты неотрицательны, погрешность вычитания префиксных сумм не должна уводить в минус
+    return np.sqrt(np.maximum(rolling_sum(returns * returns, window), 0.0))
+
+
+def ema(prices: np.ndarray, span: int) -> np.ndarray:
+    """
+    Экспоненциальное среднее с alpha = 2 / (span + 1), ema[0] = prices[0].
+
+    Рекурсия ema[t] = beta * ema[t-1] + alpha * x[t] раскрывается внутри блока
+    в кумулятивную сумму x[k] * beta**-k, поэтому цикл идет по блокам, а не по тикам.
+    """
+    n = len(prices)
+    result = np.empty(n, dtype=np.float64)
+    if n == 0:
+        return result
+
+    alpha = 2.0 / (span + 1)
+    beta = 1.0 - alpha
+    if beta == 0.0:
+        result[:] = prices
+        return result
+
+    block = int(max(1, min(EMA_MAX_BLOCK, EMA_MAX_WEIGHT_EXPONENT // -math.log(beta))))
+    steps = np.arange(block, dtype=np.float64)
+    powers = beta ** steps              # beta**t
+    inverse = beta ** -steps            # beta**-k
+
+    previous = float(prices[0])
+    for start in range(0, n, block):
+        chunk = prices[start:start + block]
+        size = len(chunk)
+        weighted = np.cumsum(chunk * inverse[:size])
+        values = powers[:size] * (beta * previous + alpha * weighted)
+        result[start:start + size] = values
+        previous = values[-1]
+
+    return result
+
+
+def twap(timestamps: np.ndarray, prices: np.ndarray) -> float:
+    """Средняя цена, взвешенная по времени действия каждого тика до следующего"""
+    if len(prices) == 1:
+        return float(prices[0])
+    durations = np.diff(timestamps).astype(np.float64)
+    total = durations.sum()
+    if total == 0:
+        return float(prices.mean())
+    return float(np.dot(prices[:-1], durations) / total)
+
+
+def max_drawdown(prices: np.ndarray) -> Dict[str, Any]:
+    """
+    Максимальная просадка от исторического максимума.
+
+    Returns:
+        {"value": доля (<= 0), "peak": индекс максимума, "trough": индекс дна}
+    """
+    running_max = np.maximum.accumulate(prices)
+    drawdowns = prices / running_max - 1.0
+    trough = int(np.argmin(drawdowns))
+    peak = int(np.argmax(prices[:trough + 1]))
+    return {"value": float(drawdowns[trough]), "peak": peak, "trough": trough}
+
+
+def align_asof(grid: np.ndarray, timestamps: np.ndarray, prices: np.ndarray) -> np.ndarray:
+    """
+    Значения ряда на сетке grid: последняя цена с timestamp <= точки сетки
+    (forward-fill), NaN до первого тика.
+    """
+    positions = np.searchsorted(timestamps, grid, side="right") - 1
+    aligned = prices[np.maximum(positions, 0)].astype(np.float64)
+    aligned[positions < 0] = np.nan
+    return aligned
+
+
+def rolling_correlation(x: np.ndarray, y: np.ndarray, window: int) -> np.ndarray:
+    """Скользящая корреляция Пирсона двух рядов (длина n - window + 1), NaN при нулевой дисперсии"""
+    sum_x, sum_y = rolling_sum(x, window), rolling_sum(y, window)
+    covariance = rolling_sum(x * y, window) - sum_x * sum_y / window
+    variance_x = rolling_sum(x * x, window) - sum_x * sum_x / window
+    variance_y = rolling_sum(y * y, window) - sum_y * sum_y / window
+    denominator = np.sqrt(np.maximum(variance_x, 0.0) * np.maximum(variance_y, 0.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        correlation = covariance / denominator
+    correlation[denominator <= 1e-300] = np.nan
+    return np.clip(correlation, -1.0, 1.0)
+
+
+def correlation_matrix(returns: np.ndarray) -> np.ndarray:
+    """Матрица корреляций столбцов (ряд — строка), NaN для рядов без изменений"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.corrcoef(returns, rowvar=False).reshape(returns.shape[1], returns.shape[1])
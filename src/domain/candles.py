@@ -0,0 +1,127 @@
+from typing import Iterable, List, Dict, Any, Tuple
+
+# Поддерживаемые интервалы свечей в секундах
+CANDLE_INTERVALS = {
+    "1m": 60,
+    "5m": 5 * 60,
+    "1h": 60 * 60,
+    "1d": 24 * 60 * 60,
+}
+
+
+# Интервалы, для которых поддерживаются предрассчитанные роллапы (1m/1h/1d)
+ROLLUP_INTERVALS = (
+    CANDLE_INTERVALS["1m"],
+    CANDLE_INTERVALS["1h"],
+    CANDLE_INTERVALS["1d"],
+)
+
+
+def bucket_start(timestamp: int, interval: int) -> int:
+    """Начало интервала, в который попадает timestamp"""
+    return timestamp - timestamp % interval
+
+
+class CandleBuilder:
+    """Инкрементально собирает OHLC-свечи из тиков, отсортированных по времени"""
+
+    def __init__(self, interval: int):
+        self.interval = interval
+        self.candles: List[Dict[str, Any]] = []
+        self._current = None
+
+    def add(self, timestamp: int, price: float) -> None:
+        price = float(price)
+        bucket = bucket_start(timestamp, self.interval)
+
+        current = self._current
+        if current is None or current["bucket"] != bucket:
+            current = self._current = {
+                "bucket": bucket,
+                "open": price,
+                "high": price,
+                "low": price,
+                "close": price,
+                "count": 0,
+            }
+            self.candles.append(current)
+
+        if price > current["high"]:
+            current["high"] = price
+        if price < current["low"]:
+            current["low"] = price
+        current["close"] = price
+        current["count"] += 1
+
+
+def aggregate_candles(rows: Iterable[Tuple[int, float]], interval: int) -> List[Dict[str, Any]]:
+    """Собирает OHLC-свечи из тиков (timestamp, price), отсортированных по времени"""
+    builder = CandleBuilder(interval)
+    for timestamp, price in rows:
+        builder.add(timestamp, price)
+    return builder.candles
+
+
+def summarize_ticks(ticks: Iterable[Any], interval: int) -> List[Dict[str, Any]]:
+    """
+    Сворачивает пачку тиков (в любом порядке) в частичные свечи по (ticker, bucket).
+
+    Кроме OHLC сохраняет время открывающего и закрывающего тика: по ним
+    частичные свечи потом сливаются с уже сохраненными роллапами.
+    """
+    partials: Dict[Tuple[str, int], Dict[str, Any]] = {}
+
+    for tick in ticks:
+        price = float(tick.price)
+        key = (tick.ticker, bucket_start(tick.timestamp, interval))
+        partial = partials.get(key)
+
+        if partial is None:
+            partials[key] = {
+                "ticker": tick.ticker,
+                "interval": interval,
+                "bucket": key[1],
+                "open": price,
+                "open_time": tick.timestamp,
+                "high": price,
+                "low": price,
+                "close": price,
+                "close_time": tick.timestamp,
+                "count": 1,
+            }
+            continue
+
+        if tick.timestamp < partial["open_time"]:
+            partial["open"], partial["open_time"] = price, tick.timestamp
+        if tick.timestamp >= partial["close_time"]:
+            partial["close"], partial["close_time"] = price, tick.timestamp
+        partial["high"] = max(partial["high"], price)
+        partial["low"] = min(partial["low"], price)
+        partial["count"] += 1
+
+    return list(partials.values())
+
+
+def merge_candles(candles: Iterable[Dict[str, Any]], interval: int) -> List[Dict[str, Any]]:
+    """Укрупняет отсортированные по времени свечи до интервала interval (например 1m -> 5m)"""
+    merged: List[Dict[str, Any]] = []
+
+    for candle in candles:
+        bucket = bucket_start(candle["bucket"], interval)
+        if merged and merged[-1]["bucket"] == bucket:
+            current = merged[-1]
+            current["high"] = max(current["high"], candle["high"])
+            current["low"] = min(current["low"], candle["low"])
+            current["close"] = candle["close"]
+            current["count"] += candle["count"]
+        else:
+            merged.append({
+                "bucket": bucket,
+                "open": candle["open"],
+                "high": candle["high"],
+                "low": candle["low"],
+                "close": candle["close"],
+                "count": candle["count"],
+            })
+
+    return merged
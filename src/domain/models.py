@@ -1,16 +1,86 @@
-from sqlalchemy import Column, Integer, String, Numeric, DateTime
+from sqlalchemy import (
+    Column, Integer, String, Numeric, DateTime, UniqueConstraint, Index, PrimaryKeyConstraint, Sequence
+)
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.sql import func
 from src.infrastructure.database import Base
 
 
 class PriceTick(Base):
     __tablename__ = "price_ticks"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    ticker = Column(String(10), nullable=False, index=True)
+    # В PostgreSQL таблица секционирована по месяцам (RANGE по timestamp),
+    # см. миграцию 0004 и src/infrastructure/partitions.py. Ключ секционирования
+    # обязан входить в первичный ключ, поэтому он (id, timestamp), как в миграции.
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "timestamp", name="price_ticks_pkey", info={"sqlite_primary_key": ["id"]}),
+    )
+
+    id = Column(Integer, Sequence("price_ticks_id_seq"), nullable=False, index=True)
+    ticker = Column(String(10), nullable=False)
     price = Column(Numeric(12, 2), nullable=False)
-    timestamp = Column(Integer, nullable=False, index=True)
+    timestamp = Column(Integer, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     def __repr__(self):
         return f"<PriceTick(ticker='{self.ticker}', price={self.price}, timestamp={self.timestamp})>"
+
+
+@compiles(PrimaryKeyConstraint, "sqlite")
+def _compile_sqlite_primary_key(constraint, compiler, **kw):
+    # SQLite не умеет автоинкремент для составного ключа: там ключом остается
+    # один id (псевдоним rowid), уникальность (ticker, timestamp) держит индекс ниже
+    columns = constraint.info.get("sqlite_primary_key")
+    if columns:
+        return f"PRIMARY KEY ({', '.join(columns)})"
+    return compiler.visit_primary_key_constraint(constraint, **kw)
+
+
+# Одна запись на тикер в секунду: индекс служит и арбитром ON CONFLICT в bulk_upsert,
+# и отдает "последние N тиков тикера" без сортировки
+Index(
+    "ix_price_ticks_ticker_timestamp",
+    PriceTick.ticker,
+    PriceTick.timestamp.desc(),
+    unique=True
+)
+
+
+class PriceRollup(Base):
+    """Предрассчитанная OHLC-свеча по тикеру (1m/1h/1d), обновляется при ингесте"""
+    __tablename__ = "price_rollups"
+    __table_args__ = (
+        UniqueConstraint("ticker", "interval", "bucket", name="uq_price_rollups_ticker_interval_bucket"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    ticker = Column(String(10), nullable=False)
+    interval = Column(Integer, nullable=False)  # длина свечи в секундах
+    bucket = Column(Integer, nullable=False)  # UNIX timestamp начала свечи
+    open = Column(Numeric(12, 2), nullable=False)
+    high = Column(Numeric(12, 2), nullable=False)
+    low = Column(Numeric(12, 2), nullable=False)
+    close = Column(Numeric(12, 2), nullable=False)
+    open_time = Column(Integer, nullable=False)
+    close_time = Column(Integer, nullable=False)
+    count = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<PriceRollup(ticker='{self.ticker}', interval={self.interval}, bucket={self.bucket})>"
+
+
+class BackfillCheckpoint(Base):
+    """Обработанная дыра в истории тикера: [gap_from, gap_to) больше не запрашивается у Deribit"""
+    __tablename__ = "backfill_checkpoints"
+    __table_args__ = (
+        UniqueConstraint("ticker", "gap_from", "gap_to", name="uq_backfill_checkpoints_ticker_gap"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    ticker = Column(String(10), nullable=False)
+    gap_from = Column(Integer, nullable=False)  # UNIX timestamp, включительно
+    gap_to = Column(Integer, nullable=False)  # UNIX timestamp, не включая
+    rows = Column(Integer, nullable=False)  # сколько тиков вставлено
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<BackfillCheckpoint(ticker='{self.ticker}', gap=[{self.gap_from}, {self.gap_to}))>"
@@ -0,0 +1,23 @@
+import base64
+from typing import Tuple
+
+
+def encode_cursor(timestamp: int, record_id: int) -> str:
+    """Кодирует позицию (timestamp, id) последней записи страницы в непрозрачную строку"""
+    raw = f"{timestamp}:{record_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    """
+    Декодирует курсор в (timestamp, id).
+
+    Raises:
+        ValueError: если курсор поврежден
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, record_id = base64.urlsafe_b64decode(padded.encode()).decode().split(":")
+        return int(timestamp), int(record_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
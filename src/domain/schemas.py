@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, validator, ConfigDict
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 
 
@@ -22,6 +22,61 @@ class PriceTickResponse(PriceTickBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class CandleResponse(BaseModel):
+    """Схема OHLC-свечи"""
+    bucket: int = Field(..., description="UNIX timestamp начала интервала", example=1705672800)
+    open: float
+    high: float
+    low: float
+    close: float
+    count: int = Field(..., description="Количество тиков в интервале")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SeriesResponse(BaseModel):
+    """Схема временного ряда аналитики (колонками, а не списком точек)"""
+    ticker: str
+    metric: str
+    window: Optional[int] = Field(None, description="Размер окна в тиках")
+    timestamps: List[int]
+    values: List[float]
+
+
+class SummaryResponse(BaseModel):
+    """Схема сводной статистики по ряду цен"""
+    ticker: str
+    count: int
+    first: float
+    last: float
+    twap: float = Field(..., description="Средняя цена, взвешенная по времени")
+    realized_volatility: float = Field(..., description="Корень из суммы квадратов лог-доходностей")
+    max_drawdown: float = Field(..., description="Максимальная просадка (доля, <= 0)")
+    drawdown_peak: int = Field(..., description="UNIX timestamp максимума перед просадкой")
+    drawdown_trough: int = Field(..., description="UNIX timestamp дна просадки")
+
+
+class PairSeries(BaseModel):
+    """Спред, отношение и скользящая корреляция пары тикеров на общей сетке"""
+    base: str
+    quote: str
+    spread: List[float] = Field(..., description="base - quote")
+    ratio: List[float] = Field(..., description="base / quote")
+    correlation: List[Optional[float]] = Field(
+        ..., description="Скользящая корреляция лог-доходностей, null до заполнения окна"
+    )
+
+
+class CorrelationResponse(BaseModel):
+    """Схема матрицы корреляций и рядов по парам тикеров"""
+    tickers: List[str]
+    step: int = Field(..., description="Шаг сетки, секунды")
+    window: int = Field(..., description="Окно скользящей корреляции в шагах сетки")
+    timestamps: List[int]
+    matrix: List[List[Optional[float]]] = Field(..., description="Корреляции лог-доходностей за весь период")
+    pairs: List[PairSeries]
+
+
 class PriceFilter(BaseModel):
     """Схема для фильтрации цен"""
     ticker: str = Field(..., example="btc_usd")
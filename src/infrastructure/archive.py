@@ -0,0 +1,258 @@
+import heapq
+import itertools
+import logging
+import os
+from datetime import datetime, timezone
+from decimal import Decimal
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Tuple, Dict, Any, Iterable, Iterator
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from src.core.config import settings
+from src.infrastructure.partitions import add_months, month_start
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("ticker", pa.string()),
+    ("price", pa.decimal128(12, 2)),
+    ("timestamp", pa.int64()),
+    ("created_at", pa.timestamp("us", tz="UTC")),
+])
+
+
+class PriceArchive:
+    """
+    Холодный архив тиков в Parquet на локальном диске.
+
+    Раскладка в стиле Hive: {root}/ticker={ticker}/month={YYYY-MM}/data.parquet.
+    Внутри файла строки отсортированы по timestamp, поэтому статистика
+    row group позволяет читать только нужные куски; файлы открываются
+    через memory map.
+    """
+
+    file_name = "data.parquet"
+
+    def __init__(self, root: str, row_group_size: int = 65_536, compression: str = "zstd"):
+        self.root = Path(root)
+        self.row_group_size = row_group_size
+        self.compression = compression
+
+    def _path(self, ticker: str, year: int, month: int) -> Path:
+        return self.root / f"ticker={ticker}" / f"month={year:04d}-{month:02d}" / self.file_name
+
+    def months(self, ticker: str) -> List[Tuple[int, int]]:
+        """Заархивированные месяцы тикера, по возрастанию"""
+        result = []
+        for path in (self.root / f"ticker={ticker}").glob(f"month=*/{self.file_name}"):
+            year, month = path.parent.name.split("=", 1)[1].split("-")
+            result.append((int(year), int(month)))
+        return sorted(result)
+
+    def upper_bound(self, ticker: str) -> Optional[int]:
+        """Начало месяца, следующего за последним заархивированным (все тики архива меньше)"""
+        months = self.months(ticker)
+        if not months:
+            return None
+        return month_start(*add_months(*months[-1], 1))
+
+    def write_month(self, ticker: str, year: int, month: int, rows: Iterable[Any]) -> int:
+        """
+        Записывает тики месяца в архив, сливая с уже записанными.
+
+        Тики должны идти по возрастанию (timestamp, id), как их отдает
+        RetentionRepository.get_ticks: они пишутся кусками по row_group_size,
+        а уже записанный файл сливается с ними потоково, поэтому память не
+        зависит от размера месяца. Файл пишется во временный и атомарно
+        подменяется, поэтому читатели никогда не видят его наполовину записанным.
+
+        Returns:
+            Количество строк в файле месяца
+        """
+        path = self._path(ticker, year, month)
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return pq.ParquetFile(path).metadata.num_rows if path.exists() else 0
+
+        records = (_record(row) for row in itertools.chain([first], rows))
+        if path.exists():
+            # Повторная архивация месяца: строка, которая уже есть в файле, берется из новых
+            records = _unique(heapq.merge(records, self._records(path), key=_order))
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        count = 0
+        with pq.ParquetWriter(tmp_path, SCHEMA, compression=self.compression) as writer:
+            while True:
+                chunk = list(itertools.islice(records, self.row_group_size))
+                if not chunk:
+                    break
+                writer.write_table(pa.Table.from_pylist(chunk, schema=SCHEMA), row_group_size=self.row_group_size)
+                count += len(chunk)
+        os.replace(tmp_path, path)
+
+        logger.info(f"Archived {count} ticks of {ticker} for {year:04d}-{month:02d}")
+        return count
+
+    def _records(self, path: Path) -> Iterator[Dict[str, Any]]:
+        for batch in pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=self.row_group_size):
+            yield from batch.to_pylist()
+
+    def iter_month(
+        self,
+        ticker: str,
+        year: int,
+        month: int,
+        date_from: Optional[int] = None,
+        date_to: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Читает тики месяца за период (date_to включительно) пачками по возрастанию
+        (timestamp, id), не загружая файл целиком.
+        """
+        path = self._path(ticker, year, month)
+        if not path.exists():
+            return
+        parquet = pq.ParquetFile(path, memory_map=True)
+        groups = _row_groups(parquet, date_from, date_to)
+        if not groups:
+            return
+        for batch in parquet.iter_batches(batch_size=batch_size or self.row_group_size, row_groups=groups):
+            if date_to is not None and batch.column("timestamp")[0].as_py() > date_to:
+                return
+            rows = _in_range(batch, date_from, date_to).to_pylist()
+            if rows:
+                yield rows
+
+    def read_range(
+        self,
+        ticker: str,
+        date_from: Optional[int] = None,
+        date_to: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[Tuple[int, int]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Читает тики за период от новых к старым с той же семантикой,
+        что и AsyncPriceRepository.get_by_date_range (date_to включительно,
+        cursor — позиция (timestamp, id), после которой начинается страница).
+        Row group читаются с конца и только пока страница не набрана.
+        """
+        result: List[Dict[str, Any]] = []
+        upper = date_to
+        if cursor is not None:
+            upper = cursor[0] if upper is None else min(upper, cursor[0])
+
+        for year, month in reversed(self.months(ticker)):
+            start, end = month_start(year, month), month_start(*add_months(year, month, 1))
+            if upper is not None and start > upper:
+                continue
+            if date_from is not None and end <= date_from:
+                break
+
+            parquet = pq.ParquetFile(self._path(ticker, year, month), memory_map=True)
+            for group in reversed(_row_groups(parquet, date_from, upper)):
+                table = parquet.read_row_group(group)
+                table = _in_range(table, date_from, upper)
+                if cursor is not None:
+                    ts, row_id = cursor
+                    table = table.filter(pc.or_(
+                        pc.less(table["timestamp"], ts),
+                        pc.and_(pc.equal(table["timestamp"], ts), pc.less(table["id"], row_id)),
+                    ))
+
+                table = table.sort_by([("timestamp", "descending"), ("id", "descending")])
+                if limit is not None:
+                    table = table.slice(0, limit - len(result))
+                result.extend(table.to_pylist())
+                if limit is not None and len(result) >= limit:
+                    return result
+
+        return result
+
+
+def _record(row: Any) -> Dict[str, Any]:
+    return {
+        "id": row.id,
+        "ticker": row.ticker,
+        "price": Decimal(row.price).quantize(Decimal("0.01")),
+        "timestamp": row.timestamp,
+        "created_at": row.created_at,
+    }
+
+
+def _order(record: Dict[str, Any]) -> Tuple[int, int]:
+    return record["timestamp"], record["id"]
+
+
+def _unique(records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Первая из подряд идущих строк с одной позицией (timestamp, id)"""
+    last = None
+    for record in records:
+        if _order(record) != last:
+            last = _order(record)
+            yield record
+
+
+def _row_groups(parquet: pq.ParquetFile, date_from: Optional[int], date_to: Optional[int]) -> List[int]:
+    """Row group файла, которые по статистике timestamp могут содержать тики периода"""
+    column = parquet.schema_arrow.get_field_index("timestamp")
+    groups = []
+    for group in range(parquet.num_row_groups):
+        stats = parquet.metadata.row_group(group).column(column).statistics
+        if stats is not None and stats.has_min_max and (
+            (date_from is not None and stats.max < date_from) or (date_to is not None and stats.min > date_to)
+        ):
+            continue
+        groups.append(group)
+    return groups
+
+
+def _in_range(data: Any, date_from: Optional[int], date_to: Optional[int]) -> Any:
+    """Строки таблицы или пачки с date_from <= timestamp <= date_to"""
+    if date_from is not None:
+        data = data.filter(pc.greater_equal(data["timestamp"], date_from))
+    if date_to is not None:
+        data = data.filter(pc.less_equal(data["timestamp"], date_to))
+    return data
+
+
+def merge_pages(
+    recent: List[Any],
+    archived: List[Dict[str, Any]],
+    limit: Optional[int] = None
+) -> List[Any]:
+    """
+    Сливает строки БД и архива в один порядок (timestamp, id) по убыванию.
+
+    Строка может оказаться в обоих источниках, пока архиватор не удалил
+    ее из БД, поэтому дубликаты по id отбрасываются.
+    """
+    def key(row):
+        return (row["timestamp"], row["id"]) if isinstance(row, dict) else (row.timestamp, row.id)
+
+    seen = {key(row)[1] for row in recent}
+    merged = sorted(
+        list(recent) + [row for row in archived if row["id"] not in seen],
+        key=key,
+        reverse=True,
+    )
+    return merged[:limit] if limit is not None else merged
+
+
+def month_of(timestamp: int) -> Tuple[int, int]:
+    moment = datetime.fromtimestamp(timestamp, timezone.utc)
+    return moment.year, moment.month
+
+
+@lru_cache()
+def get_price_archive() -> Optional[PriceArchive]:
+    """Архив по settings.archive_path или None, если архив не настроен"""
+    if not settings.archive_path:
+        return None
+    return PriceArchive(settings.archive_path)
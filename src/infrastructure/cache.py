@@ -0,0 +1,209 @@
+import json
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, Hashable, Iterable, Optional
+import redis
+import redis.asyncio as aioredis
+from src.core.config import settings
+from src.domain.schemas import PriceTickResponse
+from src.infrastructure.metrics import PRICE_CACHE_ERRORS, PRICE_CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """Потокобезопасный in-process кэш с временем жизни записей"""
+
+    def __init__(self, ttl: float, max_size: int = 10_000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._data: Dict[Hashable, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            if len(self._data) >= self.max_size and key not in self._data:
+                # Вытесняем самую старую запись (dict сохраняет порядок вставки)
+                self._data.pop(next(iter(self._data)))
+            self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class LatestPriceCache:
+    """
+    Двухуровневый кэш последней цены по тикеру: память процесса + Redis.
+
+    Запись идет из ингеста (синхронный клиент), чтение из API (асинхронный).
+    В Redis цена хранится в sorted set со score = timestamp, поэтому
+    запоздавший тик не перезапишет более свежий. Попадания, промахи и ошибки
+    считаются в метриках Prometheus и, для процесса, в stats().
+    """
+
+    key_prefix = "prices:last:"
+
+    def __init__(
+        self,
+        redis_client: Optional[redis.Redis] = None,
+        async_redis_client: Optional[aioredis.Redis] = None,
+        local_ttl: Optional[float] = None,
+        redis_ttl: Optional[int] = None
+    ):
+        self.redis = redis_client
+        self.async_redis = async_redis_client
+        self.local = TTLCache(local_ttl if local_ttl is not None else settings.cache_local_ttl)
+        self.redis_ttl = redis_ttl or settings.cache_redis_ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, ticker: str) -> str:
+        return f"{self.key_prefix}{ticker}"
+
+    def set_latest(self, price: PriceTickResponse) -> None:
+        """Write-through из ингеста: обновляет оба уровня, если цена свежее"""
+        self.set_latest_many([price])
+
+    def set_latest_many(self, prices: Iterable[PriceTickResponse]) -> None:
+        """То же для пачки цен: все тикеры пишутся в Redis одним pipeline (один round trip)"""
+        prices = list(prices)
+        for price in prices:
+            cached = self.local.get(price.ticker)
+            if cached is None or cached.timestamp <= price.timestamp:
+                self.local.set(price.ticker, price)
+
+        if self.redis is None or not prices:
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for price in prices:
+                key = self._key(price.ticker)
+                pipe.zadd(key, {price.model_dump_json(): price.timestamp})
+                # Оставляем только элемент с максимальным timestamp
+                pipe.zremrangebyrank(key, 0, -2)
+                pipe.expire(key, self.redis_ttl)
+            pipe.execute()
+        except redis.RedisError as e:
+            self._error("write")
+            logger.error(f"Failed to update price cache for {len(prices)} tickers: {e}")
+
+    async def get_latest(self, ticker: str) -> Optional[PriceTickResponse]:
+        """Возвращает последнюю цену из памяти или Redis, None при промахе"""
+        price = self.local.get(ticker)
+        if price is not None:
+            self._hit()
+            return price
+
+        if self.async_redis is not None:
+            try:
+                members = await self.async_redis.zrange(self._key(ticker), -1, -1)
+            except redis.RedisError as e:
+                self._error("read")
+                logger.error(f"Failed to read price cache for {ticker}: {e}")
+                members = []
+            if members:
+                price = PriceTickResponse.model_validate(json.loads(members[0]))
+                self.local.set(ticker, price)
+                self._hit()
+                return price
+
+        self.misses += 1
+        PRICE_CACHE_LOOKUPS.labels("miss").inc()
+        return None
+
+    async def populate(self, price: PriceTickResponse) -> None:
+        """Заполняет кэш после промаха значением из БД"""
+        self.local.set(price.ticker, price)
+        if self.async_redis is None:
+            return
+        try:
+            key = self._key(price.ticker)
+            async with self.async_redis.pipeline() as pipe:
+                pipe.zadd(key, {price.model_dump_json(): price.timestamp})
+                pipe.zremrangebyrank(key, 0, -2)
+                pipe.expire(key, self.redis_ttl)
+                await pipe.execute()
+        except redis.RedisError as e:
+            self._error("populate")
+            logger.error(f"Failed to populate price cache for {price.ticker}: {e}")
+
+    def _hit(self) -> None:
+        self.hits += 1
+        PRICE_CACHE_LOOKUPS.labels("hit").inc()
+
+    def _error(self, operation: str) -> None:
+        self.errors += 1
+        PRICE_CACHE_ERRORS.labels(operation).inc()
+
+    def clear(self) -> None:
+        self.local.clear()
+        if self.redis is not None:
+            try:
+                keys = list(self.redis.scan_iter(f"{self.key_prefix}*"))
+                if keys:
+                    self.redis.delete(*keys)
+            except redis.RedisError as e:
+                logger.error(f"Failed to clear price cache: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+
+def create_price_cache(backend: Optional[str] = None) -> LatestPriceCache:
+    """
+    Создает кэш по настройке cache_backend:
+    redis — настоящий Redis по settings.redis_url, fakeredis — Redis в памяти
+    (для тестов), memory — только in-process уровень.
+    """
+    backend = backend or settings.cache_backend
+    if backend == "memory":
+        return LatestPriceCache()
+    if backend == "fakeredis":
+        import fakeredis
+        import fakeredis.aioredis
+
+        server = fakeredis.FakeServer()
+        return LatestPriceCache(
+            fakeredis.FakeRedis(server=server),
+            fakeredis.aioredis.FakeRedis(server=server),
+        )
+    return LatestPriceCache(
+        redis.Redis.from_url(settings.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5),
+        aioredis.Redis.from_url(settings.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5),
+    )
+
+
+@lru_cache()
+def get_price_cache() -> LatestPriceCache:
+    return create_price_cache()
+
+
+@lru_cache()
+def get_analytics_cache() -> TTLCache:
+    """Кэш результатов тяжелой аналитики (корреляции) в памяти процесса API"""
+    return TTLCache(settings.analytics_cache_ttl, max_size=256)
@@ -1,6 +1,11 @@
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
 import logging
 from src.core.config import settings
+from src.infrastructure.worker_runtime import worker_runtime
+from src.infrastructure.metrics import mark_process_dead
+from src.infrastructure.scheduling import AlignedSchedule
+import os
 
 logger = logging.getLogger(__name__)
 
@@ -26,11 +31,43 @@ celery_app.conf.update(
     task_track_started=True,
     task_time_limit=30 * 60,
     
-    # Расписание
+    # Расписание; слот и дедлайн запуска ингеста передает AlignedScheduler
+    beat_scheduler="src.infrastructure.scheduling:AlignedScheduler",
     beat_schedule={
         'fetch-prices-every-minute': {
-            'task': 'src.application.tasks.fetch_and_store_prices_task',
-            'schedule': 60.0,
+            'task': 'src.application.tasks.dispatch_ingest_task',
+            'schedule': AlignedSchedule(settings.ingest_interval),
+        },
+        'maintain-partitions-daily': {
+            'task': 'src.application.tasks.maintain_partitions_task',
+            'schedule': 24 * 60 * 60.0,
+        },
+        'archive-prices-daily': {
+            'task': 'src.application.tasks.archive_prices_task',
+            'schedule': 24 * 60 * 60.0,
+        },
+        'backfill-prices-daily': {
+            'task': 'src.application.tasks.backfill_prices_task',
+            'schedule': 24 * 60 * 60.0,
+        },
+        'apply-retention-hourly': {
+            'task': 'src.application.tasks.apply_retention_task',
+            'schedule': 60 * 60.0,
         },
     },
 )
+
+
+@worker_process_init.connect
+def start_worker_runtime(**kwargs):
+    """Поднимает общий loop и HTTP-сессию в каждом дочернем процессе воркера"""
+    worker_runtime.start()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def stop_worker_runtime(**kwargs):
+    """Закрывает HTTP-сессию и loop при остановке воркера"""
+    worker_runtime.stop()
+    # В multiprocess-режиме файлы метрик завершенного процесса больше не живые
+    mark_process_dead(os.getpid())
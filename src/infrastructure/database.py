@@ -1,6 +1,9 @@
+from pathlib import Path
+from typing import Optional
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from src.core.config import settings
 
 # Создаем engine для PostgreSQL
@@ -18,6 +21,27 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Асинхронный engine (asyncpg) для FastAPI, синхронный остается для Celery
+async_engine = create_async_engine(
+    settings.async_database_url,
+    echo=settings.debug,
+    pool_pre_ping=True,
+    pool_recycle=300,
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+# Журнал медленных запросов (с EXPLAIN) для обоих engine, только если задан порог
+if settings.slow_query_threshold_ms > 0:
+    from src.infrastructure.profiling import install_slow_query_log
+
+    for _engine in (engine, async_engine.sync_engine):
+        install_slow_query_log(_engine, settings.slow_query_threshold_ms, settings.slow_query_explain)
+
 # Базовый класс для моделей
 Base = declarative_base()
 
@@ -31,7 +55,26 @@ def get_db():
         db.close()
 
 
-def init_db():
-    """Инициализация базы данных - создает таблицы"""
-    from src.domain.models import PriceTick  # Импорт здесь чтобы избежать циклических зависимостей
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+async def get_async_db():
+    """Dependency для получения асинхронной сессии БД"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def init_db(url: Optional[str] = None):
+    """
+    Приводит схему БД к последней миграции (то же, что alembic upgrade head).
+
+    Схему описывают только миграции: create_all не учитывает секционирование
+    и ограничения, добавленные миграциями. БД, созданная раньше через create_all,
+    поднимается теми же миграциями, они пропускают уже существующие объекты.
+    """
+    from alembic import command
+    from alembic.config import Config
+
+    root = Path(__file__).resolve().parents[2]
+    config = Config()
+    config.set_main_option("script_location", str(root / "alembic"))
+    if url:
+        config.set_main_option("sqlalchemy.url", url.replace("%", "%%"))
+    command.upgrade(config, "head")
\ No newline at end of file
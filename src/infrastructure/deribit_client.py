@@ -1,66 +1,272 @@
 import aiohttp
 import asyncio
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from src.core.config import settings
+from src.infrastructure.metrics import (
+    DERIBIT_LATENCY,
+    DERIBIT_ERRORS,
+    DERIBIT_LIMITER_WAIT,
+    DERIBIT_RETRIES,
+    DERIBIT_HEDGES,
+    DERIBIT_BREAKER_OPEN,
+)
+from src.infrastructure.resilience import (
+    TokenBucket,
+    CircuitBreaker,
+    LatencyTracker,
+    backoff_delay,
+    hedged,
+)
 import time
 
 logger = logging.getLogger(__name__)
 
+# Код ошибки JSON-RPC Deribit при превышении лимита запросов
+TOO_MANY_REQUESTS_CODE = 10028
+
+
+class DeribitError(Exception):
+    """Ошибка запроса к Deribit; reason попадает в метку deribit_request_errors_total"""
+
+    reason = "error"
+    retryable = False
+
+    def __init__(self, message: str, reason: Optional[str] = None):
+        super().__init__(message)
+        if reason is not None:
+            self.reason = reason
+
+
+class DeribitAPIError(DeribitError):
+    """Deribit отклонил запрос (неверные параметры и т.п.): повтор не поможет"""
+
+    reason = "api_error"
+
+
+class DeribitUnavailableError(DeribitError):
+    """Временная ошибка (5xx, 429, too_many_requests): запрос можно повторить"""
+
+    retryable = True
+
+
+# Ошибки транспорта, после которых запрос повторяется
+RETRYABLE_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, DeribitUnavailableError)
+
 
 class DeribitClient:
-    """Асинхронный клиент для Deribit API"""
-    
-    def __init__(self):
-        self.base_url = settings.deribit_base_url
+    """
+    Асинхронный клиент для Deribit API.
+
+    Все запросы проходят через общий token bucket, предохранитель своего
+    эндпоинта и повторы с джиттером; при deribit_hedge медленный запрос
+    дублируется после квантиля задержки эндпоинта. Публичные методы
+    по-прежнему возвращают None при ошибке, причина видна в метриках и stats().
+    """
+
+    def __init__(self, base_url: Optional[str] = None, limiter: Optional[TokenBucket] = None):
+        self.base_url = base_url or settings.deribit_base_url
         self.session: Optional[aiohttp.ClientSession] = None
-        
+        self.limiter = limiter or TokenBucket(settings.deribit_rate_limit, settings.deribit_rate_burst)
+        self.retry_budget = TokenBucket(settings.deribit_retry_rate, max(settings.deribit_retry_rate, 1.0) * 5)
+        self.max_retries = settings.deribit_max_retries
+        self.hedge = settings.deribit_hedge
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.latencies: Dict[str, LatencyTracker] = {}
+        self.retries = 0
+        self.hedges = {"fired": 0, "won": 0}
+
     async def _get_session(self) -> aiohttp.ClientSession:
         """Создает или возвращает существующую сессию"""
         if self.session is None or self.session.closed:
-            timeout = aiohttp.ClientTimeout(total=10)
-            self.session = aiohttp.ClientSession(timeout=timeout)
+            # Таймаут одной попытки, а не всего запроса с повторами
+            timeout = aiohttp.ClientTimeout(
+                total=settings.deribit_request_timeout,
+                connect=settings.deribit_connect_timeout,
+            )
+            # Keep-alive пул и кэш DNS: повторные запросы не платят за TCP/TLS и резолвинг
+            connector = aiohttp.TCPConnector(
+                limit=settings.deribit_pool_size,
+                ttl_dns_cache=settings.deribit_dns_cache_ttl,
+                keepalive_timeout=settings.deribit_keepalive_timeout,
+            )
+            self.session = aiohttp.ClientSession(timeout=timeout, connector=connector)
         return self.session
-    
+
+    def _breaker(self, endpoint: str) -> CircuitBreaker:
+        if endpoint not in self.breakers:
+            self.breakers[endpoint] = CircuitBreaker(
+                endpoint, settings.deribit_breaker_failures, settings.deribit_breaker_reset
+            )
+            self.latencies[endpoint] = LatencyTracker()
+        return self.breakers[endpoint]
+
+    async def _request(self, endpoint: str, params: Dict[str, Any]) -> Any:
+        """
+        GET к эндпоинту с лимитом, предохранителем и повторами; возвращает поле result.
+
+        Raises:
+            CircuitOpenError, DeribitError или ошибка транспорта последней попытки
+        """
+        breaker = self._breaker(endpoint)
+        attempt = 0
+        while True:
+            breaker.before_call()
+            try:
+                result, hedge_won = await hedged(
+                    lambda: self._attempt(endpoint, params),
+                    self._hedge_delay(endpoint),
+                    on_hedge=lambda: self._count_hedge(endpoint, "fired"),
+                )
+            except DeribitAPIError:
+                # Сервис ответил: для предохранителя это не отказ
+                breaker.record_success()
+                raise
+            except RETRYABLE_ERRORS:
+                breaker.record_failure()
+                DERIBIT_BREAKER_OPEN.labels(endpoint).set(breaker.state == breaker.OPEN)
+                if attempt >= self.max_retries or not self.retry_budget.try_acquire():
+                    raise
+                await asyncio.sleep(backoff_delay(attempt, settings.deribit_backoff_base, settings.deribit_backoff_max))
+                attempt += 1
+                self.retries += 1
+                DERIBIT_RETRIES.labels(endpoint).inc()
+                continue
+            except asyncio.CancelledError:
+                breaker.release()
+                raise
+            except Exception:
+                breaker.record_failure()
+                raise
+
+            breaker.record_success()
+            DERIBIT_BREAKER_OPEN.labels(endpoint).set(0)
+            if hedge_won:
+                self._count_hedge(endpoint, "won")
+            return result
+
+    def _count_hedge(self, endpoint: str, outcome: str) -> None:
+        self.hedges[outcome] += 1
+        DERIBIT_HEDGES.labels(endpoint, outcome).inc()
+
+    def _hedge_delay(self, endpoint: str) -> Optional[float]:
+        """Порог дублирования: квантиль задержки эндпоинта, если набралось достаточно замеров"""
+        latencies = self.latencies[endpoint]
+        if not self.hedge or len(latencies) < settings.deribit_hedge_min_samples:
+            return None
+        return latencies.quantile(settings.deribit_hedge_quantile)
+
+    async def _attempt(self, endpoint: str, params: Dict[str, Any]) -> Any:
+        """Одна попытка: токен лимита, HTTP-запрос и разбор ответа JSON-RPC"""
+        waited = await self.limiter.acquire()
+        DERIBIT_LIMITER_WAIT.observe(waited)
+
+        started = time.perf_counter()
+        session = await self._get_session()
+        async with session.get(f"{self.base_url}/{endpoint}", params=params) as response:
+            if response.status == 429 or response.status >= 500:
+                raise DeribitUnavailableError(f"HTTP error: {response.status}", f"http_{response.status}")
+            try:
+                data = await response.json(content_type=None)
+            except ValueError:
+                raise DeribitAPIError(f"HTTP error: {response.status}", f"http_{response.status}")
+
+        if not isinstance(data, dict):
+            raise DeribitAPIError(f"Unexpected response: {data!r:.200}", "bad_response")
+        error = data.get("error")
+        if error:
+            if isinstance(error, dict) and error.get("code") == TOO_MANY_REQUESTS_CODE:
+                raise DeribitUnavailableError(f"Deribit API error: {error}", "too_many_requests")
+            raise DeribitAPIError(f"Deribit API error: {error}")
+        if response.status != 200:
+            raise DeribitAPIError(f"HTTP error: {response.status}", f"http_{response.status}")
+
+        self.latencies[endpoint].observe(time.perf_counter() - started)
+        return data.get("result")
+
     async def get_index_price(self, currency: str) -> Optional[Dict[str, Any]]:
         """
         Получает реальную цену с Deribit API.
-        
+
         Args:
             currency: BTC или ETH
-            
+
         Returns:
             Словарь с данными или None при ошибке
         """
+        return await self.get_index_price_by_name(f"{currency.lower()}_usd")
+
+    async def get_index_price_by_name(self, index_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Получает цену индекса Deribit по его имени.
+
+        Args:
+            index_name: имя индекса, например btc_usd, sol_usdc
+
+        Returns:
+            Словарь с данными или None при ошибке
+        """
+        started = time.perf_counter()
         try:
-            session = await self._get_session()
-            url = f"{self.base_url}/public/get_index_price"
-            params = {"index_name": f"{currency.lower()}_usd"}
-            
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    
-                    if "error" in data and data["error"]:
-                        logger.error(f"Deribit API error: {data['error']}")
-                        return None
-                    
-                    result = data.get("result", {})
-                    
-                    return {
-                        "ticker": f"{currency.lower()}_usd",
-                        "price": float(result.get("index_price", 0)),
-                        "timestamp": int(time.time())
-                    }
-                else:
-                    logger.error(f"HTTP error: {response.status}")
-                    return None
-                    
+            result = await self._request("public/get_index_price", {"index_name": index_name})
+            return {
+                "ticker": index_name,
+                "price": float((result or {}).get("index_price", 0)),
+                "timestamp": int(time.time())
+            }
+
         except Exception as e:
-            logger.error(f"Error fetching {currency} price: {e}")
+            logger.error(f"Error fetching {index_name} price: {e}")
+            DERIBIT_ERRORS.labels(index_name, _reason(e)).inc()
             return None
-    
+
+        finally:
+            DERIBIT_LATENCY.labels(index_name).observe(time.perf_counter() - started)
+
+    async def get_index_chart_data(self, index_name: str, chart_range: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Получает историю индекса за последний интервал (public/get_index_chart_data).
+
+        Args:
+            index_name: имя индекса, например btc_usd
+            chart_range: 1h, 1d, 2d, 1m, 1y или all; чем длиннее интервал, тем реже точки
+
+        Returns:
+            Тики в формате get_index_price_by_name (timestamp в секундах) или None при ошибке
+        """
+        started = time.perf_counter()
+        try:
+            result = await self._request(
+                "public/get_index_chart_data", {"index_name": index_name, "range": chart_range}
+            )
+            return [
+                {"ticker": index_name, "price": float(price), "timestamp": int(timestamp_ms) // 1000}
+                for timestamp_ms, price in result or []
+            ]
+
+        except Exception as e:
+            logger.error(f"Error fetching {index_name} chart data: {e}")
+            DERIBIT_ERRORS.labels(index_name, _reason(e)).inc()
+            return None
+
+        finally:
+            DERIBIT_LATENCY.labels(index_name).observe(time.perf_counter() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        """Состояние лимита, предохранителей, повторов и дублирующих запросов"""
+        return {
+            "limiter": self.limiter.stats(),
+            "breakers": {endpoint: breaker.stats() for endpoint, breaker in self.breakers.items()},
+            "retries": self.retries,
+            "hedges": dict(self.hedges),
+        }
+
     async def close(self):
         """Закрывает сессию"""
         if self.session and not self.session.closed:
             await self.session.close()
+
+
+def _reason(error: Exception) -> str:
+    """Метка причины ошибки: reason у своих исключений, иначе имя класса"""
+    return getattr(error, "reason", None) or type(error).__name__
@@ -0,0 +1,121 @@
+import asyncio
+import json
+import logging
+from typing import Dict, Any, Optional, List, AsyncIterator
+import websockets
+from websockets.exceptions import WebSocketException
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class DeribitStreamClient:
+    """
+    JSON-RPC WebSocket клиент Deribit.
+
+    Подписывается на каналы deribit_price_index.* и отдает тики по мере
+    поступления, переподключаясь с экспоненциальной задержкой при обрыве.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        tickers: Optional[List[str]] = None,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+        heartbeat_interval: int = 30
+    ):
+        self.url = url or settings.deribit_ws_url
+        self.tickers = list(tickers if tickers is not None else settings.tracked_tickers)
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.heartbeat_interval = heartbeat_interval
+        self._websocket = None
+        self._stopped = False
+        self._request_id = 0
+
+    async def ticks(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Бесконечный поток тиков вида {"ticker", "price", "timestamp"}.
+
+        Завершается только после вызова stop().
+        """
+        delay = self.reconnect_delay
+        while not self._stopped:
+            try:
+                async with websockets.connect(self.url) as websocket:
+                    self._websocket = websocket
+                    await self._subscribe(websocket)
+                    logger.info(f"Subscribed to {len(self.tickers)} Deribit price index channels")
+                    delay = self.reconnect_delay
+
+                    async for message in websocket:
+                        tick = await self._handle_message(websocket, message)
+                        if tick:
+                            yield tick
+
+            except (OSError, asyncio.TimeoutError, WebSocketException) as e:
+                logger.warning(f"Deribit stream disconnected: {e}")
+            finally:
+                self._websocket = None
+
+            if self._stopped:
+                break
+            logger.info(f"Reconnecting to Deribit stream in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def stop(self) -> None:
+        """Останавливает поток и закрывает текущее соединение"""
+        self._stopped = True
+        if self._websocket is not None:
+            await self._websocket.close()
+
+    async def _subscribe(self, websocket) -> None:
+        await self._send(websocket, "public/set_heartbeat", {"interval": self.heartbeat_interval})
+        channels = [f"deribit_price_index.{ticker}" for ticker in self.tickers]
+        await self._send(websocket, "public/subscribe", {"channels": channels})
+
+    async def _send(self, websocket, method: str, params: Dict[str, Any]) -> None:
+        self._request_id += 1
+        await websocket.send(json.dumps({
+            "jsonrpc": "2.0",
+            "id": self._request_id,
+            "method": method,
+            "params": params,
+        }))
+
+    async def _handle_message(self, websocket, message) -> Optional[Dict[str, Any]]:
+        """Разбирает сообщение: отвечает на heartbeat, возвращает тик из подписки"""
+        try:
+            data = json.loads(message)
+        except ValueError:
+            logger.error(f"Invalid message from Deribit stream: {message!r}")
+            return None
+
+        if data.get("error"):
+            logger.error(f"Deribit API error: {data['error']}")
+            return None
+
+        method = data.get("method")
+        params = data.get("params") or {}
+
+        if method == "heartbeat":
+            if params.get("type") == "test_request":
+                await self._send(websocket, "public/test", {})
+            return None
+
+        if method != "subscription":
+            return None
+
+        tick = params.get("data") or {}
+        try:
+            return {
+                "ticker": tick["index_name"],
+                "price": float(tick["price"]),
+                # Deribit отдает миллисекунды, в price_ticks хранятся секунды
+                "timestamp": int(tick["timestamp"]) // 1000,
+            }
+        except (KeyError, TypeError, ValueError):
+            logger.error(f"Unexpected subscription payload: {params}")
+            return None
@@ -0,0 +1,102 @@
+"""
+Координация воркеров через Redis: аренда (lease) и замеры задержки инструментов.
+"""
+import logging
+import uuid
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+import redis
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RedisLease:
+    """
+    Аренда с ограниченным временем жизни: SET key token NX PX ttl.
+
+    Снять аренду может только ее владелец (по токену), а брошенная
+    упавшим процессом аренда истекает сама через ttl.
+    """
+
+    key_prefix = "lease:"
+
+    def __init__(self, client: redis.Redis, name: str, ttl_ms: int):
+        self.client = client
+        self.key = f"{self.key_prefix}{name}"
+        self.ttl_ms = ttl_ms
+
+    def acquire(self) -> Optional[str]:
+        """Токен аренды или None, если ее держит кто-то другой"""
+        token = uuid.uuid4().hex
+        if self.client.set(self.key, token, nx=True, px=self.ttl_ms):
+            return token
+        return None
+
+    def release(self, token: str) -> bool:
+        """Снимает аренду, если она все еще принадлежит token (сравнение и удаление атомарны через WATCH)"""
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(self.key)
+                current = pipe.get(self.key)
+                if current is None or current.decode() != token:
+                    pipe.unwatch()
+                    return False
+                pipe.multi()
+                pipe.delete(self.key)
+                pipe.execute()
+                return True
+            except redis.WatchError:
+                # Ключ изменился между GET и DELETE: аренда уже чужая
+                return False
+
+    def holder(self) -> Optional[str]:
+        value = self.client.get(self.key)
+        return value.decode() if value is not None else None
+
+
+class InstrumentLatencyStore:
+    """
+    Сглаженная (EWMA) задержка запроса по каждому инструменту в хеше Redis.
+
+    Каждый шард обновляет только свои инструменты, поэтому одновременные
+    обновления из разных воркеров не пересекаются.
+    """
+
+    key = "ingest:latency"
+
+    def __init__(self, client: redis.Redis, alpha: float = 0.3):
+        self.client = client
+        self.alpha = alpha
+
+    def get(self, tickers: Iterable[str]) -> Dict[str, float]:
+        tickers = list(tickers)
+        if not tickers:
+            return {}
+        values = self.client.hmget(self.key, tickers)
+        return {ticker: float(value) for ticker, value in zip(tickers, values) if value is not None}
+
+    def update(self, samples: Dict[str, float]) -> None:
+        if not samples:
+            return
+        previous = self.get(samples)
+        smoothed = {
+            ticker: value if ticker not in previous else previous[ticker] + self.alpha * (value - previous[ticker])
+            for ticker, value in samples.items()
+        }
+        self.client.hset(self.key, mapping=smoothed)
+
+
+def create_coordination_redis(backend: Optional[str] = None) -> redis.Redis:
+    """Клиент Redis для аренд и замеров: redis по settings.redis_url или fakeredis (для тестов)"""
+    backend = backend or settings.ingest_coordination_backend
+    if backend == "fakeredis":
+        import fakeredis
+
+        return fakeredis.FakeRedis()
+    return redis.Redis.from_url(settings.redis_url, socket_timeout=2.0, socket_connect_timeout=2.0)
+
+
+@lru_cache()
+def get_coordination_redis() -> redis.Redis:
+    return create_coordination_redis()
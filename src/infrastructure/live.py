@@ -0,0 +1,194 @@
+"""
+Рассылка новых тиков подписчикам /ws/prices и /prices/stream.
+
+Ингест публикует тики в PriceHub. В режиме memory хаб раздает их подписчикам
+своего процесса, в режиме redis публикует в каналы prices:live:<ticker>, а один
+слушатель на процесс API (psubscribe) раздает сообщения локальным подписчикам,
+поэтому число соединений с Redis не зависит от числа клиентов.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import redis
+import redis.asyncio as aioredis
+from src.core.config import settings
+from src.domain.schemas import PriceTickResponse
+from src.infrastructure.metrics import LIVE_DROPPED, LIVE_SUBSCRIBERS
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """
+    Очередь тиков одного клиента.
+
+    Очередь ограничена: если клиент не успевает читать, самые старые тики
+    вытесняются новыми, и ингест никогда не ждет медленного потребителя.
+    """
+
+    def __init__(self, tickers: Iterable[str], max_size: int):
+        self.tickers = frozenset(tickers)
+        self.queue: asyncio.Queue = asyncio.Queue(max_size)
+        self.dropped = 0
+
+    def put(self, payload: str) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            LIVE_DROPPED.inc()
+        self.queue.put_nowait(payload)
+
+    async def get(self) -> str:
+        """Следующий тик в JSON (формат PriceTickResponse)"""
+        return await self.queue.get()
+
+
+class PriceHub:
+    """Подписки по тикерам и доставка опубликованных тиков"""
+
+    channel_prefix = "prices:live:"
+
+    def __init__(
+        self,
+        redis_client: Optional[redis.Redis] = None,
+        async_redis_client: Optional[aioredis.Redis] = None,
+        queue_size: Optional[int] = None
+    ):
+        self.redis = redis_client
+        self.async_redis = async_redis_client
+        self.queue_size = queue_size or settings.live_queue_size
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener: Optional[asyncio.Task] = None
+
+    def subscribe(self, tickers: Iterable[str]) -> Subscription:
+        """Регистрирует подписчика; вызывается из event loop процесса API"""
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(tickers, self.queue_size)
+        for ticker in subscription.tickers:
+            self._subscribers[ticker].add(subscription)
+        LIVE_SUBSCRIBERS.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        for ticker in subscription.tickers:
+            subscribers = self._subscribers.get(ticker)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[ticker]
+        LIVE_SUBSCRIBERS.dec()
+
+    def subscriber_count(self) -> int:
+        return len({subscription for subscribers in self._subscribers.values() for subscription in subscribers})
+
+    def publish(self, prices: List[PriceTickResponse]) -> None:
+        """
+        Публикует новые тики (синхронно, из любого потока ингеста).
+
+        Ошибки Redis только логируются: рассылка не должна ронять запись цен.
+        """
+        messages = [(price.ticker, price.model_dump_json()) for price in prices]
+        if not messages:
+            return
+
+        if self.redis is None:
+            self._dispatch_threadsafe(messages)
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for ticker, payload in messages:
+                pipe.publish(f"{self.channel_prefix}{ticker}", payload)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.error(f"Failed to publish {len(messages)} live prices: {e}")
+
+    def _dispatch_threadsafe(self, messages: List[Tuple[str, str]]) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return  # в процессе еще не было подписчиков
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._dispatch(messages)
+        else:
+            loop.call_soon_threadsafe(self._dispatch, messages)
+
+    def _dispatch(self, messages: List[Tuple[str, str]]) -> None:
+        for ticker, payload in messages:
+            for subscription in tuple(self._subscribers.get(ticker, ())):
+                subscription.put(payload)
+
+    async def start(self) -> None:
+        """Запускает слушателя Redis (в режиме memory ничего не делает)"""
+        if self.async_redis is None or self._listener is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is None:
+            return
+        self._listener.cancel()
+        try:
+            await self._listener
+        except asyncio.CancelledError:
+            pass
+        self._listener = None
+
+    async def _listen(self) -> None:
+        """Один psubscribe на процесс; после ошибки Redis переподключается через секунду"""
+        prefix_length = len(self.channel_prefix)
+        while True:
+            pubsub = self.async_redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(f"{self.channel_prefix}*")
+                async for message in pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    ticker = _text(message["channel"])[prefix_length:]
+                    self._dispatch([(ticker, _text(message["data"]))])
+            except redis.RedisError as e:
+                logger.error(f"Live prices listener failed: {e}")
+                await asyncio.sleep(1.0)
+            finally:
+                await pubsub.aclose()
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def create_price_hub(backend: Optional[str] = None) -> PriceHub:
+    """
+    Создает хаб по настройке live_backend:
+    redis — pub/sub через settings.redis_url, fakeredis — Redis в памяти (для тестов),
+    memory — только подписчики своего процесса.
+    """
+    backend = backend or settings.live_backend
+    if backend == "memory":
+        return PriceHub()
+    if backend == "fakeredis":
+        import fakeredis
+        import fakeredis.aioredis
+
+        server = fakeredis.FakeServer()
+        return PriceHub(
+            fakeredis.FakeRedis(server=server),
+            fakeredis.aioredis.FakeRedis(server=server),
+        )
+    # У слушателя нет таймаута чтения: в простое pub/sub молчит сколько угодно долго
+    return PriceHub(
+        redis.Redis.from_url(settings.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5),
+        aioredis.Redis.from_url(settings.redis_url, socket_connect_timeout=0.5),
+    )
+
+
+@lru_cache()
+def get_price_hub() -> PriceHub:
+    return create_price_hub()
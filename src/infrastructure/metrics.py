@@ -0,0 +1,223 @@
+"""
+Метрики Prometheus для API, ингеста и воркеров Celery.
+
+Если задана переменная PROMETHEUS_MULTIPROC_DIR, метрики всех процессов
+(воркеры uvicorn, дочерние процессы Celery) пишутся в общий каталог и
+собираются при чтении. Каталог нужно очищать перед стартом сервисов.
+
+Отдельный экспортер для хоста воркеров:
+    python -m src.infrastructure.metrics --port 9101
+"""
+import argparse
+import functools
+import inspect
+import os
+import time
+from typing import Callable, Tuple
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    CONTENT_TYPE_LATEST,
+    generate_latest,
+    start_http_server,
+)
+from prometheus_client import multiprocess
+
+MULTIPROC_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+# Бакеты под быстрые запросы к БД и кэшу (единицы миллисекунд) и медленные выгрузки
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Время обработки HTTP-запроса",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REPOSITORY_LATENCY = Histogram(
+    "repository_query_duration_seconds",
+    "Время выполнения метода репозитория",
+    ["repository", "method"],
+    buckets=LATENCY_BUCKETS,
+)
+DERIBIT_LATENCY = Histogram(
+    "deribit_request_duration_seconds",
+    "Время запроса к Deribit API",
+    ["currency"],
+    buckets=LATENCY_BUCKETS,
+)
+DERIBIT_ERRORS = Counter(
+    "deribit_request_errors_total",
+    "Неудачные запросы к Deribit API",
+    ["currency", "reason"],
+)
+DERIBIT_LIMITER_WAIT = Histogram(
+    "deribit_rate_limiter_wait_seconds",
+    "Ожидание токена клиентского лимита частоты Deribit",
+    buckets=LATENCY_BUCKETS,
+)
+DERIBIT_RETRIES = Counter(
+    "deribit_retries_total",
+    "Повторные попытки запросов к Deribit",
+    ["endpoint"],
+)
+DERIBIT_HEDGES = Counter(
+    "deribit_hedged_requests_total",
+    "Дублирующие запросы к Deribit по исходу (won — ответ дубля пришел первым)",
+    ["endpoint", "outcome"],
+)
+DERIBIT_BREAKER_OPEN = Gauge(
+    "deribit_circuit_open",
+    "Предохранитель эндпоинта Deribit разомкнут (1) или замкнут (0)",
+    ["endpoint"],
+    multiprocess_mode="max",
+)
+INGEST_LAG = Histogram(
+    "ingest_lag_seconds",
+    "Задержка записи тика: момент записи минус timestamp тика",
+    ["ticker"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+)
+INGEST_BATCH_SIZE = Histogram(
+    "ingest_batch_size",
+    "Размер пачки тиков, переданной в store_ticks",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000),
+)
+INGESTED_TICKS = Counter(
+    "ingested_ticks_total",
+    "Тики, записанные в price_ticks (без дубликатов)",
+    ["ticker"],
+)
+TASK_DURATION = Histogram(
+    "celery_task_duration_seconds",
+    "Время выполнения задачи Celery",
+    ["task", "status"],
+    buckets=LATENCY_BUCKETS + (30.0, 60.0),
+)
+INGEST_SHARDS = Histogram(
+    "ingest_shards",
+    "Число шардов в запуске ингеста",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+INGEST_SKIPPED_RUNS = Counter(
+    "ingest_skipped_runs_total",
+    "Пропущенные запуски ингеста: overlap — предыдущий еще идет, deadline — истек дедлайн слота",
+    ["reason"],
+)
+WRITE_BEHIND_PENDING = Gauge(
+    "write_behind_pending_ticks",
+    "Тики в буфере write-behind, ожидающие записи",
+    multiprocess_mode="max",
+)
+WRITE_BEHIND_WAIT = Histogram(
+    "write_behind_wait_seconds",
+    "Ожидание места в полном буфере write-behind (backpressure)",
+    buckets=LATENCY_BUCKETS,
+)
+PRICE_CACHE_LOOKUPS = Counter(
+    "price_cache_lookups_total",
+    "Чтения кэша последних цен: hit — из памяти или Redis, miss — нужен запрос в БД",
+    ["result"],
+)
+PRICE_CACHE_ERRORS = Counter(
+    "price_cache_errors_total",
+    "Ошибки Redis в кэше последних цен",
+    ["operation"],
+)
+WRITE_BEHIND_COALESCED = Counter(
+    "write_behind_coalesced_ticks_total",
+    "Тики потока, замененные более свежим тиком того же тикера, пока буфер write-behind был полон",
+)
+WRITE_BEHIND_DEAD_LETTERS = Counter(
+    "write_behind_dead_letter_ticks_total",
+    "Тики, которые не удалось записать даже поодиночке: отложены в dead-letter буфера write-behind",
+)
+LIVE_SUBSCRIBERS = Gauge(
+    "live_subscribers",
+    "Активные подписчики /ws/prices и /prices/stream",
+    multiprocess_mode="livesum",
+)
+LIVE_DROPPED = Counter(
+    "live_dropped_messages_total",
+    "Тики, вытесненные из очереди медленного подписчика",
+)
+
+
+def is_multiprocess() -> bool:
+    return bool(os.environ.get(MULTIPROC_ENV))
+
+
+def collect_registry() -> CollectorRegistry:
+    """Реестр для отдачи метрик: общий каталог в multiprocess-режиме, иначе реестр процесса"""
+    if not is_multiprocess():
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render_latest() -> Tuple[bytes, str]:
+    """Текущие метрики в текстовом формате Prometheus и их content type"""
+    return generate_latest(collect_registry()), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int) -> None:
+    """Убирает живые (gauge) файлы завершившегося процесса из общего каталога"""
+    if is_multiprocess():
+        multiprocess.mark_process_dead(pid)
+
+
+def track_query(method: Callable) -> Callable:
+    """Декоратор метода репозитория: длительность в repository_query_duration_seconds"""
+    name = method.__name__
+
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def async_wrapper(self, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await method(self, *args, **kwargs)
+            finally:
+                REPOSITORY_LATENCY.labels(type(self).__name__, name).observe(time.perf_counter() - started)
+        return async_wrapper
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            REPOSITORY_LATENCY.labels(type(self).__name__, name).observe(time.perf_counter() - started)
+    return wrapper
+
+
+def observe_ingest(batch_size: int, records) -> None:
+    """Размер входящей пачки, число новых тиков и задержка записи по каждому тикеру"""
+    now = time.time()
+    INGEST_BATCH_SIZE.observe(batch_size)
+    counts = {}
+    for record in records:
+        counts[record.ticker] = counts.get(record.ticker, 0) + 1
+        INGEST_LAG.labels(record.ticker).observe(max(now - record.timestamp, 0.0))
+    for ticker, count in counts.items():
+        INGESTED_TICKS.labels(ticker).inc(count)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="HTTP-экспортер метрик из PROMETHEUS_MULTIPROC_DIR")
+    parser.add_argument("--port", type=int, default=9101)
+    args = parser.parse_args()
+
+    if not is_multiprocess():
+        parser.error(f"{MULTIPROC_ENV} is not set")
+
+    start_http_server(args.port, registry=collect_registry())
+    while True:
+        time.sleep(3600)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import logging
+import re
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "price_ticks"
+PARTITION_NAME = re.compile(rf"^{PARENT_TABLE}_y(\d{{4}})m(\d{{2}})$")
+
+
+def month_start(year: int, month: int) -> int:
+    """UNIX timestamp начала месяца (UTC)"""
+    return int(datetime(year, month, 1, tzinfo=timezone.utc).timestamp())
+
+
+def add_months(year: int, month: int, months: int) -> Tuple[int, int]:
+    index = year * 12 + (month - 1) + months
+    return index // 12, index % 12 + 1
+
+
+def partition_name(year: int, month: int) -> str:
+    return f"{PARENT_TABLE}_y{year:04d}m{month:02d}"
+
+
+def months_to_cover(
+    now: datetime,
+    months_ahead: int,
+    since: Optional[datetime] = None,
+    extra: Iterable[Tuple[int, int]] = ()
+) -> List[Tuple[int, int]]:
+    """
+    Месяцы, для которых нужны секции: от месяца since (или текущего) до
+    months_ahead вперед, плюс месяцы из extra (например, занятые строками
+    секции по умолчанию).
+    """
+    first = since if since is not None and since < now else now
+    year, month = first.year, first.month
+    last = add_months(now.year, now.month, months_ahead)
+    months = set(extra)
+    while (year, month) <= last:
+        months.add((year, month))
+        year, month = add_months(year, month, 1)
+    return sorted(months)
+
+
+class PartitionManager:
+    """
+    Обслуживает помесячные секции price_ticks в PostgreSQL.
+
+    Создает секции на несколько месяцев вперед и за прошлые месяцы, куда
+    пишет бэкфилл, и отсоединяет старые. Строки, попавшие в секцию по
+    умолчанию, переносятся в секцию своего месяца при ее создании.
+    Отсоединенная секция остается отдельной таблицей (ее можно выгрузить
+    в архив или удалить), а из запросов к price_ticks она пропадает.
+    """
+
+    def __init__(self, connection: Connection):
+        self.connection = connection
+
+    def is_partitioned(self) -> bool:
+        """Проверяет, что price_ticks — секционированная таблица PostgreSQL"""
+        if self.connection.dialect.name != "postgresql":
+            return False
+        return bool(self.connection.execute(text(
+            "SELECT 1 FROM pg_partitioned_table p "
+            "JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = :table AND pg_table_is_visible(c.oid)"
+        ), {"table": PARENT_TABLE}).scalar())
+
+    def list_partitions(self) -> List[Tuple[int, int]]:
+        """Возвращает (год, месяц) всех присоединенных помесячных секций"""
+        names = self.connection.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table"
+        ), {"table": PARENT_TABLE}).scalars()
+
+        partitions = []
+        for name in names:
+            match = PARTITION_NAME.match(name)
+            if match:
+                partitions.append((int(match.group(1)), int(match.group(2))))
+        return sorted(partitions)
+
+    def default_partition(self) -> Optional[str]:
+        """Имя секции по умолчанию (DEFAULT), если она есть"""
+        return self.connection.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table AND pg_get_expr(c.relpartbound, c.oid) = 'DEFAULT'"
+        ), {"table": PARENT_TABLE}).scalar()
+
+    def default_months(self) -> List[Tuple[int, int]]:
+        """Месяцы (год, месяц), строки которых лежат в секции по умолчанию"""
+        default = self.default_partition()
+        if default is None:
+            return []
+        rows = self.connection.execute(text(
+            "SELECT DISTINCT "
+            "extract(year FROM to_timestamp(timestamp) AT TIME ZONE 'UTC')::int, "
+            "extract(month FROM to_timestamp(timestamp) AT TIME ZONE 'UTC')::int "
+            f"FROM {default}"
+        )).all()
+        return sorted((int(year), int(month)) for year, month in rows)
+
+    def ensure_partitions(
+        self,
+        months_ahead: int,
+        since: Optional[datetime] = None,
+        now: Optional[datetime] = None
+    ) -> List[str]:
+        """
+        Создает недостающие секции от месяца since (по умолчанию текущего) до
+        months_ahead месяцев вперед, а также для всех месяцев, чьи строки
+        лежат в секции по умолчанию.
+        """
+        now = now or datetime.now(timezone.utc)
+        existing = set(self.list_partitions())
+        created = []
+
+        for year, month in months_to_cover(now, months_ahead, since, self.default_months()):
+            if (year, month) in existing:
+                continue
+            self.create_partition(year, month)
+            created.append(partition_name(year, month))
+
+        return created
+
+    def create_partition(self, year: int, month: int) -> None:
+        """
+        Создает секцию месяца. Если в секции по умолчанию уже есть строки этого
+        месяца, PARTITION OF упадет на проверке ограничения DEFAULT: тогда
+        таблица создается отдельно, строки переносятся в нее и она присоединяется.
+        """
+        next_year, next_month = add_months(year, month, 1)
+        start, end = month_start(year, month), month_start(next_year, next_month)
+        name = partition_name(year, month)
+        bounds = f"FOR VALUES FROM ({start}) TO ({end})"
+        default = self.default_partition()
+
+        if default is not None:
+            # Блокируем запись в DEFAULT до конца транзакции, чтобы между
+            # переносом и ATTACH туда не попали новые строки этого месяца
+            self.connection.execute(text(f"LOCK TABLE {default} IN SHARE ROW EXCLUSIVE MODE"))
+            has_rows = self.connection.execute(text(
+                f"SELECT 1 FROM {default} WHERE timestamp >= :start AND timestamp < :end LIMIT 1"
+            ), {"start": start, "end": end}).scalar()
+            if has_rows:
+                self.connection.execute(text(
+                    f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+                ))
+                moved = self.connection.execute(text(
+                    f"WITH moved AS (DELETE FROM {default} WHERE timestamp >= :start AND timestamp < :end "
+                    "RETURNING id, ticker, price, timestamp, created_at) "
+                    f"INSERT INTO {name} (id, ticker, price, timestamp, created_at) SELECT * FROM moved"
+                ), {"start": start, "end": end}).rowcount
+                self.connection.execute(text(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} {bounds}"))
+                logger.info(f"Created partition {name}, moved {moved} rows from {default}")
+                return
+
+        self.connection.execute(text(f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} {bounds}"))
+        logger.info(f"Created partition {name}")
+
+    def detach_old_partitions(self, retain_months: int, now: datetime = None) -> List[str]:
+        """Отсоединяет секции старше retain_months полных месяцев (0 — ничего не трогать)"""
+        if retain_months <= 0:
+            return []
+
+        now = now or datetime.now(timezone.utc)
+        oldest_kept = add_months(now.year, now.month, -retain_months)
+        detached = []
+
+        for year, month in self.list_partitions():
+            if (year, month) >= oldest_kept:
+                continue
+            name = partition_name(year, month)
+            self.connection.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+            detached.append(name)
+            logger.info(f"Detached partition {name}")
+
+        return detached
+
+    def drop_partition(self, year: int, month: int, expected_rows: Optional[int] = None) -> bool:
+        """
+        Отсоединяет и удаляет секцию месяца; False, если такой секции нет.
+
+        С expected_rows секция сначала блокируется и удаляется, только если
+        в ней ровно столько строк (иначе туда успели вставить новые).
+        """
+        if (year, month) not in self.list_partitions():
+            return False
+        name = partition_name(year, month)
+        if expected_rows is not None:
+            self.connection.execute(text(f"LOCK TABLE {name} IN ACCESS EXCLUSIVE MODE"))
+            count = self.connection.execute(text(f"SELECT count(*) FROM {name}")).scalar()
+            if count != expected_rows:
+                logger.info(f"Partition {name} has {count} rows, expected {expected_rows}: not dropped")
+                return False
+        self.connection.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+        self.connection.execute(text(f"DROP TABLE {name}"))
+        logger.info(f"Dropped partition {name}")
+        return True
@@ -0,0 +1,125 @@
+"""
+Диагностика производительности: профили запросов и журнал медленных SQL.
+
+Оба механизма подключаются только при включенных настройках, иначе
+в приложении и engine нет ни middleware, ни обработчиков событий.
+"""
+import cProfile
+import logging
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("src.slow_queries")
+
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+
+
+class RequestProfiler:
+    """
+    Профилирует выполнение через cProfile и сохраняет .prof-файлы (формат pstats).
+
+    cProfile перехватывает все вызовы в потоке, поэтому в каждый момент
+    профилируется не больше одного запроса: пока профиль занят, следующий
+    выбранный запрос выполняется без профилирования. В профиль попадают и
+    корутины других запросов, выполнявшиеся в том же event loop.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self._busy = threading.Lock()
+
+    def start(self) -> Optional[cProfile.Profile]:
+        """Включает профилировщик; None, если профиль уже занят другим запросом"""
+        if not self._busy.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def stop(self, profile: cProfile.Profile, name: str) -> Path:
+        """Выключает профилировщик и пишет профиль в каталог, возвращает путь к файлу"""
+        try:
+            profile.disable()
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory / f"{time.strftime('%Y%m%dT%H%M%S')}_{time.time_ns() % 10**9:09d}_{name}.prof"
+            profile.dump_stats(path)
+            return path
+        finally:
+            self._busy.release()
+
+
+def profile_name(method: str, path: str, elapsed: float) -> str:
+    """Безопасное имя файла профиля: метод, путь и длительность в миллисекундах"""
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_") or "root"
+    return f"{method}_{slug[:80]}_{elapsed * 1000:.0f}ms"
+
+
+def install_slow_query_log(engine: Engine, threshold_ms: float, explain: bool = True) -> None:
+    """
+    Вешает на engine обработчики, которые логируют запросы дольше threshold_ms
+    вместе с планом выполнения (EXPLAIN для PostgreSQL, EXPLAIN QUERY PLAN для SQLite).
+
+    Для AsyncEngine передается async_engine.sync_engine.
+    """
+    threshold = threshold_ms / 1000.0
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        # after_cursor_execute для упавшего запроса не вызывается
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        if elapsed < threshold:
+            return
+
+        record: Dict[str, Any] = {
+            "elapsed_ms": round(elapsed * 1000, 2),
+            "statement": statement,
+            "parameters": parameters if not executemany else f"<{len(parameters)} rows>",
+        }
+        if explain and not executemany and _EXPLAINABLE.match(statement):
+            record["plan"] = _explain(conn, statement, parameters)
+
+        slow_query_logger.warning(
+            f"Slow query {record['elapsed_ms']}ms: {record['statement']} "
+            f"params={record['parameters']}"
+            + (f"\n{record['plan']}" if record.get("plan") else "")
+        )
+
+
+def _explain(conn, statement: str, parameters) -> Optional[str]:
+    """План запроса через DBAPI-курсор того же соединения (без событий engine)"""
+    is_postgres = conn.dialect.name == "postgresql"
+    prefix = "EXPLAIN " if is_postgres else "EXPLAIN QUERY PLAN "
+    cursor = conn.connection.cursor()
+    try:
+        # В PostgreSQL ошибка EXPLAIN оборвала бы транзакцию приложения: изолируем ее точкой сохранения
+        if is_postgres:
+            cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(prefix + statement, parameters)
+            plan = "\n".join(" | ".join(str(value) for value in row) for row in cursor.fetchall())
+        except Exception as e:
+            if is_postgres:
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            logger.debug(f"EXPLAIN failed: {e}")
+            plan = None
+        if is_postgres:
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        return plan
+    finally:
+        cursor.close()
@@ -1,52 +1,139 @@
-from typing import List, Optional
+from typing import List, Optional, Sequence, Dict, Any, Tuple, AsyncIterator
+import numpy as np
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, and_
-from src.domain.models import PriceTick
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import desc, and_, tuple_, select, func, literal_column, case, delete, text, cast, Float
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from src.domain.models import PriceTick, PriceRollup, BackfillCheckpoint
+from src.domain.candles import CandleBuilder, ROLLUP_INTERVALS, summarize_ticks, bucket_start
 from src.domain.schemas import PriceTickCreate
+from src.infrastructure.metrics import track_query
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def _page_query(query, ticker, date_from, date_to, limit, cursor):
+    """Фильтр по тикеру и периоду, позиция курсора и порядок (timestamp, id) по убыванию"""
+    query = query.where(PriceTick.ticker == ticker)
+
+    if date_from:
+        query = query.where(PriceTick.timestamp >= date_from)
+    if date_to:
+        query = query.where(PriceTick.timestamp <= date_to)
+    if cursor:
+        query = query.where(tuple_(PriceTick.timestamp, PriceTick.id) < cursor)
+
+    query = query.order_by(desc(PriceTick.timestamp), desc(PriceTick.id))
+    if limit:
+        query = query.limit(limit)
+    return query
+
+
 class PriceRepository:
     """Репозиторий для работы с ценами"""
     
     def __init__(self, db: Session):
         self.db = db
     
+    @track_query
     def create(self, price_data: PriceTickCreate) -> PriceTick:
-        """Создает запись о цене"""
+        """Создает запись о цене (или возвращает существующую на тот же timestamp)"""
         try:
-            # Проверяем, нет ли уже записи с таким timestamp
-            existing = self.db.query(PriceTick).filter(
+            # Вставка через ON CONFLICT: без предварительного SELECT, который
+            # пропускал дубликаты при конкурентной записи
+            created = self.bulk_upsert([price_data])
+            if created:
+                logger.info(f"Created price record: {price_data.ticker} = ${price_data.price}")
+            else:
+                logger.debug(f"Record already exists: {price_data.ticker} at {price_data.timestamp}")
+
+            return self.db.query(PriceTick).filter(
                 and_(
                     PriceTick.ticker == price_data.ticker,
                     PriceTick.timestamp == price_data.timestamp
                 )
-            ).first()
-            
-            if existing:
-                logger.debug(f"Record already exists: {price_data.ticker} at {price_data.timestamp}")
-                return existing
-            
-            db_price = PriceTick(
-                ticker=price_data.ticker,
-                price=price_data.price,
-                timestamp=price_data.timestamp
-            )
-            
-            self.db.add(db_price)
-            self.db.commit()
-            self.db.refresh(db_price)
-            
-            logger.info(f"Created price record: {db_price.ticker} = ${db_price.price}")
-            return db_price
-            
+            ).one()
+
         except Exception as e:
             self.db.rollback()
             logger.error(f"Failed to create price record: {e}")
             raise
+
+    @track_query
+    def bulk_upsert(self, ticks: Sequence[PriceTickCreate], commit: bool = True) -> List[Row]:
+        """
+        Сохраняет пачку цен одним INSERT ... ON CONFLICT DO NOTHING.
+
+        Дубликаты по (ticker, timestamp) пропускаются без ошибки.
+
+        Args:
+            ticks: цены для записи
+            commit: False, если вызывающий код завершает транзакцию сам
+                    (например, вместе с обновлением роллапов)
+
+        Returns:
+            Только реально вставленные записи (строки с колонками price_ticks,
+            не ORM-объекты: они не устаревают после commit)
+        """
+        # Убираем дубликаты внутри самой пачки, сохраняя порядок
+        rows = list({
+            (tick.ticker, tick.timestamp): {
+                "ticker": tick.ticker,
+                "price": tick.price,
+                "timestamp": tick.timestamp,
+            }
+            for tick in ticks
+        }.values())
+        if not rows:
+            return []
+
+        try:
+            table = PriceTick.__table__
+            dialect = self.db.get_bind().dialect.name
+            if dialect in ("postgresql", "sqlite"):
+                insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+                stmt = insert(table)\
+                    .on_conflict_do_nothing(index_elements=["ticker", "timestamp"])\
+                    .returning(*table.c)
+                created = self.db.execute(stmt, rows).all()
+            else:
+                created = self._bulk_insert_missing(rows)
+
+            if commit:
+                self.db.commit()
+            logger.info(f"Bulk upsert: {len(created)} of {len(rows)} price records inserted")
+            return created
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to bulk upsert price records: {e}")
+            raise
+
+    def _bulk_insert_missing(self, rows: List[dict]) -> List[Row]:
+        """Запасной путь для диалектов без ON CONFLICT: SELECT, INSERT и SELECT вставленного"""
+        table = PriceTick.__table__
+        keys = [(row["ticker"], row["timestamp"]) for row in rows]
+        existing = set(
+            self.db.execute(
+                select(table.c.ticker, table.c.timestamp)
+                .where(tuple_(table.c.ticker, table.c.timestamp).in_(keys))
+            ).all()
+        )
+        missing = [row for row in rows if (row["ticker"], row["timestamp"]) not in existing]
+        if not missing:
+            return []
+
+        self.db.execute(table.insert(), missing)
+        missing_keys = [(row["ticker"], row["timestamp"]) for row in missing]
+        return self.db.execute(
+            select(table).where(tuple_(table.c.ticker, table.c.timestamp).in_(missing_keys))
+        ).all()
     
+    @track_query
     def get_all_by_ticker(self, ticker: str, limit: Optional[int] = 100) -> List[PriceTick]:
         """Получает все записи по тикеру"""
         return self.db.query(PriceTick)\
@@ -55,6 +142,7 @@ class PriceRepository:
             .limit(limit)\
             .all()
     
+    @track_query
     def get_last_price(self, ticker: str) -> Optional[PriceTick]:
         """Получает последнюю цену"""
         return self.db.query(PriceTick)\
@@ -62,18 +150,599 @@ class PriceRepository:
             .order_by(desc(PriceTick.timestamp))\
             .first()
     
+    @track_query
     def get_by_date_range(
         self, 
         ticker: str, 
         date_from: Optional[int] = None,
-        date_to: Optional[int] = None
+        date_to: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[Tuple[int, int]] = None
     ) -> List[PriceTick]:
-        """Получает записи за период"""
-        query = self.db.query(PriceTick).filter(PriceTick.ticker == ticker)
-        
+        """
+        Получает записи за период, от новых к старым.
+
+        Пагинация по ключу (timestamp, id), как в AsyncPriceRepository.get_by_date_range.
+        """
+        query = _page_query(select(PriceTick), ticker, date_from, date_to, limit, cursor)
+        return list(self.db.scalars(query))
+
+
+class RollupRepository:
+    """Репозиторий предрассчитанных OHLC-роллапов (1m/1h/1d)"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @track_query
+    def apply_ticks(
+        self,
+        ticks: Sequence[Any],
+        commit: bool = True,
+        keep_existing_before: Optional[int] = None
+    ) -> int:
+        """
+        Инкрементально вливает новые тики в роллапы всех интервалов.
+
+        Передавать нужно только реально вставленные тики (результат
+        bulk_upsert), иначе дубликаты будут посчитаны дважды. Свечи
+        с bucket < keep_existing_before только создаются, если их нет:
+        сырые тики там уже удалены, и существующая свеча учитывает их сама.
+
+        Returns:
+            Количество обновленных свечей
+        """
+        partials = [
+            partial
+            for interval in ROLLUP_INTERVALS
+            for partial in summarize_ticks(ticks, interval)
+        ]
+        if not partials:
+            return 0
+        kept = []
+        if keep_existing_before is not None:
+            kept = [partial for partial in partials if partial["bucket"] < keep_existing_before]
+            partials = [partial for partial in partials if partial["bucket"] >= keep_existing_before]
+
+        try:
+            if kept:
+                self.db.execute(self._insert_missing_statement(), kept)
+            if partials:
+                self.db.execute(self._merge_statement(), partials)
+            if commit:
+                self.db.commit()
+            return len(kept) + len(partials)
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to update price rollups: {e}")
+            raise
+
+    def _insert_missing_statement(self):
+        """INSERT ... ON CONFLICT DO NOTHING: создает свечу, сохраненную не трогает"""
+        insert = postgresql.insert if self.db.get_bind().dialect.name == "postgresql" else sqlite.insert
+        return insert(PriceRollup.__table__).on_conflict_do_nothing(
+            index_elements=["ticker", "interval", "bucket"]
+        )
+
+    def _merge_statement(self):
+        """INSERT ... ON CONFLICT DO UPDATE, сливающий частичную свечу с сохраненной"""
+        table = PriceRollup.__table__
+        is_postgres = self.db.get_bind().dialect.name == "postgresql"
+        insert = postgresql.insert if is_postgres else sqlite.insert
+        # В SQLite двухаргументные max/min работают как greatest/least
+        greatest, least = (func.greatest, func.least) if is_postgres else (func.max, func.min)
+
+        stmt = insert(table)
+        new = stmt.excluded
+        return stmt.on_conflict_do_update(
+            index_elements=["ticker", "interval", "bucket"],
+            set_={
+                "open": case((new.open_time < table.c.open_time, new.open), else_=table.c.open),
+                "open_time": least(table.c.open_time, new.open_time),
+                "high": greatest(table.c.high, new.high),
+                "low": least(table.c.low, new.low),
+                "close": case((new.close_time >= table.c.close_time, new.close), else_=table.c.close),
+                "close_time": greatest(table.c.close_time, new.close_time),
+                "count": table.c.count + new.count,
+            },
+        )
+
+    @track_query
+    def rebuild_range(self, ticker: str, date_from: int, date_to: int) -> int:
+        """
+        Пересчитывает роллапы тикера за [date_from, date_to) с нуля по сырым тикам.
+
+        Границы должны быть выровнены по самому длинному интервалу (суткам),
+        чтобы ни одна свеча не была пересчитана частично.
+
+        Returns:
+            Количество обработанных тиков
+        """
+        longest = max(ROLLUP_INTERVALS)
+        if date_from % longest or date_to % longest:
+            raise ValueError("Rebuild range must be aligned to whole days")
+
+        try:
+            self.db.execute(
+                delete(PriceRollup)
+                .where(PriceRollup.ticker == ticker)
+                .where(PriceRollup.bucket >= date_from)
+                .where(PriceRollup.bucket < date_to)
+            )
+            ticks = self.db.execute(
+                select(PriceTick.ticker, PriceTick.price, PriceTick.timestamp)
+                .where(PriceTick.ticker == ticker)
+                .where(PriceTick.timestamp >= date_from)
+                .where(PriceTick.timestamp < date_to)
+            ).all()
+            self.apply_ticks(ticks, commit=False)
+            self.db.commit()
+            return len(ticks)
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to rebuild rollups for {ticker}: {e}")
+            raise
+
+    def get_tick_bounds(self, ticker: str) -> Optional[tuple]:
+        """Возвращает (min, max) timestamp сырых тиков тикера или None"""
+        bounds = self.db.execute(
+            select(func.min(PriceTick.timestamp), func.max(PriceTick.timestamp))
+            .where(PriceTick.ticker == ticker)
+        ).one()
+        return None if bounds[0] is None else tuple(bounds)
+
+    def get_tickers(self) -> List[str]:
+        """Возвращает все тикеры, по которым есть сырые тики"""
+        return list(self.db.scalars(select(PriceTick.ticker).distinct()))
+
+
+class RetentionRepository:
+    """Подсчет и пакетное удаление данных, вышедших за срок хранения"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def count_ticks(self, date_to: int, ticker: Optional[str] = None, date_from: Optional[int] = None) -> int:
+        """Число сырых тиков с timestamp < date_to (и >= date_from, если задан)"""
+        query = select(func.count()).select_from(PriceTick).where(PriceTick.timestamp < date_to)
+        if ticker is not None:
+            query = query.where(PriceTick.ticker == ticker)
+        if date_from is not None:
+            query = query.where(PriceTick.timestamp >= date_from)
+        return self.db.execute(query).scalar_one()
+
+    def count_rolled_up_ticks(self, ticker: str, date_from: int, date_to: int) -> int:
+        """Сколько тиков учтено в минутных роллапах тикера за [date_from, date_to)"""
+        return self.db.execute(
+            select(func.coalesce(func.sum(PriceRollup.count), 0))
+            .where(PriceRollup.ticker == ticker)
+            .where(PriceRollup.interval == min(ROLLUP_INTERVALS))
+            .where(PriceRollup.bucket >= date_from)
+            .where(PriceRollup.bucket < date_to)
+        ).scalar_one()
+
+    def count_rollups(self, interval: int, date_to: int) -> int:
+        """Число свечей интервала с bucket < date_to"""
+        return self.db.execute(
+            select(func.count()).select_from(PriceRollup)
+            .where(PriceRollup.interval == interval)
+            .where(PriceRollup.bucket < date_to)
+        ).scalar_one()
+
+    def get_expired_tickers(self, date_to: int) -> List[str]:
+        """Тикеры, у которых есть сырые тики старше date_to"""
+        return list(self.db.scalars(
+            select(PriceTick.ticker).where(PriceTick.timestamp < date_to).distinct()
+        ))
+
+    def get_first_timestamp(self, ticker: str) -> Optional[int]:
+        """Самый ранний timestamp сырых тиков тикера"""
+        return self.db.execute(
+            select(func.min(PriceTick.timestamp)).where(PriceTick.ticker == ticker)
+        ).scalar_one()
+
+    def get_ticks(
+        self,
+        ticker: str,
+        date_from: int,
+        date_to: int,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[int, int]] = None
+    ) -> List[Row]:
+        """
+        Сырые тики тикера за [date_from, date_to) строками Core, по возрастанию (timestamp, id).
+
+        Args:
+            limit: Размер страницы
+            after: Позиция (timestamp, id) последнего тика предыдущей страницы
+        """
+        table = PriceTick.__table__
+        query = select(table.c.id, table.c.ticker, table.c.price, table.c.timestamp, table.c.created_at)\
+            .where(table.c.ticker == ticker)\
+            .where(table.c.timestamp >= date_from)\
+            .where(table.c.timestamp < date_to)
+        if after is not None:
+            query = query.where(tuple_(table.c.timestamp, table.c.id) > after)
+        query = query.order_by(table.c.timestamp, table.c.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return self.db.execute(query).all()
+
+    def delete_ticks_batch(
+        self,
+        date_to: int,
+        batch_size: int,
+        ticker: Optional[str] = None,
+        date_from: Optional[int] = None,
+        max_id: Optional[int] = None
+    ) -> int:
+        """
+        Удаляет не более batch_size самых старых тиков с timestamp < date_to
+        (и id <= max_id, если задан) и коммитит
+        """
+        conditions = [PriceTick.timestamp < date_to]
+        if ticker is not None:
+            conditions.append(PriceTick.ticker == ticker)
+        if date_from is not None:
+            conditions.append(PriceTick.timestamp >= date_from)
+        if max_id is not None:
+            conditions.append(PriceTick.id <= max_id)
+
+        oldest = (
+            select(PriceTick.id)
+            .where(*conditions)
+            .order_by(PriceTick.timestamp)
+            .limit(batch_size)
+        )
+        return self._delete_batch(delete(PriceTick).where(*conditions).where(PriceTick.id.in_(oldest)))
+
+    def delete_rollups_batch(self, interval: int, date_to: int, batch_size: int) -> int:
+        """Удаляет не более batch_size самых старых свечей интервала и коммитит"""
+        oldest = (
+            select(PriceRollup.id)
+            .where(PriceRollup.interval == interval)
+            .where(PriceRollup.bucket < date_to)
+            .order_by(PriceRollup.bucket)
+            .limit(batch_size)
+        )
+        return self._delete_batch(delete(PriceRollup).where(PriceRollup.id.in_(oldest)))
+
+    def _delete_batch(self, stmt) -> int:
+        # Короткая транзакция на каждую пачку: блокировки не держатся дольше одного DELETE
+        try:
+            deleted = self.db.execute(stmt, execution_options={"synchronize_session": False}).rowcount
+            self.db.commit()
+            return deleted
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to delete expired rows: {e}")
+            raise
+
+    def estimate_row_bytes(self, table_name: str) -> float:
+        """
+        Средний размер строки таблицы на диске вместе с индексами.
+
+        PostgreSQL: pg_total_relation_size по таблице и ее секциям,
+        SQLite: виртуальная таблица dbstat. 0.0, если оценить нельзя.
+        """
+        dialect = self.db.get_bind().dialect.name
+        try:
+            if dialect == "postgresql":
+                size, rows = self.db.execute(text(
+                    "SELECT coalesce(sum(pg_total_relation_size(c.oid)), 0), "
+                    "coalesce(sum(greatest(c.reltuples, 0)), 0) "
+                    "FROM pg_class c "
+                    "WHERE c.oid = to_regclass(:table) "
+                    "OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(:table))"
+                ), {"table": table_name}).one()
+            elif dialect == "sqlite":
+                size = self.db.execute(text(
+                    "SELECT coalesce(sum(pgsize), 0) FROM dbstat "
+                    "WHERE name IN (SELECT name FROM sqlite_master WHERE tbl_name = :table)"
+                ), {"table": table_name}).scalar_one()
+                rows = self.db.execute(text(f"SELECT count(*) FROM {table_name}")).scalar_one()
+            else:
+                return 0.0
+        except DBAPIError as e:
+            self.db.rollback()
+            logger.warning(f"Cannot estimate row size of {table_name}: {e}")
+            return 0.0
+
+        return float(size) / float(rows) if rows else 0.0
+
+
+class BackfillRepository:
+    """Поиск дыр в истории price_ticks и чекпоинты дозагрузки"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @track_query
+    def find_gaps(self, ticker: str, date_from: int, date_to: int, min_gap: int) -> List[Tuple[int, int]]:
+        """
+        Дыры в истории тикера за [date_from, date_to): интервалы [start, end)
+        без тиков длиннее min_gap секунд.
+
+        Соседние тики сравниваются оконной функцией LAG по индексу (ticker, timestamp);
+        отсутствие тиков в начале и в конце периода тоже считается дырой.
+        """
+        lagged = select(
+            PriceTick.timestamp.label("timestamp"),
+            func.lag(PriceTick.timestamp).over(order_by=PriceTick.timestamp).label("previous"),
+        ).where(
+            PriceTick.ticker == ticker,
+            PriceTick.timestamp >= date_from,
+            PriceTick.timestamp < date_to,
+        ).subquery()
+        rows = self.db.execute(
+            select(lagged.c.previous, lagged.c.timestamp)
+            .where(lagged.c.timestamp - lagged.c.previous > min_gap)
+            .order_by(lagged.c.timestamp)
+        ).all()
+        gaps = [(previous + 1, timestamp) for previous, timestamp in rows]
+
+        first, last = self.db.execute(
+            select(func.min(PriceTick.timestamp), func.max(PriceTick.timestamp))
+            .where(PriceTick.ticker == ticker)
+            .where(PriceTick.timestamp >= date_from)
+            .where(PriceTick.timestamp < date_to)
+        ).one()
+        if first is None:
+            return [(date_from, date_to)]
+        if first - date_from > min_gap:
+            gaps.insert(0, (date_from, first))
+        if date_to - last > min_gap:
+            gaps.append((last + 1, date_to))
+        return gaps
+
+    def get_checkpoints(self, ticker: str, date_from: int) -> List[Tuple[int, int]]:
+        """Уже обработанные дыры тикера, заканчивающиеся после date_from"""
+        return [
+            (row.gap_from, row.gap_to)
+            for row in self.db.execute(
+                select(BackfillCheckpoint.gap_from, BackfillCheckpoint.gap_to)
+                .where(BackfillCheckpoint.ticker == ticker)
+                .where(BackfillCheckpoint.gap_to > date_from)
+            )
+        ]
+
+    def save_checkpoint(self, ticker: str, gap_from: int, gap_to: int, rows: int) -> None:
+        """Отмечает дыру обработанной (повторная запись обновляет число строк)"""
+        table = BackfillCheckpoint.__table__
+        insert = postgresql.insert if self.db.get_bind().dialect.name == "postgresql" else sqlite.insert
+        stmt = insert(table).values(ticker=ticker, gap_from=gap_from, gap_to=gap_to, rows=rows)
+        try:
+            self.db.execute(stmt.on_conflict_do_update(
+                index_elements=["ticker", "gap_from", "gap_to"],
+                set_={"rows": stmt.excluded.rows},
+            ))
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to save backfill checkpoint for {ticker}: {e}")
+            raise
+
+
+class AsyncPriceRepository:
+    """Асинхронный репозиторий цен для API (чтение без блокировки event loop)"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_all_by_ticker(
+        self,
+        ticker: str,
+        limit: Optional[int] = 100,
+        cursor: Optional[Tuple[int, int]] = None
+    ) -> List[PriceTick]:
+        """Получает записи по тикеру, начиная после позиции cursor = (timestamp, id)"""
+        return await self.get_by_date_range(ticker, limit=limit, cursor=cursor)
+
+    @track_query
+    async def get_last_price(self, ticker: str) -> Optional[PriceTick]:
+        """Получает последнюю цену"""
+        query = select(PriceTick)\
+            .where(PriceTick.ticker == ticker)\
+            .order_by(desc(PriceTick.timestamp))\
+            .limit(1)
+        return await self.db.scalar(query)
+
+    async def get_first_timestamp(self, ticker: str, date_to: Optional[int] = None) -> Optional[int]:
+        """Самый ранний timestamp тиков тикера (среди тиков до date_to, если задан)"""
+        query = select(func.min(PriceTick.timestamp)).where(PriceTick.ticker == ticker)
+        if date_to is not None:
+            query = query.where(PriceTick.timestamp < date_to)
+        return await self.db.scalar(query)
+
+    @track_query
+    async def get_by_date_range(
+        self,
+        ticker: str,
+        date_from: Optional[int] = None,
+        date_to: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[Tuple[int, int]] = None
+    ) -> List[PriceTick]:
+        """
+        Получает записи за период, от новых к старым.
+
+        Пагинация по ключу (timestamp, id): страница начинается сразу после
+        cursor, поэтому глубина листания не влияет на стоимость запроса.
+        """
+        query = _page_query(select(PriceTick), ticker, date_from, date_to, limit, cursor)
+        return list(await self.db.scalars(query))
+
+    @track_query
+    async def get_rows_by_date_range(
+        self,
+        ticker: str,
+        date_from: Optional[int] = None,
+        date_to: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[Tuple[int, int]] = None
+    ) -> List[Row]:
+        """
+        То же, что get_by_date_range, но строками Core без ORM-объектов.
+
+        Колонки идут в порядке полей PriceTickResponse, цена приводится к float в SQL.
+        """
+        table = PriceTick.__table__
+        columns = select(
+            table.c.ticker,
+            cast(table.c.price, Float).label("price"),
+            table.c.timestamp,
+            table.c.id,
+            table.c.created_at,
+        )
+        query = _page_query(columns, ticker, date_from, date_to, limit, cursor)
+        return (await self.db.execute(query)).all()
+
+    @track_query
+    async def get_series(
+        self,
+        ticker: str,
+        date_from: Optional[int] = None,
+        date_to: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Загружает ряд цен тикера в непрерывные массивы (timestamps int64, prices float64),
+        от старых к новым.
+
+        Цена приводится к float в SQL, строки не проходят через ORM.
+        """
+        query = select(PriceTick.timestamp, cast(PriceTick.price, Float))\
+            .where(PriceTick.ticker == ticker)
         if date_from:
-            query = query.filter(PriceTick.timestamp >= date_from)
+            query = query.where(PriceTick.timestamp >= date_from)
         if date_to:
-            query = query.filter(PriceTick.timestamp <= date_to)
-        
-        return query.order_by(desc(PriceTick.timestamp)).all()
+            query = query.where(PriceTick.timestamp <= date_to)
+        query = query.order_by(PriceTick.timestamp)
+        if limit:
+            query = query.limit(limit)
+
+        rows = (await self.db.execute(query)).all()
+        timestamps = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        prices = np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows))
+        return timestamps, prices
+
+    async def stream_rows(
+        self,
+        ticker: str,
+        date_from: Optional[int] = None,
+        date_to: Optional[int] = None,
+        batch_size: int = 5_000
+    ) -> AsyncIterator[List[Row]]:
+        """
+        Потоково отдает историю тикера пачками строк (без ORM-объектов), от старых к новым.
+
+        Использует серверный курсор (stream_results), поэтому память
+        не зависит от размера истории.
+        """
+        table = PriceTick.__table__
+        query = select(table.c.id, table.c.ticker, table.c.price, table.c.timestamp, table.c.created_at)\
+            .where(table.c.ticker == ticker)
+        if date_from:
+            query = query.where(table.c.timestamp >= date_from)
+        if date_to:
+            query = query.where(table.c.timestamp <= date_to)
+
+        result = await self.db.stream(
+            query.order_by(table.c.timestamp).execution_options(yield_per=batch_size)
+        )
+        async for partition in result.partitions():
+            yield partition
+
+    @track_query
+    async def get_candles(
+        self,
+        ticker: str,
+        interval: int,
+        date_from: Optional[int] = None,
+        date_to: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Получает OHLC-свечи с шагом interval секунд.
+
+        На PostgreSQL агрегирует в SQL, на остальных диалектах (SQLite в тестах)
+        считает в Python за один проход по отсортированным тикам.
+        """
+        conditions = [PriceTick.ticker == ticker]
+        if date_from:
+            conditions.append(PriceTick.timestamp >= date_from)
+        if date_to:
+            conditions.append(PriceTick.timestamp <= date_to)
+
+        if self.db.get_bind().dialect.name == "postgresql":
+            # Интервал подставляется литералом, иначе выражения в SELECT и GROUP BY
+            # получат разные bind-параметры и PostgreSQL их не сопоставит
+            step = literal_column(str(int(interval)))
+            bucket = (PriceTick.timestamp - PriceTick.timestamp % step).label("bucket")
+            query = select(
+                bucket,
+                postgresql.array_agg(aggregate_order_by(PriceTick.price, PriceTick.timestamp.asc()))[1].label("open"),
+                func.max(PriceTick.price).label("high"),
+                func.min(PriceTick.price).label("low"),
+                postgresql.array_agg(aggregate_order_by(PriceTick.price, PriceTick.timestamp.desc()))[1].label("close"),
+                func.count().label("count"),
+            ).where(*conditions).group_by(bucket).order_by(bucket)
+            rows = await self.db.execute(query)
+            return [
+                {
+                    "bucket": row.bucket,
+                    "open": float(row.open),
+                    "high": float(row.high),
+                    "low": float(row.low),
+                    "close": float(row.close),
+                    "count": row.count,
+                }
+                for row in rows
+            ]
+
+        query = select(PriceTick.timestamp, PriceTick.price)\
+            .where(*conditions)\
+            .order_by(PriceTick.timestamp)
+        builder = CandleBuilder(interval)
+        result = await self.db.stream(query.execution_options(yield_per=10_000))
+        async for timestamp, price in result:
+            builder.add(timestamp, price)
+        return builder.candles
+
+    @track_query
+    async def get_rollup_candles(
+        self,
+        ticker: str,
+        interval: int,
+        date_from: Optional[int] = None,
+        date_to: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Получает свечи из предрассчитанных роллапов, без сканирования сырых тиков"""
+        query = select(
+            PriceRollup.bucket,
+            PriceRollup.open,
+            PriceRollup.high,
+            PriceRollup.low,
+            PriceRollup.close,
+            PriceRollup.count,
+        ).where(PriceRollup.ticker == ticker, PriceRollup.interval == interval)
+
+        if date_from:
+            query = query.where(PriceRollup.bucket >= bucket_start(date_from, interval))
+        if date_to:
+            query = query.where(PriceRollup.bucket <= date_to)
+
+        rows = await self.db.execute(query.order_by(PriceRollup.bucket))
+        return [
+            {
+                "bucket": row.bucket,
+                "open": float(row.open),
+                "high": float(row.high),
+                "low": float(row.low),
+                "close": float(row.close),
+                "count": row.count,
+            }
+            for row in rows
+        ]
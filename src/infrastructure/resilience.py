@@ -0,0 +1,219 @@
+"""
+Примитивы устойчивости клиентов внешних API: лимит частоты, предохранитель,
+повторы с джиттером и дублирующие (hedged) запросы.
+
+Все объекты рассчитаны на один event loop и разделяются корутинами процесса.
+"""
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+
+class CircuitOpenError(Exception):
+    """Предохранитель разомкнут: запрос не отправлялся"""
+
+    reason = "circuit_open"
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"Circuit {name} is open, retry in {retry_in:.1f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class TokenBucket:
+    """
+    Token bucket: в среднем rate операций в секунду, не больше capacity подряд.
+
+    acquire ждет токен (ожидающие обслуживаются по очереди), try_acquire
+    не ждет. rate <= 0 — без ограничения.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self.clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+        self.acquired = 0
+        self.waits = 0
+        self.wait_time = 0.0
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        if self.rate <= 0:
+            return True
+        self._refill()
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        self.acquired += 1
+        return True
+
+    async def acquire(self) -> float:
+        """Берет токен, при необходимости ждет; возвращает время ожидания в секундах"""
+        if self.rate <= 0:
+            return 0.0
+        async with self._lock:
+            self._refill()
+            delay = max(0.0, (1.0 - self._tokens) / self.rate)
+            if delay > 0:
+                await asyncio.sleep(delay)
+                self._refill()
+                self.waits += 1
+                self.wait_time += delay
+            self._tokens -= 1.0
+            self.acquired += 1
+            return delay
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate": self.rate,
+            "capacity": self.capacity,
+            "acquired": self.acquired,
+            "waits": self.waits,
+            "wait_time": round(self.wait_time, 4),
+        }
+
+
+class CircuitBreaker:
+    """
+    Предохранитель одного эндпоинта.
+
+    closed: запросы идут, подряд failure_threshold ошибок размыкают цепь.
+    open: запросы отклоняются reset_timeout секунд.
+    half_open: пропускается один пробный запрос; успех замыкает цепь, ошибка снова размыкает.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self.trips = 0
+        self._probe_in_flight = False
+
+    def before_call(self) -> None:
+        """Пропускает запрос или бросает CircuitOpenError"""
+        if self.state == self.OPEN:
+            retry_in = self.opened_at + self.reset_timeout - self.clock()
+            if retry_in > 0:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, retry_in)
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, 0.0)
+            self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.trips += 1
+            self.state = self.OPEN
+            self.opened_at = self.clock()
+            self._probe_in_flight = False
+
+    def release(self) -> None:
+        """Запрос отменен без результата: следующий вызов в half_open снова станет пробным"""
+        self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
+
+
+class LatencyTracker:
+    """Скользящее окно задержек успешных запросов для порога дублирования"""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full jitter: случайная пауза от 0 до min(cap, base * 2**attempt)"""
+    return random.uniform(0.0, min(cap, base * (2 ** attempt)))
+
+
+async def hedged(
+    call: Callable[[], Awaitable[Any]],
+    delay: Optional[float],
+    on_hedge: Optional[Callable[[], None]] = None
+) -> Tuple[Any, bool]:
+    """
+    Выполняет call; если за delay секунд ответа нет, запускает второй такой же
+    запрос (и вызывает on_hedge) и возвращает первый успешный результат,
+    оставшийся запрос отменяется. Подходит только для идемпотентных запросов.
+
+    Returns:
+        (результат, True если победил дублирующий запрос)
+    """
+    first = asyncio.ensure_future(call())
+    pending = {first}
+    try:
+        if delay is None:
+            return await first, False
+
+        done, _ = await asyncio.wait(pending, timeout=delay)
+        if done:
+            return first.result(), False
+
+        if on_hedge is not None:
+            on_hedge()
+        second = asyncio.ensure_future(call())
+        pending.add(second)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), task is second
+                error = task.exception()
+        raise error
+    finally:
+        # В том числе при отмене вызывающей корутины
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,78 @@
+"""
+Расписание ингеста, выровненное по границам часов.
+
+AlignedSchedule срабатывает на границах кратных интервалу (…:00, …:15 при
+интервале 15 с), а не через interval после предыдущего запуска, поэтому
+запуски не уплывают. AlignedScheduler передает задаче начало ее слота
+(kwarg slot) и срок годности сообщения: запуск, не начатый до дедлайна
+слота, воркер отбросит, а не выполнит с опозданием.
+
+    celery -A src.infrastructure.celery_app beat -S src.infrastructure.scheduling:AlignedScheduler
+"""
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from celery.beat import PersistentScheduler, ScheduleEntry
+from celery.schedules import schedule, schedstate
+from src.core.config import settings
+
+
+def slot_for(timestamp: float, interval: int) -> int:
+    """Начало слота, в который попадает timestamp"""
+    return int(timestamp // interval) * interval
+
+
+def slot_deadline(slot: int, interval: Optional[int] = None) -> float:
+    """Момент, после которого запуск слота уже не имеет смысла"""
+    return slot + (settings.ingest_deadline or interval or settings.ingest_interval)
+
+
+def is_expired(slot: Optional[int], now: Optional[float] = None) -> bool:
+    """Истек ли дедлайн слота; запуск без слота (вручную) не истекает"""
+    if slot is None:
+        return False
+    return (now if now is not None else time.time()) >= slot_deadline(slot)
+
+
+class AlignedSchedule(schedule):
+    """Интервал interval секунд (не меньше 1), выровненный по границам часов"""
+
+    def __init__(self, interval: int, nowfun=None, app=None):
+        self.interval = max(int(interval), 1)
+        super().__init__(run_every=self.interval, nowfun=nowfun, app=app)
+
+    def is_due(self, last_run_at: datetime) -> schedstate:
+        now = self.now().timestamp()
+        last_run = self.maybe_make_aware(last_run_at).timestamp()
+        next_slot = slot_for(last_run, self.interval) + self.interval
+        if now >= next_slot:
+            # Пропущенные слоты не догоняются: запускается только текущий
+            return schedstate(is_due=True, next=slot_for(now, self.interval) + self.interval - now)
+        return schedstate(is_due=False, next=next_slot - now)
+
+    def __reduce__(self):
+        return self.__class__, (self.interval, self.nowfun)
+
+    def __repr__(self) -> str:
+        return f"<aligned every {self.interval}s>"
+
+
+def aligned_entry(entry: ScheduleEntry, now: float) -> ScheduleEntry:
+    """Копия записи beat со слотом в kwargs и сроком годности до дедлайна слота"""
+    interval = entry.schedule.interval
+    slot = slot_for(now, interval)
+    expires = datetime.fromtimestamp(slot_deadline(slot, interval), timezone.utc)
+    return ScheduleEntry(**dict(
+        entry,
+        kwargs={**(entry.kwargs or {}), "slot": slot},
+        options={**(entry.options or {}), "expires": expires},
+    ))
+
+
+class AlignedScheduler(PersistentScheduler):
+    """Scheduler beat, который добавляет слот и дедлайн задачам с AlignedSchedule"""
+
+    def apply_async(self, entry, producer=None, advance=True, **kwargs):
+        if isinstance(entry.schedule, AlignedSchedule):
+            entry = aligned_entry(entry, time.time())
+        return super().apply_async(entry, producer=producer, advance=advance, **kwargs)
@@ -0,0 +1,160 @@
+"""
+Буфер тиков для отложенной записи (write-behind).
+
+Ингест кладет тики в буфер, а GroupCommitFlusher забирает их пачками и пишет
+одной транзакцией. Буфер — очередь FIFO, поэтому при одном флашере тики
+каждого тикера попадают в БД в порядке поступления. Буфер ограничен: когда он
+полон, put ждет свободного места, и ингест замедляется вместе с записью;
+offer не ждет и сообщает, что места нет (так пишет потоковый ингест).
+Тики, которые флашер не смог записать, откладываются в dead-letter буфера
+и в очередь не возвращаются.
+"""
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, List, Optional, Sequence
+import redis.asyncio as aioredis
+from src.core.config import settings
+from src.domain.schemas import PriceTickCreate
+from src.infrastructure.metrics import WRITE_BEHIND_WAIT
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryTickBuffer:
+    """Буфер в памяти процесса; переживает только корректную остановку с flush"""
+
+    def __init__(self, max_size: Optional[int] = None):
+        self.max_size = max_size or settings.write_behind_max_size
+        self._items: Deque[PriceTickCreate] = deque()
+        self._changed = asyncio.Condition()
+        self.dead_letters: List[PriceTickCreate] = []
+
+    async def put(self, ticks: Sequence[PriceTickCreate]) -> float:
+        """Добавляет тики, при полном буфере ждет места; возвращает время ожидания"""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        ticks = list(ticks)
+        async with self._changed:
+            while ticks:
+                await self._changed.wait_for(lambda: len(self._items) < self.max_size)
+                free = self.max_size - len(self._items)
+                self._items.extend(ticks[:free])
+                ticks = ticks[free:]
+                self._changed.notify_all()
+        waited = loop.time() - started
+        WRITE_BEHIND_WAIT.observe(waited)
+        return waited
+
+    async def offer(self, ticks: Sequence[PriceTickCreate]) -> bool:
+        """Добавляет тики без ожидания, только если место есть для всех; иначе False"""
+        ticks = list(ticks)
+        async with self._changed:
+            if len(self._items) + len(ticks) > self.max_size:
+                return False
+            self._items.extend(ticks)
+            self._changed.notify_all()
+            return True
+
+    async def take(self, limit: int) -> List[PriceTickCreate]:
+        async with self._changed:
+            batch = [self._items.popleft() for _ in range(min(limit, len(self._items)))]
+            self._changed.notify_all()
+            return batch
+
+    async def requeue(self, ticks: Sequence[PriceTickCreate]) -> None:
+        """Возвращает неудачную пачку в начало очереди (сверх лимита: она уже была в буфере)"""
+        async with self._changed:
+            self._items.extendleft(reversed(list(ticks)))
+            self._changed.notify_all()
+
+    async def dead_letter(self, ticks: Sequence[PriceTickCreate]) -> None:
+        """Откладывает тики, которые не удалось записать, в сторону от очереди"""
+        self.dead_letters.extend(ticks)
+
+    async def wait(self, min_items: int, timeout: float) -> None:
+        """Ждет, пока наберется min_items тиков, но не дольше timeout"""
+        async with self._changed:
+            try:
+                await asyncio.wait_for(
+                    self._changed.wait_for(lambda: len(self._items) >= min_items), timeout
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def size(self) -> int:
+        return len(self._items)
+
+
+class RedisTickBuffer:
+    """
+    Буфер в списке Redis, общий для процессов: воркеры ингеста кладут тики,
+    отдельный процесс (python -m src.application.write_behind) их записывает.
+
+    Лимит мягкий: одновременные put из разных процессов могут превысить его
+    на размер своих пачек.
+    """
+
+    key = "ingest:write_behind"
+    dead_letter_key = "ingest:write_behind:dead"
+
+    def __init__(
+        self,
+        client: aioredis.Redis,
+        max_size: Optional[int] = None,
+        poll_interval: float = 0.05
+    ):
+        self.client = client
+        self.max_size = max_size or settings.write_behind_max_size
+        self.poll_interval = poll_interval
+
+    async def put(self, ticks: Sequence[PriceTickCreate]) -> float:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        payloads = [tick.model_dump_json() for tick in ticks]
+        while payloads:
+            free = self.max_size - await self.client.llen(self.key)
+            if free <= 0:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            await self.client.rpush(self.key, *payloads[:free])
+            payloads = payloads[free:]
+        waited = loop.time() - started
+        WRITE_BEHIND_WAIT.observe(waited)
+        return waited
+
+    async def take(self, limit: int) -> List[PriceTickCreate]:
+        payloads = await self.client.lpop(self.key, limit) or []
+        return [PriceTickCreate.model_validate_json(payload) for payload in payloads]
+
+    async def requeue(self, ticks: Sequence[PriceTickCreate]) -> None:
+        if ticks:
+            await self.client.lpush(self.key, *[tick.model_dump_json() for tick in reversed(list(ticks))])
+
+    async def dead_letter(self, ticks: Sequence[PriceTickCreate]) -> None:
+        if ticks:
+            await self.client.rpush(self.dead_letter_key, *[tick.model_dump_json() for tick in ticks])
+
+    async def wait(self, min_items: int, timeout: float) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while await self.client.llen(self.key) < min_items and loop.time() < deadline:
+            await asyncio.sleep(min(self.poll_interval, max(deadline - loop.time(), 0)))
+
+    async def size(self) -> int:
+        return await self.client.llen(self.key)
+
+
+def create_tick_buffer(backend: Optional[str] = None):
+    """
+    Создает буфер по настройке write_behind_backend:
+    memory — в процессе, redis — список по settings.redis_url, fakeredis — Redis в памяти (тесты).
+    """
+    backend = backend or settings.write_behind_backend or "memory"
+    if backend == "memory":
+        return MemoryTickBuffer()
+    if backend == "fakeredis":
+        import fakeredis.aioredis
+
+        return RedisTickBuffer(fakeredis.aioredis.FakeRedis())
+    return RedisTickBuffer(aioredis.Redis.from_url(settings.redis_url, socket_timeout=2.0, socket_connect_timeout=2.0))
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import threading
+from typing import Optional, Any, Coroutine
+from src.core.config import settings
+from src.infrastructure.deribit_client import DeribitClient
+from src.infrastructure.tick_buffer import create_tick_buffer
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerRuntime:
+    """
+    Долгоживущий event loop и Deribit-клиент процесса Celery worker.
+
+    Loop крутится в отдельном потоке, поэтому HTTP-сессия с keep-alive
+    соединениями переживает отдельные запуски задач.
+    """
+
+    def __init__(self, base_url: Optional[str] = None):
+        self.base_url = base_url
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.client: Optional[DeribitClient] = None
+        # Общий буфер write-behind в Redis, если ингест пишет через него
+        self.buffer = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Запускает loop и создает клиента (повторный вызов ничего не делает)"""
+        with self._lock:
+            if self.is_running:
+                return
+
+            self.loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._run_loop,
+                name="worker-runtime",
+                daemon=True
+            )
+            self._thread.start()
+            self.client = DeribitClient(self.base_url)
+            if settings.write_behind_backend == "redis":
+                self.buffer = create_tick_buffer("redis")
+            logger.info("Worker runtime started")
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Выполняет корутину в loop воркера и ждет результат"""
+        if not self.is_running:
+            coro.close()
+            raise RuntimeError("Worker runtime is not running")
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        return future.result(timeout)
+
+    def stop(self) -> None:
+        """Закрывает HTTP-сессию и останавливает loop"""
+        with self._lock:
+            if not self.is_running:
+                return
+
+            try:
+                asyncio.run_coroutine_threadsafe(self.client.close(), self.loop).result(10)
+            except Exception as e:
+                logger.error(f"Failed to close Deribit client: {e}")
+            if self.buffer is not None:
+                try:
+                    asyncio.run_coroutine_threadsafe(self.buffer.client.aclose(), self.loop).result(10)
+                except Exception as e:
+                    logger.error(f"Failed to close write-behind buffer: {e}")
+
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+            self.loop.close()
+
+            self.loop = None
+            self.client = None
+            self.buffer = None
+            self._thread = None
+            logger.info("Worker runtime stopped")
+
+
+# Один runtime на процесс воркера, управляется сигналами Celery
+worker_runtime = WorkerRuntime()
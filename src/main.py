@@ -1,7 +1,10 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from src.core.config import settings
-from src.infrastructure.database import init_db
-from src.api.routers import prices
+from src.api.routers import prices, analytics, live
+from src.api.middleware import MetricsMiddleware, ProfilingMiddleware
+from src.infrastructure.profiling import RequestProfiler
+from src.infrastructure.metrics import render_latest
+from src.infrastructure.live import get_price_hub
 import logging
 
 logging.basicConfig(
@@ -18,25 +21,36 @@ app = FastAPI(
     redoc_url="/api/redoc",
 )
 
+app.add_middleware(MetricsMiddleware)
+# Профилирование подключается только по настройкам: без них в цепочке нет лишнего слоя
+if settings.profiling_sample_rate > 0 or settings.profiling_token:
+    app.add_middleware(
+        ProfilingMiddleware,
+        profiler=RequestProfiler(settings.profiling_dir),
+        sample_rate=settings.profiling_sample_rate,
+        token=settings.profiling_token,
+    )
+
 # Регистрируем роутеры
 app.include_router(prices.router)
+app.include_router(analytics.router)
+app.include_router(live.router)
 
 
 @app.on_event("startup")
 async def startup_event():
     """Действия при запуске приложения"""
+    # Схему БД до старта API поднимает alembic upgrade head (entrypoint.sh)
     logger.info("Starting up...")
-    try:
-        init_db()
-        logger.info("Database initialized successfully")
-    except Exception as e:
-        logger.error(f"Database initialization failed: {e}")
+    # Слушатель Redis pub/sub для /ws/prices и /prices/stream (один на процесс)
+    await get_price_hub().start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Действия при остановке приложения"""
     logger.info("Shutting down...")
+    await get_price_hub().stop()
 
 
 @app.get("/")
@@ -47,14 +61,25 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "health": "/health",
+            "metrics": "/metrics",
             "fetch_prices": "/fetch-prices",
             "prices_all": "/prices/all?ticker=btc_usd",
             "prices_last": "/prices/last?ticker=btc_usd",
+            "prices_stream": "/prices/stream?tickers=btc_usd,eth_usd",
+            "prices_ws": "/ws/prices?tickers=btc_usd,eth_usd",
+            "analytics_summary": "/analytics/btc_usd/summary",
             "docs": "/api/docs"
         }
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Метрики Prometheus"""
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
+
+
 @app.get("/health")
 async def health_check():
     """Проверка здоровья"""
@@ -65,13 +90,11 @@ async def health_check():
 async def fetch_prices_manually():
     """Ручной запрос цен (для тестирования)"""
     from src.infrastructure.database import SessionLocal
-    from src.application.services import PriceService
-    from src.infrastructure.repositories import PriceRepository
+    from src.application.services import create_price_service
 
     db = SessionLocal()
     try:
-        repository = PriceRepository(db)
-        service = PriceService(repository)
+        service = create_price_service(db)
         results = service.fetch_and_store_prices_sync()
 
         return {
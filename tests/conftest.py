@@ -1,39 +1,63 @@
+import os
+
+# Кэш цен в тестах работает поверх fakeredis (задается до импорта настроек)
+os.environ.setdefault("CACHE_BACKEND", "fakeredis")
+os.environ.setdefault("LIVE_BACKEND", "memory")
+os.environ.setdefault("INGEST_COORDINATION_BACKEND", "fakeredis")
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import StaticPool, NullPool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
-from src.infrastructure.database import Base, get_db
+from src.infrastructure.database import Base, get_db, get_async_db
+from src.infrastructure.cache import create_price_cache, get_price_cache
 from src.main import app
 
 
-# Тестовая база данных в памяти
-TEST_DATABASE_URL = "sqlite:///:memory:"
+@pytest.fixture(scope="function")
+def database_path(tmp_path):
+    """Файл тестовой SQLite БД: общий для синхронного и асинхронного engine"""
+    return tmp_path / "test.db"
+
 
 @pytest.fixture(scope="function")  # Изменено с session на function
-def engine():
+def engine(database_path):
     """Фикстура для создания тестового движка БД"""
     engine = create_engine(
-        TEST_DATABASE_URL,
+        f"sqlite:///{database_path}",
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
     Base.metadata.create_all(bind=engine)
     yield engine
     Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def async_engine(engine, database_path):
+    """Асинхронный движок (aiosqlite) поверх той же тестовой БД"""
+    return create_async_engine(
+        f"sqlite+aiosqlite:///{database_path}",
+        poolclass=NullPool,
+    )
 
 
 @pytest.fixture
 def session(engine):
-    """Фикстура для тестовой сессии БД с изоляцией транзакций"""
-    connection = engine.connect()
-    transaction = connection.begin()
+    """
+    Фикстура для тестовой сессии БД.
     
+    Изоляция обеспечивается отдельным файлом БД на каждый тест: данные
+    коммитятся, чтобы их видел асинхронный engine API.
+    """
     TestingSessionLocal = sessionmaker(
         autocommit=False, 
         autoflush=False, 
-        bind=connection
+        bind=engine
     )
     
     db = TestingSessionLocal()
@@ -42,12 +66,16 @@ def session(engine):
         yield db
     finally:
         db.close()
-        transaction.rollback()  # Откатываем изменения после теста
-        connection.close()
 
 
 @pytest.fixture
-def client(session):
+def price_cache():
+    """Фикстура для чистого кэша последних цен на fakeredis"""
+    return create_price_cache("fakeredis")
+
+
+@pytest.fixture
+def client(session, async_engine, price_cache):
     """Фикстура для тестового клиента FastAPI"""
     def override_get_db():
         try:
@@ -55,7 +83,19 @@ def client(session):
         finally:
             session.close()
     
+    TestingAsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        autoflush=False,
+        expire_on_commit=False
+    )
+    
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
+    
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_price_cache] = lambda: price_cache
     test_client = TestClient(app)
     yield test_client
     app.dependency_overrides.clear()
@@ -77,3 +117,17 @@ def clean_db(session):
     yield
     session.query(PriceTick).delete()
     session.commit()
+
+
+@pytest.fixture
+async def async_session(async_engine):
+    """Фикстура для асинхронной тестовой сессии БД"""
+    async with async_sessionmaker(bind=async_engine, expire_on_commit=False)() as db:
+        yield db
+
+
+@pytest.fixture
+def async_price_repository(async_session):
+    """Фикстура для асинхронного репозитория цен"""
+    from src.infrastructure.repositories import AsyncPriceRepository
+    return AsyncPriceRepository(async_session)
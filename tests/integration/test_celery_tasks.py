@@ -0,0 +1,153 @@
+import time
+from unittest.mock import patch
+import pytest
+from src.application.tasks import dispatch_ingest_task, fetch_and_store_prices_task, fetch_shard_task
+from src.core.config import settings
+from src.domain.models import PriceTick
+from src.infrastructure.lease import InstrumentLatencyStore, RedisLease, get_coordination_redis
+from src.infrastructure.scheduling import slot_for
+from src.infrastructure.worker_runtime import worker_runtime
+
+
+async def fake_get_index_price_by_name(index_name):
+    return {"ticker": index_name, "price": 100.0, "timestamp": 1000}
+
+
+def test_fetch_and_store_prices_task(session):
+    """Тест задачи сбора цен через долгоживущий runtime воркера"""
+    # Arrange
+    with patch("src.application.tasks.SessionLocal", return_value=session), \
+         patch("src.infrastructure.deribit_client.DeribitClient.get_index_price_by_name",
+               side_effect=fake_get_index_price_by_name):
+        
+        # Act
+        try:
+            result = fetch_and_store_prices_task.apply().get()
+        finally:
+            worker_runtime.stop()
+    
+    # Assert
+    assert result["status"] == "success"
+    assert result["prices_fetched"] == 2
+    assert set(result["instruments"]) == {"btc_usd", "eth_usd"}
+    assert session.query(PriceTick).count() == 2
+
+
+def test_dispatch_ingest_runs_shards_as_chord(session, monkeypatch):
+    """Запуск по шардам в eager-режиме: все шарды сохраняют цены, аренда снимается"""
+    redis_client = get_coordination_redis()
+    redis_client.flushall()
+    monkeypatch.setattr(settings, "tracked_tickers", ["btc_usd", "eth_usd", "sol_usdc"])
+    monkeypatch.setattr(settings, "ingest_max_shard_size", 1)
+    monkeypatch.setattr(dispatch_ingest_task.app.conf, "task_always_eager", True)
+
+    with patch("src.application.tasks.SessionLocal", return_value=session), \
+         patch("src.infrastructure.deribit_client.DeribitClient.get_index_price_by_name",
+               side_effect=fake_get_index_price_by_name):
+        try:
+            result = dispatch_ingest_task.apply().get()
+        finally:
+            worker_runtime.stop()
+
+    assert result["status"] == "dispatched"
+    assert result["shards"] == [["btc_usd"], ["eth_usd"], ["sol_usdc"]]
+    assert session.query(PriceTick).count() == 3
+    assert RedisLease(redis_client, "ingest", 1000).holder() is None
+    assert set(InstrumentLatencyStore(redis_client).get(settings.tracked_tickers)) == {
+        "btc_usd", "eth_usd", "sol_usdc"
+    }
+
+
+def test_dispatch_ingest_skips_while_previous_run_holds_lease(session):
+    """Пока аренда занята незавершенным запуском, новый тик ничего не запускает"""
+    redis_client = get_coordination_redis()
+    redis_client.flushall()
+    RedisLease(redis_client, "ingest", 60_000).acquire()
+
+    result = dispatch_ingest_task.apply().get()
+
+    assert result == {"status": "skipped"}
+    assert session.query(PriceTick).count() == 0
+
+
+def test_dispatch_ingest_stamps_ticks_with_slot(session, monkeypatch):
+    """Тики запуска получают время слота, а не время ответа Deribit"""
+    get_coordination_redis().flushall()
+    monkeypatch.setattr(dispatch_ingest_task.app.conf, "task_always_eager", True)
+    slot = slot_for(time.time(), settings.ingest_interval)
+
+    with patch("src.application.tasks.SessionLocal", return_value=session), \
+         patch("src.infrastructure.deribit_client.DeribitClient.get_index_price_by_name",
+               side_effect=fake_get_index_price_by_name):
+        try:
+            result = dispatch_ingest_task.apply(kwargs={"slot": slot}).get()
+        finally:
+            worker_runtime.stop()
+
+    assert result["status"] == "dispatched"
+    assert {tick.timestamp for tick in session.query(PriceTick)} == {slot}
+
+
+def test_expired_slot_is_dropped_not_retried(session):
+    """Запуск, опоздавший к дедлайну слота, ничего не делает"""
+    get_coordination_redis().flushall()
+    slot = slot_for(time.time(), settings.ingest_interval) - 10 * settings.ingest_interval
+
+    dispatched = dispatch_ingest_task.apply(kwargs={"slot": slot}).get()
+    fetched = fetch_and_store_prices_task.apply(kwargs={"slot": slot}).get()
+
+    assert dispatched == {"status": "expired", "slot": slot}
+    assert fetched["status"] == "expired"
+    assert session.query(PriceTick).count() == 0
+
+
+def test_shard_retries_and_fails_when_storage_fails(session):
+    """Ошибка записи не проглатывается: шард повторяется, затем падает без замеров задержки"""
+    # Arrange
+    redis = get_coordination_redis()
+    redis.flushall()
+    with patch("src.application.tasks.SessionLocal", return_value=session), \
+         patch("src.infrastructure.deribit_client.DeribitClient.get_index_price_by_name",
+               side_effect=fake_get_index_price_by_name), \
+         patch("src.infrastructure.repositories.PriceRepository.bulk_upsert",
+               side_effect=RuntimeError("value too long for type character varying(10)")) as bulk_upsert:
+
+        # Act
+        try:
+            result = fetch_shard_task.apply(kwargs={"tickers": ["btc_usd"]})
+        finally:
+            worker_runtime.stop()
+
+    # Assert
+    with pytest.raises(RuntimeError):
+        result.get()
+    assert bulk_upsert.call_count == fetch_shard_task.max_retries + 1
+    assert InstrumentLatencyStore(redis).get(["btc_usd"]) == {}
+
+
+def test_storage_failure_near_deadline_is_dropped_not_retried(session, monkeypatch):
+    """Ошибка записи у дедлайна слота: шард отбрасывается, задача сбора падает без повтора"""
+    # Arrange
+    get_coordination_redis().flushall()
+    monkeypatch.setattr(settings, "ingest_deadline", 60)
+    # До дедлайна меньше отсрочки любого повтора, но сам слот еще не истек
+    slot = int(time.time()) - 58
+    with patch("src.application.tasks.SessionLocal", return_value=session), \
+         patch("src.infrastructure.deribit_client.DeribitClient.get_index_price_by_name",
+               side_effect=fake_get_index_price_by_name), \
+         patch("src.infrastructure.repositories.PriceRepository.bulk_upsert",
+               side_effect=RuntimeError("database is locked")) as bulk_upsert:
+
+        # Act
+        try:
+            shard = fetch_shard_task.apply(kwargs={"tickers": ["btc_usd"], "slot": slot}).get()
+            fetched = fetch_and_store_prices_task.apply(kwargs={"slot": slot})
+        finally:
+            worker_runtime.stop()
+
+    # Assert
+    assert shard["expired"] is True
+    assert shard["prices_fetched"] == 0
+    with pytest.raises(RuntimeError):
+        fetched.get()
+    assert bulk_upsert.call_count == 2
@@ -0,0 +1,74 @@
+import sqlalchemy as sa
+from sqlalchemy import create_engine
+from src.domain.models import PriceTick
+from src.infrastructure.database import Base, init_db
+
+LEGACY_PRICE_TICKS = """
+    CREATE TABLE price_ticks (
+        id INTEGER NOT NULL PRIMARY KEY,
+        ticker VARCHAR(10) NOT NULL,
+        price NUMERIC(12, 2) NOT NULL,
+        timestamp INTEGER NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+def migrated_state(engine):
+    inspector = sa.inspect(engine)
+    with engine.connect() as connection:
+        version = connection.execute(sa.text("SELECT version_num FROM alembic_version")).scalar()
+        ticks = connection.execute(sa.text("SELECT ticker, timestamp FROM price_ticks ORDER BY id")).all()
+    unique_indexes = {index["name"] for index in inspector.get_indexes("price_ticks") if index["unique"]}
+    return version, [tuple(row) for row in ticks], unique_indexes, set(inspector.get_table_names())
+
+
+def test_migrations_upgrade_schema_created_by_create_all(tmp_path):
+    """БД, поднятая прежним init_db (create_all), доводится миграциями до head без ошибок"""
+    url = f"sqlite:///{tmp_path / 'init_db.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(sa.insert(PriceTick), [{"ticker": "btc_usd", "price": 1.0, "timestamp": 1000}])
+
+    init_db(url)
+    init_db(url)  # повторный запуск ничего не меняет
+
+    version, ticks, unique_indexes, tables = migrated_state(engine)
+    assert version == "0005"
+    assert ticks == [("btc_usd", 1000)]
+    assert "ix_price_ticks_ticker_timestamp" in unique_indexes
+    assert {"price_rollups", "backfill_checkpoints"} <= tables
+
+
+def test_migrations_upgrade_legacy_schema_with_duplicates(tmp_path):
+    """Исходная схема без уникальности: дубликаты удаляются, недостающие таблицы создаются"""
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        connection.execute(sa.text(LEGACY_PRICE_TICKS))
+        connection.execute(sa.text("CREATE INDEX ix_price_ticks_ticker ON price_ticks (ticker)"))
+        connection.execute(sa.text("CREATE INDEX ix_price_ticks_timestamp ON price_ticks (timestamp)"))
+        connection.execute(sa.text(
+            "INSERT INTO price_ticks (ticker, price, timestamp) "
+            "VALUES ('btc_usd', 1, 1000), ('btc_usd', 2, 1000), ('eth_usd', 3, 1000)"
+        ))
+
+    init_db(url)
+
+    version, ticks, unique_indexes, tables = migrated_state(engine)
+    assert version == "0005"
+    assert ticks == [("btc_usd", 1000), ("eth_usd", 1000)]
+    assert "ix_price_ticks_ticker_timestamp" in unique_indexes
+    assert {"price_rollups", "backfill_checkpoints"} <= tables
+
+
+def test_migrations_create_empty_database(tmp_path):
+    url = f"sqlite:///{tmp_path / 'fresh.db'}"
+
+    init_db(url)
+
+    version, ticks, unique_indexes, tables = migrated_state(create_engine(url))
+    assert version == "0005"
+    assert ticks == []
+    assert {"price_ticks", "price_rollups", "backfill_checkpoints"} <= tables
@@ -0,0 +1,58 @@
+"""
+Локальный stub Deribit API, отдающий записанные ответы.
+
+Ответ на GET /api/v2/public/<method>?<params> берется из файла
+<fixtures>/<method>/<params>.json, где params отсортированы по имени
+(например get_index_chart_data/index_name=btc_usd&range=1h.json).
+На запрос без записи отвечает ошибкой Deribit (HTTP 400).
+
+Ручной запуск (клиенту задается DERIBIT_BASE_URL=http://localhost:8089/api/v2):
+    python -m tests.stubs.deribit --port 8089
+"""
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List, Tuple
+from urllib.parse import urlencode
+from aiohttp import web
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / "fixtures" / "deribit"
+
+
+def recording_path(root: Path, method: str, params: Dict[str, str]) -> Path:
+    return root / method / f"{urlencode(sorted(params.items()))}.json"
+
+
+class DeribitStub:
+    """aiohttp-приложение stub-сервера; requests хранит все полученные запросы"""
+
+    def __init__(self, fixtures_dir: Path = FIXTURES_DIR):
+        self.fixtures_dir = Path(fixtures_dir)
+        self.requests: List[Tuple[str, Dict[str, str]]] = []
+        self.app = web.Application()
+        self.app.router.add_get("/api/v2/public/{method}", self.handle)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        params = dict(request.query)
+        self.requests.append((method, params))
+
+        path = recording_path(self.fixtures_dir, method, params)
+        if not path.is_file():
+            return web.json_response(
+                {"jsonrpc": "2.0", "error": {"code": -32602, "message": f"no recording for {path.name}"}},
+                status=400,
+            )
+        return web.Response(body=path.read_bytes(), content_type="application/json")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stub Deribit API с записанными ответами")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--fixtures", default=str(FIXTURES_DIR))
+    args = parser.parse_args()
+    web.run_app(DeribitStub(Path(args.fixtures)).app, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import math
+import numpy as np
+import pytest
+from src.domain import analytics
+from src.domain.schemas import PriceTickCreate
+
+
+def reference_ema(prices, span):
+    alpha = 2 / (span + 1)
+    result, value = [], prices[0]
+    for price in prices:
+        value = (1 - alpha) * value + alpha * price
+        result.append(value)
+    return np.array(result)
+
+
+@pytest.mark.parametrize("span", [1, 2, 20, 500])
+def test_blocked_ema_matches_recursion(span):
+    """Блочная EMA совпадает с поэлементной рекурсией на длинном ряду"""
+    rng = np.random.default_rng(1)
+    prices = 100 * np.cumprod(1 + rng.normal(0, 1e-3, 20_000))
+
+    np.testing.assert_allclose(analytics.ema(prices, span), reference_ema(prices, span), rtol=1e-12)
+
+
+def test_rolling_statistics():
+    """SMA, волатильность, TWAP и просадка на маленьком ряду"""
+    prices = np.array([100.0, 110.0, 99.0, 121.0, 90.0])
+    timestamps = np.array([0, 10, 20, 40, 50])
+
+    returns = analytics.log_returns(prices)
+    np.testing.assert_allclose(analytics.sma(prices, 2), [105.0, 104.5, 110.0, 105.5])
+    np.testing.assert_allclose(
+        analytics.realized_volatility(returns, 2),
+        [math.sqrt(returns[0] ** 2 + returns[1] ** 2), math.sqrt(returns[1] ** 2 + returns[2] ** 2),
+         math.sqrt(returns[2] ** 2 + returns[3] ** 2)]
+    )
+    assert analytics.twap(timestamps, prices) == pytest.approx((1000 + 1100 + 99 * 20 + 1210) / 50)
+    assert analytics.max_drawdown(prices) == {"value": pytest.approx(90 / 121 - 1), "peak": 3, "trough": 4}
+
+
+def test_analytics_endpoints(client, price_repository):
+    """Эндпоинты /analytics считают по ряду из БД"""
+    # Arrange
+    price_repository.bulk_upsert([
+        PriceTickCreate(ticker="btc_usd", price=price, timestamp=1000 + i * 60)
+        for i, price in enumerate([100.0, 110.0, 99.0, 121.0, 90.0])
+    ])
+
+    # Act
+    sma = client.get("/analytics/btc_usd/sma?window=2")
+    returns = client.get("/analytics/btc_usd/returns?date_from=1060")
+    summary = client.get("/analytics/btc_usd/summary")
+    missing = client.get("/analytics/xrp_usd/summary")
+
+    # Assert
+    assert sma.status_code == 200
+    assert sma.json()["timestamps"] == [1060, 1120, 1180, 1240]
+    assert sma.json()["values"] == [105.0, 104.5, 110.0, 105.5]
+    assert returns.json()["values"] == pytest.approx(np.diff(np.log([110.0, 99.0, 121.0, 90.0])).tolist())
+    assert summary.json()["max_drawdown"] == pytest.approx(90 / 121 - 1)
+    assert summary.json()["drawdown_peak"] == 1180
+    assert missing.status_code == 404
+
+
+def test_analytics_rejects_oversized_range(client, price_repository, monkeypatch):
+    """Слишком длинный период отклоняется до вычислений"""
+    from src.core.config import settings
+    monkeypatch.setattr(settings, "analytics_max_points", 2)
+    price_repository.bulk_upsert([
+        PriceTickCreate(ticker="btc_usd", price=100.0, timestamp=1000 + i) for i in range(3)
+    ])
+
+    response = client.get("/analytics/btc_usd/ema")
+
+    assert response.status_code == 400
+
+
+def test_align_asof_forward_fills():
+    """Выравнивание берет последнюю цену не позже точки сетки"""
+    aligned = analytics.align_asof(
+        np.array([5, 10, 15, 20, 30]), np.array([10, 20, 25]), np.array([1.0, 2.0, 3.0])
+    )
+    np.testing.assert_array_equal(aligned, [np.nan, 1.0, 1.0, 2.0, 3.0])
+
+
+def test_rolling_correlation_matches_corrcoef():
+    """Скользящая корреляция через префиксные суммы совпадает с np.corrcoef по окну"""
+    rng = np.random.default_rng(2)
+    x = rng.normal(size=200)
+    y = 0.5 * x + rng.normal(size=200)
+
+    rolling = analytics.rolling_correlation(x, y, 30)
+
+    expected = [np.corrcoef(x[i:i + 30], y[i:i + 30])[0, 1] for i in range(171)]
+    np.testing.assert_allclose(rolling, expected, rtol=1e-9)
+
+
+def test_correlation_endpoint(client, price_repository):
+    """Корреляция по сетке с forward-fill и кэшем по (тикеры, окно, период)"""
+    # Arrange
+    from src.infrastructure.cache import get_analytics_cache
+    get_analytics_cache().clear()
+    btc = [100.0, 102.0, 101.0, 105.0, 104.0, 108.0]
+    price_repository.bulk_upsert(
+        [PriceTickCreate(ticker="btc_usd", price=p, timestamp=1000 + i * 60) for i, p in enumerate(btc)]
+        # ETH тикает реже: пропуски заполняются предыдущей ценой
+        + [PriceTickCreate(ticker="eth_usd", price=p, timestamp=t)
+           for t, p in [(1000, 50.0), (1060, 51.0), (1200, 52.5), (1300, 54.0)]]
+    )
+    params = {"tickers": ["btc_usd", "eth_usd"], "step": 60, "window": 2}
+
+    # Act
+    response = client.get("/analytics/correlation", params=params)
+    price_repository.bulk_upsert([PriceTickCreate(ticker="btc_usd", price=200.0, timestamp=1400)])
+    cached = client.get("/analytics/correlation", params=params)
+    single = client.get("/analytics/correlation", params={"tickers": ["btc_usd"]})
+
+    # Assert
+    assert response.status_code == 200
+    data = response.json()
+    assert data["timestamps"] == [1000, 1060, 1120, 1180, 1240, 1300]
+    pair = data["pairs"][0]
+    assert (pair["base"], pair["quote"]) == ("btc_usd", "eth_usd")
+    assert pair["spread"] == [50.0, 51.0, 50.0, 54.0, 51.5, 54.0]
+    assert pair["correlation"][:2] == [None, None]
+    assert data["matrix"][0][0] == pytest.approx(1.0)
+    assert data["matrix"][0][1] == pytest.approx(data["matrix"][1][0])
+    assert cached.json() == data
+    assert single.status_code == 400
+
+
+def test_correlation_masks_zero_price(client, price_repository):
+    """Нулевая цена не дает inf и NaN в ответе: спред, отношение и корреляция становятся null"""
+    # Arrange
+    from src.infrastructure.cache import get_analytics_cache
+    get_analytics_cache().clear()
+    price_repository.bulk_upsert(
+        [PriceTickCreate(ticker="btc_usd", price=100.0 + i, timestamp=1000 + i * 60) for i in range(4)]
+        # Цена, округленная до нуля в Numeric(12, 2), в обход валидации схемы
+        + [PriceTickCreate.model_construct(ticker="eth_usd", price=p, timestamp=1000 + i * 60)
+           for i, p in enumerate([50.0, 0.0, 52.0, 53.0])]
+    )
+
+    # Act
+    response = client.get("/analytics/correlation", params={"tickers": ["btc_usd", "eth_usd"], "step": 60, "window": 2})
+
+    # Assert
+    assert response.status_code == 200
+    pair = response.json()["pairs"][0]
+    assert pair["ratio"] == [2.0, None, pytest.approx(102.0 / 52.0), pytest.approx(103.0 / 53.0)]
+    assert pair["spread"] == [50.0, 101.0, 50.0, 50.0]
+    assert all(value is None or np.isfinite(value) for value in pair["correlation"])
+
+
+def test_correlation_limits_tickers_and_pair_points(client, price_repository, monkeypatch):
+    """Слишком много тикеров или точек в рядах пар — 400, а не неограниченный ответ"""
+    # Arrange
+    from src.core.config import settings
+    from src.infrastructure.cache import get_analytics_cache
+    get_analytics_cache().clear()
+    price_repository.bulk_upsert([
+        PriceTickCreate(ticker=ticker, price=100.0 + i, timestamp=1000 + i * 60)
+        for ticker in ("btc_usd", "eth_usd", "sol_usdc") for i in range(10)
+    ])
+    monkeypatch.setattr(settings, "analytics_max_tickers", 2)
+    monkeypatch.setattr(settings, "analytics_max_pair_points", 8)
+
+    # Act
+    too_many = client.get("/analytics/correlation", params={"tickers": ["btc_usd", "eth_usd", "sol_usdc"]})
+    too_long = client.get("/analytics/correlation", params={"tickers": ["btc_usd", "eth_usd"], "step": 60})
+    coarse = client.get("/analytics/correlation", params={"tickers": ["btc_usd", "eth_usd"], "step": 120})
+
+    # Assert
+    assert too_many.status_code == 400
+    assert "At most 2 tickers" in too_many.json()["detail"]
+    assert too_long.status_code == 400
+    assert coarse.status_code == 200
+    assert len(coarse.json()["timestamps"]) == 5
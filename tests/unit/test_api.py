@@ -91,3 +91,190 @@ def test_health_check(client):
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json()["status"] == "healthy"
+
+
+def test_get_last_price_served_from_cache(client, price_repository, price_cache):
+    """Тест, что запись через сервис обновляет кэш и /prices/last не ходит в БД"""
+    # Arrange
+    from src.application.services import PriceService
+    from src.domain.schemas import PriceTickCreate
+    
+    service = PriceService(price_repository, cache=price_cache)
+    service.store_ticks([PriceTickCreate(ticker="btc_usd", price=50000.0, timestamp=1000)])
+    price_cache.local.clear()  # API работает в другом процессе: читаем через Redis
+    
+    # Act
+    first = client.get("/prices/last?ticker=btc_usd")
+    second = client.get("/prices/last?ticker=btc_usd")
+    
+    # Assert
+    assert first.status_code == second.status_code == 200
+    assert second.json()["price"] == 50000.0
+    assert price_cache.stats()["hits"] == 2
+    assert price_cache.stats()["misses"] == 0
+
+
+def test_get_candles(client, price_repository):
+    """Тест endpoint свечей поверх роллапов, обновляемых при записи"""
+    # Arrange
+    from src.application.services import PriceService
+    from src.domain.schemas import PriceTickCreate
+    from src.infrastructure.repositories import RollupRepository
+    
+    service = PriceService(price_repository, rollups=RollupRepository(price_repository.db))
+    service.store_ticks([
+        PriceTickCreate(ticker="btc_usd", price=100.0, timestamp=60),
+        PriceTickCreate(ticker="btc_usd", price=120.0, timestamp=90),
+        PriceTickCreate(ticker="eth_usd", price=10.0, timestamp=60),
+    ])
+    # Вторая пачка приходит не по порядку и сливается с сохраненными свечами
+    service.store_ticks([
+        PriceTickCreate(ticker="btc_usd", price=110.0, timestamp=119),
+        PriceTickCreate(ticker="btc_usd", price=90.0, timestamp=100),
+        PriceTickCreate(ticker="btc_usd", price=200.0, timestamp=300),
+        PriceTickCreate(ticker="btc_usd", price=50.0, timestamp=61),
+    ])
+    
+    # Act
+    minutes = client.get("/prices/candles?ticker=btc_usd&interval=1m")
+    five_minutes = client.get("/prices/candles?ticker=btc_usd&interval=5m")
+    
+    # Assert
+    assert minutes.status_code == 200
+    assert minutes.json() == [
+        {"bucket": 60, "open": 100.0, "high": 120.0, "low": 50.0, "close": 110.0, "count": 5},
+        {"bucket": 300, "open": 200.0, "high": 200.0, "low": 200.0, "close": 200.0, "count": 1},
+    ]
+    assert five_minutes.json() == [
+        {"bucket": 0, "open": 100.0, "high": 120.0, "low": 50.0, "close": 110.0, "count": 5},
+        {"bucket": 300, "open": 200.0, "high": 200.0, "low": 200.0, "close": 200.0, "count": 1},
+    ]
+
+
+def test_get_candles_invalid_interval(client):
+    """Тест валидации интервала свечей"""
+    response = client.get("/prices/candles?ticker=btc_usd&interval=2m")
+    assert response.status_code == 422
+
+
+def test_filtered_prices_keyset_pagination(client, price_repository):
+    """Тест постраничного чтения /prices/filter по курсору"""
+    # Arrange
+    from src.domain.schemas import PriceTickCreate
+    
+    price_repository.bulk_upsert([
+        PriceTickCreate(ticker="btc_usd", price=50000.0 + ts, timestamp=ts)
+        for ts in range(1000, 1005)
+    ])
+    
+    # Act
+    timestamps = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"ticker": "btc_usd", "date_from": 1000, "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/prices/filter", params=params)
+        assert response.status_code == 200
+        timestamps += [item["timestamp"] for item in response.json()]
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    
+    # Assert
+    assert pages == 3
+    assert timestamps == [1004, 1003, 1002, 1001, 1000]
+
+
+def test_all_prices_last_page_has_no_cursor(client, price_repository):
+    """Тест, что на последней странице /prices/all нет курсора"""
+    from src.domain.schemas import PriceTickCreate
+    
+    price_repository.bulk_upsert([
+        PriceTickCreate(ticker="btc_usd", price=50000.0, timestamp=1000),
+        PriceTickCreate(ticker="btc_usd", price=50001.0, timestamp=1001),
+    ])
+    
+    first = client.get("/prices/all?ticker=btc_usd&limit=1")
+    second = client.get(f"/prices/all?ticker=btc_usd&limit=1&cursor={first.headers['X-Next-Cursor']}")
+    
+    assert [item["timestamp"] for item in first.json()] == [1001]
+    assert [item["timestamp"] for item in second.json()] == [1000]
+    assert "X-Next-Cursor" not in second.headers
+
+
+def test_invalid_cursor(client):
+    """Тест поврежденного курсора"""
+    response = client.get("/prices/all?ticker=btc_usd&cursor=garbage")
+    assert response.status_code == 400
+
+
+def test_export_ndjson(client, price_repository):
+    """Тест потоковой выгрузки в NDJSON"""
+    # Arrange
+    import json
+    from src.domain.schemas import PriceTickCreate
+    
+    price_repository.bulk_upsert([
+        PriceTickCreate(ticker="btc_usd", price=50001.5, timestamp=1001),
+        PriceTickCreate(ticker="btc_usd", price=50000.0, timestamp=1000),
+        PriceTickCreate(ticker="eth_usd", price=3000.0, timestamp=1000),
+    ])
+    
+    # Act
+    response = client.get("/prices/export?ticker=btc_usd&format=ndjson")
+    
+    # Assert
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [(row["timestamp"], row["price"]) for row in rows] == [(1000, 50000.0), (1001, 50001.5)]
+    assert set(rows[0]) == {"ticker", "price", "timestamp", "id", "created_at"}
+
+
+def test_export_csv(client, price_repository):
+    """Тест потоковой выгрузки в CSV"""
+    # Arrange
+    import csv
+    import io
+    from src.domain.schemas import PriceTickCreate
+    
+    price_repository.bulk_upsert([
+        PriceTickCreate(ticker="btc_usd", price=50000.0, timestamp=1000),
+        PriceTickCreate(ticker="btc_usd", price=50001.5, timestamp=1001),
+    ])
+    
+    # Act
+    response = client.get("/prices/export?ticker=btc_usd&format=csv&date_from=1001")
+    
+    # Assert
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 1
+    assert rows[0]["price"] == "50001.5"
+    assert rows[0]["timestamp"] == "1001"
+
+
+def test_filtered_prices_match_pydantic_serialization(client, price_repository, session):
+    """Тест, что быстрый путь отдает те же байты, что и response_model"""
+    from typing import List
+    from pydantic import TypeAdapter
+    from src.domain.models import PriceTick
+    from src.domain.schemas import PriceTickCreate, PriceTickResponse
+    
+    price_repository.bulk_upsert([
+        PriceTickCreate(ticker="btc_usd", price=50000.25 + ts, timestamp=ts)
+        for ts in range(1000, 1003)
+    ])
+    records = session.query(PriceTick).order_by(PriceTick.timestamp.desc()).all()
+    expected = TypeAdapter(List[PriceTickResponse]).dump_json(
+        [PriceTickResponse.model_validate(record) for record in records]
+    )
+    
+    response = client.get("/prices/filter?ticker=btc_usd")
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.content == expected
@@ -0,0 +1,147 @@
+from datetime import datetime, timezone
+from src.application.archiver import PriceArchiver
+from src.domain.models import PriceTick
+from src.domain.schemas import PriceTickCreate
+from src.infrastructure.archive import PriceArchive, get_price_archive
+from src.infrastructure.repositories import RetentionRepository
+
+NOW = datetime(2026, 10, 18, tzinfo=timezone.utc)
+
+
+def ts(month, day, hour=0):
+    return int(datetime(2026, month, day, hour, tzinfo=timezone.utc).timestamp())
+
+
+def archive_history(price_repository, session, tmp_path, batch_size=None, row_group_size=65_536):
+    """Август и сентябрь уходят в архив, октябрь остается в БД"""
+    price_repository.bulk_upsert([
+        PriceTickCreate(ticker="btc_usd", price=100.0 + i, timestamp=t)
+        for i, t in enumerate([ts(8, 1), ts(8, 20), ts(9, 5), ts(9, 30, 23), ts(10, 1), ts(10, 17)])
+    ] + [PriceTickCreate(ticker="eth_usd", price=10.0, timestamp=ts(8, 2))])
+
+    archive = PriceArchive(str(tmp_path / "archive"), row_group_size=row_group_size)
+    result = PriceArchiver(RetentionRepository(session), archive, after_months=1, batch_size=batch_size).run(NOW)
+    return archive, result
+
+
+def test_archiver_moves_old_months_to_parquet(price_repository, session, clean_db, tmp_path):
+    """Полные месяцы старше порога переносятся в Parquet и удаляются из БД"""
+    # Act
+    archive, result = archive_history(price_repository, session, tmp_path)
+
+    # Assert
+    assert result["cutoff"] == ts(9, 1)
+    assert result["months"] == {"2026-08": 3}
+    assert archive.months("btc_usd") == [(2026, 8)]
+    assert (tmp_path / "archive" / "ticker=eth_usd" / "month=2026-08" / "data.parquet").exists()
+    assert session.query(PriceTick).filter(PriceTick.timestamp < ts(9, 1)).count() == 0
+
+    rows = archive.read_range("btc_usd")
+    assert [row["timestamp"] for row in rows] == [ts(8, 20), ts(8, 1)]
+    assert float(rows[0]["price"]) == 101.0
+    assert rows[0]["created_at"].tzinfo is not None
+
+
+def test_archive_rewrite_does_not_duplicate(tmp_path):
+    """Повторная архивация того же месяца не дублирует строки"""
+    # Arrange
+    from types import SimpleNamespace
+    archive = PriceArchive(str(tmp_path))
+    row = SimpleNamespace(id=1, ticker="btc_usd", price=1.5, timestamp=ts(8, 1), created_at=NOW)
+
+    # Act
+    archive.write_month("btc_usd", 2026, 8, [row])
+    archive.write_month("btc_usd", 2026, 8, [row, SimpleNamespace(**{**vars(row), "id": 2, "timestamp": ts(8, 2)})])
+
+    # Assert
+    assert [r["id"] for r in archive.read_range("btc_usd")] == [2, 1]
+    assert archive.upper_bound("btc_usd") == ts(9, 1)
+
+
+def test_filter_pages_across_db_and_archive(client, price_repository, session, clean_db, tmp_path):
+    """/prices/filter листает историю сквозь БД и архив одним курсором"""
+    # Arrange
+    from src.main import app
+    archive, _ = archive_history(price_repository, session, tmp_path)
+    app.dependency_overrides[get_price_archive] = lambda: archive
+
+    # Act
+    timestamps, cursor = [], None
+    while True:
+        params = {"ticker": "btc_usd", "date_from": ts(8, 10), "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/prices/filter", params=params)
+        assert response.status_code == 200
+        timestamps += [item["timestamp"] for item in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    # Assert
+    assert timestamps == [ts(10, 17), ts(10, 1), ts(9, 30, 23), ts(9, 5), ts(8, 20)]
+
+
+def test_export_candles_and_analytics_read_archive(client, price_repository, session, clean_db, tmp_path, monkeypatch):
+    """Выгрузка, свечи из сырых тиков и аналитика видят заархивированные месяцы"""
+    # Arrange
+    import json
+    from src.core.config import settings
+    from src.main import app
+    archive, _ = archive_history(price_repository, session, tmp_path)
+    app.dependency_overrides[get_price_archive] = lambda: archive
+    monkeypatch.setattr(settings, "candles_source", "raw")
+
+    # Act
+    export = client.get("/prices/export", params={"ticker": "btc_usd"})
+    candles = client.get("/prices/candles", params={"ticker": "btc_usd", "interval": "1d"})
+    summary = client.get("/analytics/btc_usd/summary")
+
+    # Assert
+    exported = [json.loads(line)["timestamp"] for line in export.text.splitlines()]
+    assert exported == [ts(8, 1), ts(8, 20), ts(9, 5), ts(9, 30, 23), ts(10, 1), ts(10, 17)]
+    assert [candle["bucket"] for candle in candles.json()] == [ts(8, 1), ts(8, 20), ts(9, 5), ts(9, 30), ts(10, 1), ts(10, 17)]
+    assert summary.json()["count"] == 6
+    assert summary.json()["first"] == 100.0
+
+
+async def test_history_streams_archive_in_batches(price_repository, session, clean_db, tmp_path, async_price_repository):
+    """Архив пишется страницами и читается пачками, строки БД того же месяца сливаются по порядку"""
+    # Arrange
+    from src.application.history import HistoryReader
+    archive, result = archive_history(price_repository, session, tmp_path, batch_size=1, row_group_size=1)
+    price_repository.bulk_upsert([PriceTickCreate(ticker="btc_usd", price=150.0, timestamp=ts(8, 10))])
+    reader = HistoryReader(async_price_repository, archive)
+
+    # Act
+    chunks = [rows async for rows in reader.stream_rows("btc_usd", date_to=ts(9, 30))]
+    timestamps, prices = await reader.get_series("btc_usd", date_from=ts(8, 5), limit=2)
+
+    # Assert
+    assert result["months"] == {"2026-08": 3}
+    assert [row.timestamp for rows in chunks for row in rows] == [ts(8, 1), ts(8, 10), ts(8, 20), ts(9, 5)]
+    assert len(chunks) > 1
+    assert timestamps.tolist() == [ts(8, 10), ts(8, 20)]
+    assert prices.tolist() == [150.0, 101.0]
+
+
+def test_archiver_keeps_ticks_inserted_after_read(price_repository, session, clean_db, tmp_path):
+    """Тик, вставленный в месяц между чтением и очисткой, не удаляется вместе с архивированными"""
+    # Arrange
+    price_repository.bulk_upsert([PriceTickCreate(ticker="btc_usd", price=100.0, timestamp=ts(8, 1))])
+
+    class LateInsertRepository(RetentionRepository):
+        def get_ticks(self, ticker, date_from, date_to, **page):
+            ticks = super().get_ticks(ticker, date_from, date_to, **page)
+            price_repository.bulk_upsert([PriceTickCreate(ticker="btc_usd", price=200.0, timestamp=ts(8, 2))])
+            return ticks
+
+    archive = PriceArchive(str(tmp_path / "archive"))
+
+    # Act
+    result = PriceArchiver(LateInsertRepository(session), archive, after_months=1).run(NOW)
+
+    # Assert
+    assert result["months"] == {"2026-08": 1}
+    assert [row["timestamp"] for row in archive.read_range("btc_usd")] == [ts(8, 1)]
+    assert [tick.timestamp for tick in session.query(PriceTick).all()] == [ts(8, 2)]
@@ -0,0 +1,135 @@
+from aiohttp.test_utils import TestServer
+from sqlalchemy import func
+from src.application.backfill import chart_range, create_backfiller
+from src.domain.models import BackfillCheckpoint, PriceRollup
+from src.domain.schemas import PriceTickCreate
+from src.infrastructure.deribit_client import DeribitClient
+from src.infrastructure.repositories import BackfillRepository
+from tests.stubs.deribit import DeribitStub
+
+# Момент записи fixtures/deribit/get_index_chart_data: точки раз в минуту с T0 по T0 + 3000
+T0 = 1_700_000_000
+
+
+def test_find_gaps_uses_neighbouring_ticks(price_repository, session):
+    """Тест поиска дыр между тиками, в начале и в конце периода"""
+    price_repository.bulk_upsert([
+        PriceTickCreate(ticker="btc_usd", price=50000.0, timestamp=ts)
+        for ts in (300, 400, 1000, 1050)
+    ])
+    repository = BackfillRepository(session)
+    
+    assert repository.find_gaps("btc_usd", 0, 2000, 180) == [(0, 300), (401, 1000), (1051, 2000)]
+    assert repository.find_gaps("eth_usd", 0, 2000, 180) == [(0, 2000)]
+
+
+def test_chart_range_picks_shortest_covering_range():
+    """Тест выбора самого подробного интервала графика"""
+    assert chart_range(1800) == "1h"
+    assert chart_range(3601) == "1d"
+    assert chart_range(40 * 24 * 60 * 60) == "1y"
+    assert chart_range(10 * 365 * 24 * 60 * 60) == "all"
+
+
+async def test_backfill_replays_stub_and_resumes(price_repository, session):
+    """Тест дозагрузки из stub Deribit: дыры заполняются, чекпоинты не дают запрашивать их снова"""
+    # Arrange
+    price_repository.bulk_upsert([
+        PriceTickCreate(ticker="btc_usd", price=37000.0, timestamp=T0),
+        PriceTickCreate(ticker="btc_usd", price=37050.0, timestamp=T0 + 1800),
+    ])
+    stub = DeribitStub()
+    server = TestServer(stub.app)
+    await server.start_server()
+    client = DeribitClient(base_url=str(server.make_url("/api/v2")))
+    backfiller = create_backfiller(session, client, rate_limit=0)
+    
+    try:
+        # Act
+        first = await backfiller.run(["btc_usd", "eth_usd"], now=T0 + 3000, since=T0)
+        second = await backfiller.run(["btc_usd", "eth_usd"], now=T0 + 3000, since=T0)
+    finally:
+        await client.close()
+        await server.close()
+    
+    # Assert: у eth_usd нет записи, его дыра остается без чекпоинта и повторяется
+    assert first["gaps"] == 3
+    assert first["inserted"] == {"btc_usd": 48}
+    assert first["failed"] == ["eth_usd:1h"]
+    assert second["gaps"] == 1
+    assert second["failed"] == ["eth_usd:1h"]
+    requested = sorted(params["index_name"] for _, params in stub.requests)
+    assert requested == ["btc_usd", "eth_usd", "eth_usd"]
+    assert session.query(BackfillCheckpoint).count() == 2
+    minute_ticks = session.query(func.sum(PriceRollup.count)).filter(PriceRollup.interval == 60).scalar()
+    assert minute_ticks == 48
+
+
+async def test_backfill_keeps_unfilled_gap_without_checkpoint(price_repository, session):
+    """Дыра, в которую не вставлено ни одной точки, не закрывается чекпоинтом"""
+    # Arrange: точки записи stub начинаются с T0, дыра перед ним остается пустой
+    price_repository.bulk_upsert([
+        PriceTickCreate(ticker="btc_usd", price=37000.0, timestamp=T0 - 3000),
+        PriceTickCreate(ticker="btc_usd", price=37050.0, timestamp=T0 - 1000),
+    ])
+    stub = DeribitStub()
+    server = TestServer(stub.app)
+    await server.start_server()
+    client = DeribitClient(base_url=str(server.make_url("/api/v2")))
+    backfiller = create_backfiller(session, client, rate_limit=0)
+
+    try:
+        # Act
+        first = await backfiller.run(["btc_usd"], now=T0 - 1000, since=T0 - 3000)
+        second = await backfiller.run(["btc_usd"], now=T0 - 1000, since=T0 - 3000)
+    finally:
+        await client.close()
+        await server.close()
+
+    # Assert
+    assert first["gaps"] == second["gaps"] == 1
+    assert first["inserted"] == {"btc_usd": 0}
+    assert len(stub.requests) == 2
+    assert session.query(BackfillCheckpoint).count() == 0
+
+
+def test_backfill_plan_starts_after_retention_and_archive(session, tmp_path):
+    """Удаленная хранением и заархивированная история дырой не считается"""
+    # Arrange
+    from types import SimpleNamespace
+    from src.infrastructure.archive import PriceArchive
+    day = 24 * 60 * 60
+    now = 1_790_000_000  # 2026-09-21
+    archive = PriceArchive(str(tmp_path))
+    archive.write_month("btc_usd", 2026, 8, [
+        SimpleNamespace(id=1, ticker="btc_usd", price=1.0, timestamp=now - 40 * day, created_at=None)
+    ])
+
+    # Act
+    archived = create_backfiller(session, None, archive=archive, raw_days=0, lookback_days=60).plan(["btc_usd"], now)
+    retained = create_backfiller(session, None, archive=archive, raw_days=5, lookback_days=60).plan(["btc_usd"], now)
+
+    # Assert
+    assert list(archived.values()) == [[(archive.upper_bound("btc_usd"), now)]]
+    assert list(retained.values()) == [[(now - now % day - 5 * day, now)]]
+
+
+def test_apply_ticks_keeps_existing_rollups_before_floor(session):
+    """Свечи до порога, чьи сырые тики удалены, не пересчитываются повторно"""
+    # Arrange
+    from types import SimpleNamespace
+    from src.infrastructure.repositories import RollupRepository
+    rollups = RollupRepository(session)
+    rollups.apply_ticks([SimpleNamespace(ticker="btc_usd", price=10.0, timestamp=60)])
+
+    # Act
+    rollups.apply_ticks(
+        [SimpleNamespace(ticker="btc_usd", price=20.0, timestamp=61),
+         SimpleNamespace(ticker="btc_usd", price=30.0, timestamp=86_400)],
+        keep_existing_before=86_400,
+    )
+
+    # Assert
+    minute = {row.bucket: row for row in session.query(PriceRollup).filter(PriceRollup.interval == 60)}
+    assert minute[60].count == 1 and float(minute[60].high) == 10.0
+    assert minute[86_400].count == 1
@@ -0,0 +1,22 @@
+from benchmarks.suite import compare, metric
+
+
+def test_compare_flags_regressions_in_both_directions():
+    """Падение пропускной способности и рост задержки сверх порога — регрессии"""
+    baseline = {"results": {
+        "api.last": metric(1000.0, "req/s", True),
+        "query.range": metric(10.0, "ms", False),
+        "serialize": metric(100.0, "rows/s", True),
+    }}
+    current = {"results": {
+        "api.last": metric(800.0, "req/s", True),
+        "query.range": metric(10.5, "ms", False),
+        "serialize": metric(150.0, "rows/s", True),
+    }}
+
+    rows = {row["name"]: row for row in compare(baseline, current, threshold=0.1)}
+
+    assert rows["api.last"]["regression"] is True
+    assert rows["query.range"]["regression"] is False
+    assert rows["serialize"]["regression"] is False
+    assert rows["serialize"]["change"] == 0.5
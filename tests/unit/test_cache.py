@@ -0,0 +1,91 @@
+import time
+from datetime import datetime, timezone
+import fakeredis
+import fakeredis.aioredis
+from src.infrastructure.cache import TTLCache, LatestPriceCache
+from src.domain.schemas import PriceTickResponse
+
+
+def make_price(price=50000.0, timestamp=1000, ticker="btc_usd"):
+    return PriceTickResponse(
+        id=1,
+        ticker=ticker,
+        price=price,
+        timestamp=timestamp,
+        created_at=datetime.now(timezone.utc)
+    )
+
+
+def make_shared_caches():
+    """Кэш ингеста и кэш API в разных процессах, общий Redis"""
+    server = fakeredis.FakeServer()
+    writer = LatestPriceCache(fakeredis.FakeRedis(server=server), None)
+    reader = LatestPriceCache(None, fakeredis.aioredis.FakeRedis(server=server))
+    return writer, reader
+
+
+def test_ttl_cache_expires():
+    """Тест истечения записей in-process кэша"""
+    cache = TTLCache(ttl=0.01)
+    cache.set("btc_usd", 1)
+    assert cache.get("btc_usd") == 1
+    time.sleep(0.02)
+    assert cache.get("btc_usd") is None
+
+
+async def test_write_through_visible_to_other_process():
+    """Тест, что цена из ингеста читается API через Redis"""
+    # Arrange
+    writer, reader = make_shared_caches()
+    
+    # Act
+    writer.set_latest(make_price(50000.0, 1000))
+    writer.set_latest(make_price(49000.0, 900))  # запоздавший тик
+    price = await reader.get_latest("btc_usd")
+    
+    # Assert
+    assert price.price == 50000.0
+    assert price.timestamp == 1000
+    assert reader.stats()["hits"] == 1
+
+
+async def test_cache_miss_counts():
+    """Тест счетчика промахов"""
+    _, reader = make_shared_caches()
+    
+    assert await reader.get_latest("eth_usd") is None
+    await reader.populate(make_price(3000.0, 1000, "eth_usd"))
+    assert (await reader.get_latest("eth_usd")).price == 3000.0
+    
+    assert reader.stats() == {"hits": 1, "misses": 1, "errors": 0, "hit_ratio": 0.5}
+
+
+async def test_set_latest_many_uses_one_round_trip():
+    """Пачка тикеров пишется в Redis одним pipeline, промахи и попадания видны в метриках"""
+    # Arrange
+    from src.infrastructure.metrics import PRICE_CACHE_LOOKUPS
+    writer, reader = make_shared_caches()
+    executed = []
+    pipeline = writer.redis.pipeline
+
+    def counting_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+        execute = pipe.execute
+        pipe.execute = lambda *a, **kw: executed.append(1) or execute(*a, **kw)
+        return pipe
+
+    writer.redis.pipeline = counting_pipeline
+    hits = PRICE_CACHE_LOOKUPS.labels("hit")._value.get()
+
+    # Act
+    writer.set_latest_many([
+        make_price(50000.0, 1000, "btc_usd"),
+        make_price(3000.0, 1000, "eth_usd"),
+        make_price(150.0, 1000, "sol_usdc"),
+    ])
+    prices = [await reader.get_latest(ticker) for ticker in ("btc_usd", "eth_usd", "sol_usdc")]
+
+    # Assert
+    assert executed == [1]
+    assert [price.price for price in prices] == [50000.0, 3000.0, 150.0]
+    assert PRICE_CACHE_LOOKUPS.labels("hit")._value.get() == hits + 3
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import pytest
+from src.api.routers.live import _events
+from src.domain.schemas import PriceTickResponse
+from src.infrastructure.live import Subscription, create_price_hub, get_price_hub
+from src.main import app
+
+
+def _price(ticker, timestamp, price=50000.0):
+    return PriceTickResponse(
+        ticker=ticker, price=price, timestamp=timestamp, id=timestamp, created_at="2024-01-01T00:00:00"
+    )
+
+
+async def test_subscription_drops_oldest_when_full():
+    """Тест, что медленный подписчик теряет старые тики, а не блокирует ингест"""
+    subscription = Subscription(["btc_usd"], max_size=2)
+    for payload in ("1", "2", "3"):
+        subscription.put(payload)
+    
+    assert subscription.dropped == 1
+    assert [await subscription.get(), await subscription.get()] == ["2", "3"]
+
+
+async def test_memory_hub_routes_by_ticker_across_threads():
+    """Тест доставки только подписанных тикеров, в том числе из потока ингеста"""
+    hub = create_price_hub("memory")
+    btc = hub.subscribe(["btc_usd"])
+    both = hub.subscribe(["btc_usd", "eth_usd"])
+    
+    hub.publish([_price("eth_usd", 1)])
+    thread = threading.Thread(target=hub.publish, args=([_price("btc_usd", 2)],))
+    thread.start()
+    thread.join()
+    await asyncio.sleep(0)
+    
+    assert btc.queue.qsize() == 1
+    assert PriceTickResponse.model_validate_json(await btc.get()).timestamp == 2
+    assert [PriceTickResponse.model_validate_json(await both.get()).ticker for _ in range(2)] == ["eth_usd", "btc_usd"]
+    
+    hub.unsubscribe(btc)
+    hub.unsubscribe(both)
+    assert hub.subscriber_count() == 0
+
+
+async def test_redis_hub_relays_published_ticks():
+    """Тест доставки через pub/sub: публикация синхронным клиентом, слушатель в event loop"""
+    hub = create_price_hub("fakeredis")
+    await hub.start()
+    subscription = hub.subscribe(["btc_usd"])
+    try:
+        await asyncio.sleep(0.05)  # слушатель успевает подписаться
+        hub.publish([_price("btc_usd", 10, 51000.5)])
+        
+        payload = await asyncio.wait_for(subscription.get(), 2.0)
+        
+        assert PriceTickResponse.model_validate_json(payload).price == 51000.5
+    finally:
+        hub.unsubscribe(subscription)
+        await hub.stop()
+
+
+async def test_sse_events_format():
+    """Тест формата событий SSE и отписки при закрытии генератора"""
+    hub = create_price_hub("memory")
+    events = _events(hub, ["btc_usd"])
+    
+    assert await events.__anext__() == b": connected\n\n"
+    hub.publish([_price("btc_usd", 5)])
+    event = await events.__anext__()
+    await events.aclose()
+    
+    assert event.startswith(b"event: price\ndata: {")
+    assert event.endswith(b"\n\n")
+    assert hub.subscriber_count() == 0
+
+
+async def test_sse_does_not_subscribe_before_streaming_starts():
+    """Ответ, закрытый до начала отправки, не оставляет подписку"""
+    hub = create_price_hub("memory")
+    events = _events(hub, ["btc_usd"])
+
+    await events.aclose()
+
+    assert hub.subscriber_count() == 0
+
+
+def test_websocket_receives_published_ticks(client):
+    """Тест /ws/prices: клиент получает тики своих тикеров"""
+    hub = create_price_hub("memory")
+    app.dependency_overrides[get_price_hub] = lambda: hub
+    
+    with client.websocket_connect("/ws/prices?tickers=btc_usd") as websocket:
+        hub.publish([_price("eth_usd", 1), _price("btc_usd", 2)])
+        message = websocket.receive_json()
+    
+    assert message["ticker"] == "btc_usd"
+    assert message["timestamp"] == 2
+
+
+def test_stream_requires_tickers(client):
+    """Тест отказа SSE без тикеров"""
+    response = client.get("/prices/stream?tickers=,")
+    assert response.status_code == 400
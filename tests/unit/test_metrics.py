@@ -0,0 +1,64 @@
+from prometheus_client import REGISTRY
+from src.domain.schemas import PriceTickCreate
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_metrics_endpoint_reports_route_templates(client):
+    """Задержка запроса пишется по шаблону маршрута, а не по фактическому URL"""
+    # Arrange
+    before = sample("http_request_duration_seconds_count", method="GET", route="/analytics/{ticker}/summary", status="404")
+
+    # Act
+    client.get("/analytics/doge_usd/summary")
+    response = client.get("/metrics")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'route="/analytics/{ticker}/summary"' in response.text
+    assert sample(
+        "http_request_duration_seconds_count", method="GET", route="/analytics/{ticker}/summary", status="404"
+    ) == before + 1
+
+
+def test_store_ticks_records_ingest_metrics(price_repository):
+    """Пачка ингеста отмечает размер, число новых тиков и запрос репозитория"""
+    # Arrange
+    from src.application.services import PriceService
+    ticks_before = sample("ingested_ticks_total", ticker="sol_usd")
+    upserts_before = sample("repository_query_duration_seconds_count", repository="PriceRepository", method="bulk_upsert")
+
+    # Act
+    PriceService(price_repository).store_ticks([
+        PriceTickCreate(ticker="sol_usd", price=150.0, timestamp=1000),
+        PriceTickCreate(ticker="sol_usd", price=151.0, timestamp=1001),
+    ])
+
+    # Assert
+    assert sample("ingested_ticks_total", ticker="sol_usd") == ticks_before + 2
+    assert sample("ingest_lag_seconds_count", ticker="sol_usd") >= 2
+    assert sample(
+        "repository_query_duration_seconds_count", repository="PriceRepository", method="bulk_upsert"
+    ) == upserts_before + 1
+
+
+async def test_deribit_errors_counted_per_currency():
+    """Ошибка запроса к Deribit увеличивает счетчик по индексу и причине"""
+    # Arrange
+    from src.infrastructure.deribit_client import DeribitClient
+    client = DeribitClient(base_url="http://127.0.0.1:1")
+    latency_before = sample("deribit_request_duration_seconds_count", currency="ada_usd")
+
+    # Act
+    try:
+        result = await client.get_index_price_by_name("ada_usd")
+    finally:
+        await client.close()
+
+    # Assert
+    assert result is None
+    assert sample("deribit_request_errors_total", currency="ada_usd", reason="ClientConnectorError") >= 1
+    assert sample("deribit_request_duration_seconds_count", currency="ada_usd") == latency_before + 1
@@ -0,0 +1,91 @@
+from datetime import datetime, timezone
+from sqlalchemy import text
+from src.domain.models import PriceTick
+from src.infrastructure.partitions import (
+    PartitionManager, add_months, month_start, months_to_cover, partition_name
+)
+
+
+def test_month_helpers():
+    """Границы секций считаются по календарным месяцам UTC"""
+    assert add_months(2026, 11, 1) == (2026, 12)
+    assert add_months(2026, 12, 1) == (2027, 1)
+    assert add_months(2026, 1, -2) == (2025, 11)
+    assert month_start(2026, 10) == int(datetime(2026, 10, 1, tzinfo=timezone.utc).timestamp())
+    assert partition_name(2026, 3) == "price_ticks_y2026m03"
+
+
+def test_months_to_cover_includes_backfill_window_and_default_rows():
+    """Секции нужны и за окно бэкфилла, и для месяцев со строками в DEFAULT"""
+    now = datetime(2026, 10, 18, tzinfo=timezone.utc)
+    since = datetime(2026, 8, 20, tzinfo=timezone.utc)
+
+    assert months_to_cover(now, 1) == [(2026, 10), (2026, 11)]
+    assert months_to_cover(now, 1, since=since, extra=[(2025, 1)]) == [
+        (2025, 1), (2026, 8), (2026, 9), (2026, 10), (2026, 11)
+    ]
+
+
+class FakeResult:
+    def __init__(self, value=None):
+        self.value = value
+        self.rowcount = 2
+
+    def scalar(self):
+        return self.value
+
+
+class FakeConnection:
+    """Записывает SQL; секция по умолчанию есть и содержит строки месяца"""
+
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append(sql)
+        if "pg_get_expr" in sql:
+            return FakeResult("price_ticks_default")
+        if sql.startswith("SELECT 1 FROM price_ticks_default"):
+            return FakeResult(1)
+        return FakeResult()
+
+
+def test_create_partition_moves_rows_out_of_default():
+    """Строки месяца из DEFAULT переносятся в новую таблицу до ATTACH, а не через PARTITION OF"""
+    connection = FakeConnection()
+    PartitionManager(connection).create_partition(2026, 3)
+
+    statements = connection.statements
+    assert not any("PARTITION OF" in sql for sql in statements)
+    create = next(i for i, sql in enumerate(statements) if sql.startswith("CREATE TABLE price_ticks_y2026m03"))
+    move = next(i for i, sql in enumerate(statements) if "DELETE FROM price_ticks_default" in sql)
+    attach = next(i for i, sql in enumerate(statements) if "ATTACH PARTITION price_ticks_y2026m03" in sql)
+    assert create < move < attach
+    assert f"FROM ({month_start(2026, 3)}) TO ({month_start(2026, 4)})" in statements[attach]
+
+
+def test_price_tick_primary_key_matches_partitioned_table():
+    """Первичный ключ модели совпадает с ключом секционированной таблицы из миграции 0004"""
+    assert [column.name for column in PriceTick.__table__.primary_key.columns] == ["id", "timestamp"]
+
+
+def test_partition_manager_skips_non_postgres(engine):
+    """На SQLite таблица не секционирована и обслуживание ничего не делает"""
+    with engine.begin() as connection:
+        manager = PartitionManager(connection)
+        assert manager.is_partitioned() is False
+        assert manager.detach_old_partitions(0) == []
+
+
+def test_ticker_timestamp_index_serves_latest_lookup(engine):
+    """Запрос последних тиков тикера идет по составному индексу"""
+    with engine.connect() as connection:
+        plan = connection.execute(text(
+            "EXPLAIN QUERY PLAN SELECT * FROM price_ticks "
+            "WHERE ticker = 'btc_usd' ORDER BY timestamp DESC LIMIT 10"
+        )).all()
+
+    details = " ".join(row[-1] for row in plan)
+    assert "ix_price_ticks_ticker_timestamp" in details
+    assert "TEMP B-TREE" not in details
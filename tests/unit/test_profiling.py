@@ -0,0 +1,71 @@
+import logging
+import pstats
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from src.api.middleware import ProfilingMiddleware
+from src.infrastructure.profiling import RequestProfiler, install_slow_query_log
+
+
+def make_app(tmp_path, sample_rate=0.0, token="secret"):
+    app = FastAPI()
+
+    @app.get("/prices/filter")
+    async def handler():
+        return {"ok": True}
+
+    app.add_middleware(
+        ProfilingMiddleware,
+        profiler=RequestProfiler(str(tmp_path)),
+        sample_rate=sample_rate,
+        token=token,
+    )
+    return app
+
+
+def test_profile_by_header(tmp_path):
+    """Запрос с верным токеном в X-Profile профилируется, путь к файлу в ответе"""
+    client = TestClient(make_app(tmp_path))
+
+    plain = client.get("/prices/filter")
+    wrong = client.get("/prices/filter", headers={"X-Profile": "guess"})
+    profiled = client.get("/prices/filter", headers={"X-Profile": "secret"})
+
+    assert "x-profile-file" not in plain.headers
+    assert "x-profile-file" not in wrong.headers
+    name = profiled.headers["x-profile-file"]
+    assert name.endswith(".prof") and "GET_prices_filter" in name
+    assert list(tmp_path.iterdir()) == [tmp_path / name]
+    assert pstats.Stats(str(tmp_path / name)).total_calls > 0
+
+
+def test_sampled_profiles_written(tmp_path):
+    """При sample_rate=1 профиль пишется для каждого запроса"""
+    client = TestClient(make_app(tmp_path, sample_rate=1.0, token=""))
+
+    for _ in range(3):
+        client.get("/prices/filter")
+
+    assert len(list(tmp_path.glob("*.prof"))) == 3
+
+
+def test_main_app_has_no_profiling_by_default():
+    """Без настроек middleware профилирования не подключено"""
+    from src.main import app
+    assert all(m.cls is not ProfilingMiddleware for m in app.user_middleware)
+
+
+def test_slow_query_log_includes_plan(tmp_path, caplog):
+    """Запрос дольше порога попадает в журнал вместе с планом"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'slow.db'}")
+    install_slow_query_log(engine, threshold_ms=0.0)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE ticks (ticker TEXT, ts INTEGER)"))
+
+    with caplog.at_level(logging.WARNING, logger="src.slow_queries"):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT * FROM ticks WHERE ticker = :t"), {"t": "btc_usd"}).all()
+
+    messages = [r.getMessage() for r in caplog.records if "SELECT * FROM ticks" in r.getMessage()]
+    assert messages and "SCAN ticks" in messages[0]
+    engine.dispose()
@@ -82,6 +82,23 @@ def test_get_by_date_range(price_repository):
     assert prices_in_range[0].timestamp == 2000
 
 
+def test_get_by_date_range_pages_by_keyset(price_repository):
+    """Синхронная выборка листается страницами по (timestamp, id) без пропусков"""
+    # Arrange
+    price_repository.bulk_upsert([
+        PriceTickCreate(ticker="btc_usd", price=50000.0 + ts, timestamp=ts) for ts in range(1000, 1005)
+    ])
+
+    # Act
+    first = price_repository.get_by_date_range("btc_usd", limit=2)
+    last = first[-1]
+    second = price_repository.get_by_date_range("btc_usd", limit=2, cursor=(last.timestamp, last.id))
+
+    # Assert
+    assert [price.timestamp for price in first] == [1004, 1003]
+    assert [price.timestamp for price in second] == [1002, 1001]
+
+
 def test_duplicate_timestamp_not_created(price_repository):
     """Тест, что запись с одинаковым timestamp не дублируется"""
     # Arrange
@@ -102,3 +119,126 @@ def test_duplicate_timestamp_not_created(price_repository):
     assert result1.id == result2.id  # Должен вернуть существующую запись
     assert price_repository.db.query(PriceTick).count() == 1  # Должна быть только одна запись
 
+
+def test_bulk_upsert_inserts_batch(price_repository):
+    """Тест пакетной вставки цен"""
+    # Arrange
+    ticks = [
+        PriceTickCreate(ticker="btc_usd", price=50000.0, timestamp=1000),
+        PriceTickCreate(ticker="eth_usd", price=3000.0, timestamp=1000),
+        PriceTickCreate(ticker="sol_usd", price=100.0, timestamp=1000),
+    ]
+    
+    # Act
+    created = price_repository.bulk_upsert(ticks)
+    
+    # Assert
+    assert len(created) == 3
+    assert all(record.id is not None for record in created)
+    assert price_repository.db.query(PriceTick).count() == 3
+
+
+def test_bulk_upsert_skips_duplicates(price_repository):
+    """Тест, что bulk_upsert пропускает уже существующие и повторяющиеся записи"""
+    # Arrange
+    price_repository.create(PriceTickCreate(ticker="btc_usd", price=50000.0, timestamp=1000))
+    ticks = [
+        PriceTickCreate(ticker="btc_usd", price=50000.0, timestamp=1000),
+        PriceTickCreate(ticker="btc_usd", price=51000.0, timestamp=2000),
+        PriceTickCreate(ticker="btc_usd", price=51000.0, timestamp=2000),
+    ]
+    
+    # Act
+    created = price_repository.bulk_upsert(ticks)
+    
+    # Assert
+    assert [record.timestamp for record in created] == [2000]
+    assert price_repository.db.query(PriceTick).count() == 2
+
+
+def test_bulk_upsert_empty_batch(price_repository):
+    """Тест пакетной вставки пустого списка"""
+    assert price_repository.bulk_upsert([]) == []
+
+
+async def test_async_repository_reads(price_repository, async_price_repository):
+    """Тест чтения через асинхронный репозиторий"""
+    # Arrange
+    price_repository.bulk_upsert([
+        PriceTickCreate(ticker="btc_usd", price=50000.0, timestamp=1000),
+        PriceTickCreate(ticker="btc_usd", price=51000.0, timestamp=2000),
+        PriceTickCreate(ticker="btc_usd", price=52000.0, timestamp=3000),
+        PriceTickCreate(ticker="eth_usd", price=3000.0, timestamp=3000),
+    ])
+    
+    # Act
+    all_prices = await async_price_repository.get_all_by_ticker("btc_usd", limit=2)
+    last_price = await async_price_repository.get_last_price("btc_usd")
+    in_range = await async_price_repository.get_by_date_range("btc_usd", date_from=1500, date_to=2500)
+    
+    # Assert
+    assert [record.timestamp for record in all_prices] == [3000, 2000]
+    assert float(last_price.price) == 52000.0
+    assert [record.timestamp for record in in_range] == [2000]
+    assert await async_price_repository.get_last_price("unknown_usd") is None
+
+
+async def test_async_repository_raw_candles(price_repository, async_price_repository):
+    """Тест агрегации свечей по сырым тикам"""
+    # Arrange
+    price_repository.bulk_upsert([
+        PriceTickCreate(ticker="btc_usd", price=100.0, timestamp=60),
+        PriceTickCreate(ticker="btc_usd", price=90.0, timestamp=100),
+        PriceTickCreate(ticker="btc_usd", price=110.0, timestamp=119),
+        PriceTickCreate(ticker="btc_usd", price=200.0, timestamp=300),
+    ])
+    
+    # Act
+    candles = await async_price_repository.get_candles("btc_usd", 60, date_from=60, date_to=200)
+    
+    # Assert
+    assert candles == [
+        {"bucket": 60, "open": 100.0, "high": 110.0, "low": 90.0, "close": 110.0, "count": 3},
+    ]
+
+
+def test_rollup_rebuild_matches_incremental(price_repository):
+    """Тест, что пересчет роллапов с нуля дает тот же результат, что и инкрементальный"""
+    # Arrange
+    from src.application.rollups import RollupRebuilder
+    from src.domain.models import PriceRollup
+    from src.infrastructure.repositories import RollupRepository
+    
+    rollups = RollupRepository(price_repository.db)
+    day = 24 * 60 * 60
+    for batch in ([(50.0, 10), (70.0, day + 5)], [(60.0, 3), (80.0, 2 * day + 100)]):
+        created = price_repository.bulk_upsert(
+            [PriceTickCreate(ticker="btc_usd", price=price, timestamp=ts) for price, ts in batch]
+        )
+        rollups.apply_ticks(created)
+    
+    def snapshot():
+        return sorted(
+            (r.interval, r.bucket, float(r.open), float(r.high), float(r.low), float(r.close), r.count)
+            for r in price_repository.db.query(PriceRollup).all()
+        )
+    
+    incremental = snapshot()
+    
+    # Act
+    processed = RollupRebuilder(rollups, chunk_days=1).rebuild()
+    
+    # Assert
+    assert processed == {"btc_usd": 4}
+    assert snapshot() == incremental
+    assert (day, 0, 60.0, 60.0, 50.0, 50.0, 2) in incremental
+
+
+def test_create_duplicate_returns_existing(price_repository, session, clean_db):
+    """Повторная вставка того же (ticker, timestamp) возвращает исходную запись"""
+    first = price_repository.create(PriceTickCreate(ticker="btc_usd", price=50000.0, timestamp=1234567890))
+    second = price_repository.create(PriceTickCreate(ticker="btc_usd", price=51000.0, timestamp=1234567890))
+
+    assert second.id == first.id
+    assert float(second.price) == 50000.0
+    assert session.query(PriceTick).count() == 1
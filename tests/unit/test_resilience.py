@@ -0,0 +1,179 @@
+import asyncio
+import time
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from src.core.config import settings
+from src.infrastructure.deribit_client import DeribitClient
+from src.infrastructure.resilience import CircuitBreaker, CircuitOpenError, TokenBucket, hedged
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def fast_backoff(monkeypatch):
+    """Повторы без заметных пауз"""
+    monkeypatch.setattr(settings, "deribit_backoff_base", 0.001)
+    monkeypatch.setattr(settings, "deribit_backoff_max", 0.001)
+
+
+async def start_server(handler):
+    app = web.Application()
+    app.router.add_get("/api/v2/public/get_index_price", handler)
+    server = TestServer(app)
+    await server.start_server()
+    return server
+
+
+async def test_token_bucket_allows_burst_then_waits():
+    """Тест, что после всплеска запросы ждут токен и время ожидания учитывается"""
+    bucket = TokenBucket(rate=20.0, capacity=2)
+    started = time.monotonic()
+    await asyncio.gather(*(bucket.acquire() for _ in range(4)))
+    
+    assert time.monotonic() - started >= 0.09
+    assert bucket.stats()["waits"] == 2
+    assert bucket.stats()["wait_time"] > 0
+
+
+def test_circuit_breaker_opens_and_probes():
+    """Тест переходов closed -> open -> half_open -> closed"""
+    clock = FakeClock()
+    breaker = CircuitBreaker("public/get_index_price", failure_threshold=2, reset_timeout=10, clock=clock)
+    
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    
+    clock.now = 11
+    breaker.before_call()  # пробный запрос
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # второй одновременно не пропускается
+    breaker.record_success()
+    
+    assert breaker.stats() == {"state": "closed", "failures": 0, "trips": 1, "rejected": 2}
+
+
+async def test_hedged_returns_first_success():
+    """Тест, что дублирующий запрос забирает ответ у медленного первого"""
+    delays = [0.5, 0.0]
+    fired = []
+
+    async def call():
+        delay = delays.pop(0)
+        await asyncio.sleep(delay)
+        return delay
+
+    result, hedge_won = await hedged(call, 0.05, on_hedge=lambda: fired.append(True))
+    
+    assert result == 0.0
+    assert hedge_won is True
+    assert fired == [True]
+
+
+async def test_client_retries_transient_errors(fast_backoff):
+    """Тест повтора 503 с джиттером и учета повторов в stats()"""
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        if len(calls) < 3:
+            return web.Response(status=503)
+        return web.json_response({"result": {"index_price": 50000.0}})
+
+    server = await start_server(handler)
+    client = DeribitClient(base_url=str(server.make_url("/api/v2")))
+    try:
+        result = await client.get_index_price_by_name("btc_usd")
+    finally:
+        await client.close()
+        await server.close()
+    
+    assert result["price"] == 50000.0
+    assert len(calls) == 3
+    stats = client.stats()
+    assert stats["retries"] == 2
+    assert stats["breakers"]["public/get_index_price"]["state"] == "closed"
+    assert stats["limiter"]["acquired"] == 3
+
+
+async def test_client_circuit_opens_after_failures(fast_backoff, monkeypatch):
+    """Тест, что разомкнутый предохранитель не пускает запросы к серверу"""
+    monkeypatch.setattr(settings, "deribit_breaker_failures", 2)
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        return web.Response(status=502)
+
+    server = await start_server(handler)
+    client = DeribitClient(base_url=str(server.make_url("/api/v2")))
+    client.max_retries = 0
+    try:
+        results = [await client.get_index_price_by_name("btc_usd") for _ in range(4)]
+    finally:
+        await client.close()
+        await server.close()
+    
+    assert results == [None] * 4
+    assert len(calls) == 2
+    breaker = client.stats()["breakers"]["public/get_index_price"]
+    assert breaker["state"] == "open"
+    assert breaker["rejected"] == 2
+
+
+async def test_client_does_not_retry_api_errors(fast_backoff):
+    """Тест, что ошибка параметров не повторяется и не размыкает предохранитель"""
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        return web.json_response({"error": {"code": -32602, "message": "Invalid params"}}, status=400)
+
+    server = await start_server(handler)
+    client = DeribitClient(base_url=str(server.make_url("/api/v2")))
+    try:
+        result = await client.get_index_price_by_name("nope_usd")
+    finally:
+        await client.close()
+        await server.close()
+    
+    assert result is None
+    assert len(calls) == 1
+    assert client.stats()["breakers"]["public/get_index_price"]["failures"] == 0
+
+
+async def test_client_hedges_slow_requests(monkeypatch):
+    """Тест дублирующего запроса после квантиля задержки"""
+    monkeypatch.setattr(settings, "deribit_hedge_min_samples", 1)
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        if len(calls) == 2:
+            await asyncio.sleep(1.0)  # хвостовая задержка первого запроса
+        return web.json_response({"result": {"index_price": 50000.0}})
+
+    server = await start_server(handler)
+    client = DeribitClient(base_url=str(server.make_url("/api/v2")))
+    client.hedge = True
+    try:
+        await client.get_index_price_by_name("btc_usd")  # набирает замер задержки
+        started = time.monotonic()
+        result = await client.get_index_price_by_name("btc_usd")
+        elapsed = time.monotonic() - started
+    finally:
+        await client.close()
+        await server.close()
+    
+    assert result["price"] == 50000.0
+    assert elapsed < 0.5
+    assert client.stats()["hedges"] == {"fired": 1, "won": 1}
@@ -0,0 +1,36 @@
+from datetime import datetime, timezone, timedelta
+from decimal import Decimal
+from typing import List
+from pydantic import TypeAdapter
+from src.api.responses import encode_ticks
+from src.domain.schemas import PriceTickResponse
+
+
+def _expected(rows):
+    models = [PriceTickResponse.model_validate(row) for row in rows]
+    return TypeAdapter(List[PriceTickResponse]).dump_json(models)
+
+
+def test_encode_ticks_matches_pydantic_for_datetimes():
+    """Тест совпадения байт с Pydantic для naive, UTC и смещенных datetime"""
+    rows = [
+        {"ticker": "btc_usd", "price": Decimal("50000.10"), "timestamp": 3, "id": 3,
+         "created_at": datetime(2024, 1, 1, 12, 0, 0, 123456)},
+        {"ticker": "btc_usd", "price": Decimal("49999.99"), "timestamp": 2, "id": 2,
+         "created_at": datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)},
+        {"ticker": "btc_usd", "price": 1.5, "timestamp": 1, "id": 1,
+         "created_at": datetime(2024, 1, 1, 15, 0, tzinfo=timezone(timedelta(hours=3)))},
+    ]
+    
+    assert encode_ticks(rows) == _expected(rows)
+
+
+def test_encode_ticks_accepts_tuples():
+    """Тест сериализации строк Core (кортежей в порядке полей)"""
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    row = ("eth_usd", 3000.0, 10, 7, created)
+    
+    assert encode_ticks([row]) == _expected([dict(zip(
+        ("ticker", "price", "timestamp", "id", "created_at"), row
+    ))])
+    assert encode_ticks([]) == b"[]"
@@ -0,0 +1,89 @@
+from datetime import datetime, timezone
+from src.application.retention import RetentionManager
+from src.domain.models import PriceTick, PriceRollup
+from src.domain.schemas import PriceTickCreate
+from src.infrastructure.repositories import RetentionRepository, RollupRepository
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+
+def ts(month, day, hour=0, minute=0):
+    return int(datetime(2026, month, day, hour, minute, tzinfo=timezone.utc).timestamp())
+
+
+def make_manager(session, **kwargs):
+    return RetentionManager(
+        RetentionRepository(session), RollupRepository(session),
+        raw_days=2, minute_months=1, batch_pause=0, **kwargs
+    )
+
+
+def store(price_repository, rollups, timestamps, with_rollups=True):
+    created = price_repository.bulk_upsert(
+        [PriceTickCreate(ticker="btc_usd", price=100.0 + i, timestamp=t) for i, t in enumerate(timestamps)]
+    )
+    if with_rollups:
+        rollups.apply_ticks(created)
+
+
+def populate(price_repository, session):
+    rollups = RollupRepository(session)
+    # За пределами минутного уровня (старше 2026-09-01)
+    store(price_repository, rollups, [ts(8, 10, 1, m) for m in range(3)])
+    # Сырые тики старше 2 суток, но минутные свечи еще хранятся
+    store(price_repository, rollups, [ts(10, 10, 2, m) for m in range(3)])
+    # Сутки, для которых роллапы не были посчитаны при ингесте
+    store(price_repository, rollups, [ts(10, 12, 5, 0), ts(10, 12, 5, 1)], with_rollups=False)
+    # Свежие тики
+    store(price_repository, rollups, [ts(10, 17, 9, 0)])
+
+
+def test_retention_dry_run_reports_without_deleting(price_repository, session, clean_db):
+    """Dry-run считает строки и байты по уровням и ничего не удаляет"""
+    # Arrange
+    populate(price_repository, session)
+    manager = make_manager(session)
+
+    # Act
+    report = manager.report(NOW)
+
+    # Assert
+    assert report["raw"]["cutoff"] == ts(10, 16)
+    assert report["raw"]["rows"] == 8
+    assert report["raw"]["bytes"] > 0
+    assert report["minute"]["cutoff"] == ts(9, 1)
+    assert report["minute"]["rows"] == 3
+    assert session.query(PriceTick).count() == 9
+
+
+def test_retention_downsamples_and_deletes_in_batches(price_repository, session, clean_db):
+    """Просроченные тики удаляются пачками, свечи по ним сохраняются"""
+    # Arrange
+    populate(price_repository, session)
+    manager = make_manager(session, batch_size=2)
+
+    # Act
+    result = manager.apply(NOW)
+
+    # Assert
+    assert result["raw"]["rows"] == 8
+    assert result["raw"]["rebuilt_days"] == 1
+    assert result["minute"]["rows"] == 3
+    assert [t.timestamp for t in session.query(PriceTick).all()] == [ts(10, 17, 9, 0)]
+
+    minute = {
+        r.bucket: r.count
+        for r in session.query(PriceRollup).filter(PriceRollup.interval == 60).all()
+    }
+    assert minute == {
+        ts(10, 10, 2, 0): 1, ts(10, 10, 2, 1): 1, ts(10, 10, 2, 2): 1,
+        ts(10, 12, 5, 0): 1, ts(10, 12, 5, 1): 1,
+        ts(10, 17, 9, 0): 1,
+    }
+    hourly = session.query(PriceRollup).filter(
+        PriceRollup.interval == 3600, PriceRollup.bucket == ts(8, 10, 1)
+    ).one()
+    assert hourly.count == 3
+
+    # Повторный запуск ничего не пересчитывает и не удаляет
+    assert manager.apply(NOW)["raw"] == {"cutoff": ts(10, 16), "rows": 0, "rebuilt_days": 0}
@@ -0,0 +1,65 @@
+import pickle
+from datetime import datetime, timedelta, timezone
+from celery.beat import ScheduleEntry
+from src.core.config import settings
+from src.infrastructure.scheduling import AlignedSchedule, aligned_entry, is_expired, slot_for
+
+T0 = datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+
+def aligned(interval, now):
+    return AlignedSchedule(interval, nowfun=lambda: now)
+
+
+def test_aligned_schedule_fires_on_wall_clock_boundaries():
+    """Следующий запуск — ближайшая граница интервала, а не last_run + interval"""
+    last_run = T0 + timedelta(seconds=3)
+
+    assert aligned(15, T0 + timedelta(seconds=10)).is_due(last_run) == (False, 5.0)
+    assert aligned(15, T0 + timedelta(seconds=15)).is_due(last_run) == (True, 15.0)
+    # Beat опоздал на 2 с: следующая проверка все равно на границе
+    assert aligned(15, T0 + timedelta(seconds=17)).is_due(last_run) == (True, 13.0)
+
+
+def test_aligned_schedule_does_not_catch_up_missed_slots():
+    schedule = aligned(1, T0 + timedelta(seconds=10, milliseconds=250))
+
+    due, next_check = schedule.is_due(T0)
+
+    assert due is True
+    assert next_check == 0.75
+
+
+def test_aligned_schedule_survives_pickling():
+    """PersistentScheduler хранит расписание в shelve"""
+    restored = pickle.loads(pickle.dumps(AlignedSchedule(5)))
+
+    assert restored.interval == 5
+    assert restored == AlignedSchedule(5)
+
+
+def test_aligned_entry_passes_slot_and_deadline(monkeypatch):
+    monkeypatch.setattr(settings, "ingest_deadline", 20.0)
+    entry = ScheduleEntry(
+        name="ingest",
+        task="src.application.tasks.dispatch_ingest_task",
+        schedule=AlignedSchedule(60),
+        kwargs={"tickers": ["btc_usd"]},
+    )
+
+    sent = aligned_entry(entry, T0.timestamp() + 7.5)
+
+    assert sent.kwargs == {"tickers": ["btc_usd"], "slot": int(T0.timestamp())}
+    assert sent.options["expires"] == T0 + timedelta(seconds=20)
+    assert "slot" not in entry.kwargs
+
+
+def test_is_expired(monkeypatch):
+    monkeypatch.setattr(settings, "ingest_interval", 60)
+    monkeypatch.setattr(settings, "ingest_deadline", 0.0)
+    slot = slot_for(T0.timestamp() + 42, 60)
+
+    assert slot == T0.timestamp()
+    assert not is_expired(slot, slot + 59.9)
+    assert is_expired(slot, slot + 60)
+    assert not is_expired(None)
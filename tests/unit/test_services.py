@@ -1,7 +1,9 @@
+import asyncio
 import pytest
-from unittest.mock import Mock
+from unittest.mock import Mock, AsyncMock, patch
 from datetime import datetime, timezone
 from src.application.services import PriceService
+from src.application.fetcher import PriceFetcher
 from src.domain.schemas import PriceTickCreate
 
 
@@ -83,15 +85,107 @@ def test_get_prices_by_date_range(price_service, mock_repository):
     mock_repository.get_by_date_range.return_value = [mock_record]
     
     # Act
-    result = price_service.get_prices_by_date_range(
+    result, cursor = price_service.get_prices_by_date_range(
         "btc_usd", 
         date_from=1234567800,
-        date_to=1234567900
+        date_to=1234567900,
+        limit=10
     )
     
     # Assert
     assert len(result) == 1
     assert result[0].ticker == "btc_usd"
+    assert cursor is None
     mock_repository.get_by_date_range.assert_called_once_with(
-        "btc_usd", 1234567800, 1234567900
-    )
\ No newline at end of file
+        "btc_usd", 1234567800, 1234567900, 11, None
+    )
+
+
+async def test_fetch_and_store_prices_uses_bulk_upsert(price_service, mock_repository):
+    """Тест, что полученные цены сохраняются одной пачкой"""
+    # Arrange
+    client = AsyncMock()
+    client.get_index_price_by_name.side_effect = [
+        {"ticker": "btc_usd", "price": 50000.0, "timestamp": 1000},
+        None,
+    ]
+    mock_repository.bulk_upsert.return_value = [
+        Mock(ticker="btc_usd", price=50000.0, timestamp=1000)
+    ]
+    
+    # Act
+    with patch("src.application.services.DeribitClient", return_value=client):
+        results = await price_service.fetch_and_store_prices_async()
+    
+    # Assert
+    assert results == [{"ticker": "btc_usd", "price": 50000.0, "timestamp": 1000}]
+    mock_repository.bulk_upsert.assert_called_once()
+    mock_repository.create.assert_not_called()
+    client.close.assert_awaited_once()
+
+
+def test_store_ticks_publishes_new_ticks(mock_repository):
+    """Тест, что store_ticks рассылает только новые тики в порядке времени"""
+    # Arrange
+    hub = Mock()
+    service = PriceService(mock_repository, hub=hub)
+    mock_repository.bulk_upsert.return_value = [
+        create_mock_record(timestamp=1001),
+        create_mock_record(timestamp=1000),
+    ]
+    
+    # Act
+    service.store_ticks([PriceTickCreate(ticker="btc_usd", price=50000.0, timestamp=1000)])
+    
+    # Assert
+    published = hub.publish.call_args.args[0]
+    assert [price.timestamp for price in published] == [1000, 1001]
+
+
+async def test_price_fetcher_isolates_failures():
+    """Тест, что ошибка по одному индексу не мешает остальным"""
+    # Arrange
+    async def get_index_price_by_name(index_name):
+        if index_name == "xrp_usd":
+            raise RuntimeError("boom")
+        return {"ticker": index_name, "price": 10.0, "timestamp": 1000}
+
+    client = AsyncMock()
+    client.get_index_price_by_name.side_effect = get_index_price_by_name
+    fetcher = PriceFetcher(client, ["btc_usd", "xrp_usd", "sol_usdc"], concurrency=2)
+    
+    # Act
+    result = await fetcher.fetch_all()
+    
+    # Assert
+    assert [tick.ticker for tick in result["ticks"]] == ["btc_usd", "sol_usdc"]
+    assert result["instruments"]["xrp_usd"]["status"] == "error"
+    assert result["instruments"]["xrp_usd"]["error"] == "boom"
+    assert result["instruments"]["btc_usd"]["status"] == "ok"
+    assert result["instruments"]["btc_usd"]["elapsed"] >= 0
+
+
+async def test_price_fetcher_respects_concurrency():
+    """Тест, что одновременно выполняется не больше concurrency запросов"""
+    # Arrange
+    in_flight = 0
+    max_in_flight = 0
+
+    async def get_index_price_by_name(index_name):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {"ticker": index_name, "price": 10.0, "timestamp": 1000}
+
+    client = AsyncMock()
+    client.get_index_price_by_name.side_effect = get_index_price_by_name
+    tickers = [f"t{i}_usd" for i in range(10)]
+    
+    # Act
+    result = await PriceFetcher(client, tickers, concurrency=3).fetch_all()
+    
+    # Assert
+    assert len(result["ticks"]) == 10
+    assert max_in_flight == 3
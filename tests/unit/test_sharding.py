@@ -0,0 +1,76 @@
+import time
+import fakeredis
+import pytest
+from src.application.sharding import ShardPlanner, estimate_shard_seconds, plan_shards
+from src.infrastructure.lease import InstrumentLatencyStore, RedisLease
+
+
+def test_plan_shards_fits_target_and_balances_load():
+    """Число шардов растет с суммарной задержкой, нагрузка распределяется поровну"""
+    latencies = {f"t{i}": 1.0 for i in range(40)}
+    latencies.update({"slow_a": 4.0, "slow_b": 4.0})
+
+    shards = plan_shards(latencies, concurrency=4, target_seconds=4.0, max_shard_size=100)
+
+    assert len(shards) == 3  # 48 с / (4 * 4 с)
+    assert sorted(ticker for shard in shards for ticker in shard) == sorted(latencies)
+    assert {"slow_a", "slow_b"} not in [set(shard) & {"slow_a", "slow_b"} for shard in shards]
+    estimates = [estimate_shard_seconds([latencies[t] for t in shard], 4) for shard in shards]
+    assert max(estimates) <= 4.0
+
+
+def test_plan_shards_scales_linearly_with_universe():
+    """Вдвое больше инструментов — вдвое больше шардов того же размера"""
+    small = plan_shards({f"t{i}": 0.5 for i in range(100)}, 10, 5.0, 1000)
+    large = plan_shards({f"t{i}": 0.5 for i in range(200)}, 10, 5.0, 1000)
+
+    assert len(large) == 2 * len(small)
+    assert {len(shard) for shard in small} == {len(shard) for shard in large}
+
+
+def test_plan_shards_respects_max_size():
+    shards = plan_shards({f"t{i}": 0.01 for i in range(25)}, 10, 60.0, 10)
+
+    assert [len(shard) for shard in shards] == [9, 8, 8]
+    assert plan_shards({}, 10, 60.0, 10) == []
+
+
+def test_shard_planner_uses_measured_latencies():
+    """Замеренные задержки сглаживаются, для новых инструментов берется оценка по умолчанию"""
+    store = InstrumentLatencyStore(fakeredis.FakeRedis(), alpha=0.5)
+    planner = ShardPlanner(store, target_seconds=0.5, max_shard_size=100, concurrency=1, default_latency=0.1)
+
+    planner.record({
+        "btc_usd": {"status": "ok", "elapsed": 0.8},
+        "eth_usd": {"status": "error", "elapsed": 5.0},
+    })
+    planner.record({"btc_usd": {"status": "ok", "elapsed": 0.4}})
+
+    assert store.get(["btc_usd", "eth_usd"]) == {"btc_usd": pytest.approx(0.6)}
+    assert planner.plan(["btc_usd", "eth_usd", "sol_usdc"]) == [["btc_usd"], ["eth_usd", "sol_usdc"]]
+
+
+def test_redis_lease_is_exclusive_and_released_by_owner_only():
+    client = fakeredis.FakeRedis()
+    lease = RedisLease(client, "ingest", ttl_ms=60_000)
+
+    token = lease.acquire()
+    assert token is not None
+    assert lease.acquire() is None
+    assert lease.release("someone-else") is False
+    assert lease.holder() == token
+
+    assert lease.release(token) is True
+    assert lease.holder() is None
+    assert lease.acquire() is not None
+
+
+def test_redis_lease_expires():
+    client = fakeredis.FakeRedis()
+    lease = RedisLease(client, "ingest", ttl_ms=50)
+    token = lease.acquire()
+
+    time.sleep(0.1)
+
+    assert lease.acquire() is not None
+    assert lease.release(token) is False
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import pytest
+from websockets.asyncio.server import serve
+from src.application.streaming import StreamIngester
+from src.application.services import PriceService
+from src.infrastructure.deribit_stream import DeribitStreamClient
+from src.domain.models import PriceTick
+
+
+def notification(index_name, price, timestamp_ms):
+    return json.dumps({
+        "jsonrpc": "2.0",
+        "method": "subscription",
+        "params": {
+            "channel": f"deribit_price_index.{index_name}",
+            "data": {"index_name": index_name, "price": price, "timestamp": timestamp_ms},
+        },
+    })
+
+
+@pytest.fixture
+async def fake_deribit():
+    """Локальный WebSocket сервер, имитирующий подписку Deribit"""
+    state = {"connections": 0, "channels": []}
+
+    async def handler(websocket):
+        state["connections"] += 1
+        connection = state["connections"]
+        for _ in range(2):
+            request = json.loads(await websocket.recv())
+            if request["method"] == "public/subscribe":
+                state["channels"] = request["params"]["channels"]
+
+        if connection == 1:
+            await websocket.send(notification("btc_usd", 50000.0, 1000_100))
+            await websocket.send(notification("btc_usd", 50001.0, 1000_900))
+            await websocket.send(notification("eth_usd", 3000.0, 1000_500))
+            return  # обрыв соединения: клиент должен переподключиться
+        await websocket.send(json.dumps({"method": "heartbeat", "params": {"type": "test_request"}}))
+        assert json.loads(await websocket.recv())["method"] == "public/test"
+        await websocket.send(notification("btc_usd", 50100.0, 1001_000))
+        await websocket.wait_closed()
+
+    async with serve(handler, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        state["url"] = f"ws://127.0.0.1:{port}"
+        yield state
+
+
+async def test_stream_ingester_flushes_and_reconnects(fake_deribit, price_repository):
+    """Тест потоковой записи тиков с переподключением после обрыва"""
+    # Arrange
+    stream = DeribitStreamClient(
+        url=fake_deribit["url"],
+        tickers=["btc_usd", "eth_usd"],
+        reconnect_delay=0.01
+    )
+    ingester = StreamIngester(
+        stream, PriceService(price_repository), batch_size=100, flush_interval=0.02
+    )
+    run_task = asyncio.create_task(ingester.run())
+    
+    # Act
+    for _ in range(200):
+        if ingester.stored >= 3:
+            break
+        await asyncio.sleep(0.01)
+    await ingester.stop()
+    await asyncio.wait_for(run_task, timeout=1)
+    
+    # Assert
+    assert fake_deribit["connections"] == 2
+    assert fake_deribit["channels"] == ["deribit_price_index.btc_usd", "deribit_price_index.eth_usd"]
+    rows = price_repository.db.query(PriceTick).order_by(PriceTick.ticker, PriceTick.timestamp).all()
+    assert [(row.ticker, row.timestamp, float(row.price)) for row in rows] == [
+        ("btc_usd", 1000, 50001.0),
+        ("btc_usd", 1001, 50100.0),
+        ("eth_usd", 1000, 3000.0),
+    ]
+
+
+async def test_full_buffer_does_not_stop_reading_stream():
+    """При полном буфере поток читается дальше, а ожидающие тики схлопываются до последнего по тикеру"""
+    # Arrange
+    import threading
+    import time
+    from types import SimpleNamespace
+    from src.domain.schemas import PriceTickCreate
+    from src.infrastructure.tick_buffer import MemoryTickBuffer
+
+    class FakeStream:
+        def __init__(self, items):
+            self.items = items
+            self.consumed = 0
+
+        async def ticks(self):
+            for item in self.items:
+                self.consumed += 1
+                yield item
+                await asyncio.sleep(0)
+
+        async def stop(self):
+            pass
+
+    items = [
+        {"ticker": ticker, "price": 100.0 + second, "timestamp": 1000 + second}
+        for second in range(5) for ticker in ("btc_usd", "eth_usd")
+    ]
+    stream = FakeStream(items)
+    read_all = threading.Event()
+    stored = []
+
+    def slow_store(ticks):
+        # Запись стоит, пока ингестер не дочитает поток: чтение не должно ждать записи
+        read_all.wait(timeout=2)
+        stored.extend(ticks)
+        return ticks
+
+    ingester = StreamIngester(
+        stream, SimpleNamespace(store_ticks=slow_store), batch_size=1, flush_interval=0.01,
+        buffer=MemoryTickBuffer(max_size=1)
+    )
+    run_task = asyncio.create_task(ingester.run())
+
+    # Act
+    started = time.monotonic()
+    while stream.consumed < len(items) and time.monotonic() - started < 1:
+        await asyncio.sleep(0.01)
+    consumed = stream.consumed
+    read_all.set()
+    await asyncio.wait_for(run_task, timeout=2)
+
+    # Assert
+    assert consumed == len(items)
+    assert len(stored) < len(items)
+    latest = {tick.ticker: tick.timestamp for tick in stored}
+    assert latest == {"btc_usd": 1004, "eth_usd": 1004}
+    assert all(isinstance(tick, PriceTickCreate) for tick in stored)
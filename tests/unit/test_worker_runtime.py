@@ -0,0 +1,41 @@
+import asyncio
+import pytest
+from src.infrastructure.worker_runtime import WorkerRuntime
+
+
+def test_worker_runtime_reuses_loop_and_client():
+    """Тест, что задачи выполняются в одном loop с одним клиентом"""
+    # Arrange
+    runtime = WorkerRuntime()
+    runtime.start()
+    
+    async def current_loop():
+        return asyncio.get_running_loop()
+    
+    try:
+        client = runtime.client
+        
+        # Act
+        first_loop = runtime.run(current_loop())
+        runtime.start()  # повторный запуск ничего не меняет
+        second_loop = runtime.run(current_loop())
+        
+        # Assert
+        assert first_loop is second_loop is runtime.loop
+        assert runtime.client is client
+    finally:
+        runtime.stop()
+    
+    assert not runtime.is_running
+    assert runtime.client is None
+
+
+def test_worker_runtime_run_requires_start():
+    """Тест, что без запуска runtime корутины не выполняются"""
+    runtime = WorkerRuntime()
+    
+    async def noop():
+        return None
+    
+    with pytest.raises(RuntimeError):
+        runtime.run(noop())
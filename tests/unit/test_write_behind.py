@@ -0,0 +1,200 @@
+import asyncio
+import fakeredis.aioredis
+import pytest
+from unittest.mock import AsyncMock, Mock
+from sqlalchemy.exc import DataError, OperationalError
+from src.application.services import PriceService
+from src.application.write_behind import GroupCommitFlusher
+from src.domain.schemas import PriceTickCreate
+from src.infrastructure.tick_buffer import MemoryTickBuffer, RedisTickBuffer
+
+
+def ticks(count, tickers=("btc_usd", "eth_usd")):
+    return [
+        PriceTickCreate(ticker=tickers[i % len(tickers)], price=100.0 + i, timestamp=1000 + i)
+        for i in range(count)
+    ]
+
+
+class RecordingStore:
+    """store_ticks, который запоминает пачки и умеет отказать заданное число раз"""
+
+    def __init__(self, failures=0):
+        self.batches = []
+        self.failures = failures
+
+    def __call__(self, batch):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("database is down")
+        self.batches.append(list(batch))
+        return batch
+
+
+async def test_flusher_group_commits_by_size_and_keeps_order():
+    buffer = MemoryTickBuffer(max_size=100)
+    store = RecordingStore()
+    flusher = GroupCommitFlusher(buffer, store, batch_size=3, flush_interval=10.0)
+    await buffer.put(ticks(7))
+
+    await flusher.drain()
+
+    assert [len(batch) for batch in store.batches] == [3, 3, 1]
+    written = [tick for batch in store.batches for tick in batch]
+    for ticker in ("btc_usd", "eth_usd"):
+        timestamps = [tick.timestamp for tick in written if tick.ticker == ticker]
+        assert timestamps == sorted(timestamps)
+    assert flusher.stats() == {"stored": 7, "batches": 3, "failures": 0, "dead_letters": 0}
+
+
+async def test_flusher_commits_on_interval_and_drains_on_stop():
+    """Неполная пачка пишется по таймеру, остаток — при остановке"""
+    buffer = MemoryTickBuffer(max_size=100)
+    store = RecordingStore()
+    flusher = GroupCommitFlusher(buffer, store, batch_size=1000, flush_interval=0.02)
+    run_task = asyncio.create_task(flusher.run())
+
+    await buffer.put(ticks(2))
+    for _ in range(100):
+        if flusher.stored:
+            break
+        await asyncio.sleep(0.01)
+    assert flusher.stored == 2
+
+    await buffer.put(ticks(3))
+    flusher.stop()
+    await asyncio.wait_for(run_task, timeout=1)
+
+    assert flusher.stored == 5
+    assert await buffer.size() == 0
+
+
+async def test_full_buffer_applies_backpressure():
+    buffer = MemoryTickBuffer(max_size=2)
+    await buffer.put(ticks(2))
+
+    producer = asyncio.create_task(buffer.put(ticks(3)))
+    await asyncio.sleep(0.02)
+    assert not producer.done()
+    assert await buffer.size() == 2
+
+    taken = []
+    for _ in range(2):
+        taken.append(len(await buffer.take(2)))
+        await asyncio.sleep(0.01)  # производитель дописывает в освободившееся место
+    waited = await asyncio.wait_for(producer, timeout=1)
+
+    assert taken == [2, 2]
+    assert await buffer.size() == 1
+    assert waited > 0
+
+
+async def test_failed_batch_is_requeued_in_order():
+    buffer = MemoryTickBuffer(max_size=100)
+    store = RecordingStore(failures=1)
+    flusher = GroupCommitFlusher(buffer, store, batch_size=2, flush_interval=10.0)
+    await buffer.put(ticks(3))
+
+    assert await flusher.flush() is None
+    await flusher.drain()
+
+    assert [[tick.timestamp for tick in batch] for batch in store.batches] == [[1000, 1001], [1002]]
+    assert flusher.failures == 1
+
+
+class PoisonStore(RecordingStore):
+    """store_ticks Postgres: тикер длиннее String(10) валит всю пачку"""
+
+    def __call__(self, batch):
+        if any(len(tick.ticker) > 10 for tick in batch):
+            raise DataError("INSERT", None, Exception("value too long for type character varying(10)"))
+        return super().__call__(batch)
+
+
+async def test_poison_tick_is_dead_lettered_after_max_attempts():
+    """Битый тик не блокирует буфер: после max_attempts пачка делится, тик уходит в dead-letter"""
+    buffer = MemoryTickBuffer(max_size=100)
+    store = PoisonStore()
+    flusher = GroupCommitFlusher(buffer, store, batch_size=10, flush_interval=10.0, max_attempts=2)
+    batch = ticks(5)
+    # Тик в обход валидации схемы, как если бы ограничение БД было строже нее
+    batch[2] = PriceTickCreate.model_construct(ticker="btcdvol_usdc", price=50.0, timestamp=1002)
+    await buffer.put(batch + ticks(1, tickers=("sol_usdc",)))
+
+    assert await flusher.flush() is None
+    assert await flusher.flush() == 5
+
+    written = [tick.timestamp for batch in store.batches for tick in batch]
+    assert sorted(written) == [1000, 1000, 1001, 1003, 1004]
+    assert [tick.ticker for tick in buffer.dead_letters] == ["btcdvol_usdc"]
+    assert await buffer.size() == 0
+    assert flusher.stats()["dead_letters"] == 1
+
+    await buffer.put(ticks(2))
+    assert await flusher.flush() == 2
+
+
+async def test_database_outage_is_retried_without_dead_letters():
+    """Ошибки соединения с БД не расходуют попытки пачки"""
+    buffer = MemoryTickBuffer(max_size=100)
+    outages = iter(range(5))
+
+    def store(batch):
+        if next(outages, None) is not None:
+            raise OperationalError("INSERT", None, Exception("connection refused"))
+        return batch
+
+    flusher = GroupCommitFlusher(buffer, store, batch_size=10, flush_interval=10.0, max_attempts=2)
+    await buffer.put(ticks(3))
+
+    results = [await flusher.flush() for _ in range(6)]
+
+    assert results == [None] * 5 + [3]
+    assert buffer.dead_letters == []
+
+
+async def test_redis_buffer_is_fifo_with_requeue_and_soft_limit():
+    buffer = RedisTickBuffer(fakeredis.aioredis.FakeRedis(), max_size=3, poll_interval=0.01)
+    await buffer.put(ticks(3))
+
+    producer = asyncio.create_task(buffer.put(ticks(1, tickers=("sol_usdc",))))
+    await asyncio.sleep(0.03)
+    assert not producer.done()
+
+    first = await buffer.take(2)
+    await buffer.requeue(first[1:])
+    await asyncio.wait_for(producer, timeout=1)
+    rest = await buffer.take(10)
+
+    assert [tick.timestamp for tick in first] == [1000, 1001]
+    assert [(tick.ticker, tick.timestamp) for tick in rest] == [
+        ("eth_usd", 1001), ("btc_usd", 1002), ("sol_usdc", 1000)
+    ]
+
+
+async def test_price_service_pushes_fetched_ticks_to_buffer():
+    """С буфером write-behind сервис ингеста не пишет в БД сам"""
+    repository = Mock()
+    buffer = MemoryTickBuffer(max_size=10)
+    client = AsyncMock()
+    client.get_index_price_by_name.side_effect = [
+        {"ticker": "btc_usd", "price": 50000.0, "timestamp": 1000},
+        {"ticker": "eth_usd", "price": 3000.0, "timestamp": 1000},
+    ]
+    service = PriceService(repository, client=client, buffer=buffer)
+
+    report = await service.fetch_and_store_report_async()
+
+    assert len(report["prices"]) == 2
+    repository.bulk_upsert.assert_not_called()
+    assert [tick.ticker for tick in await buffer.take(10)] == ["btc_usd", "eth_usd"]
+
+
+async def test_redis_buffer_dead_letters_aside_from_queue():
+    client = fakeredis.aioredis.FakeRedis()
+    buffer = RedisTickBuffer(client, max_size=10)
+
+    await buffer.dead_letter(ticks(2))
+
+    assert await buffer.size() == 0
+    assert await client.llen(RedisTickBuffer.dead_letter_key) == 2